@@ -0,0 +1,178 @@
+## Append-only store of intraday bars
+## One directory per symbol with monthly Hive partitions (month=YYYY-MM). Every append writes a new Parquet file
+## holding only timestamps not stored yet, so existing data is never rewritten; compact() merges a month's files.
+
+import os
+import json
+import uuid
+import threading
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from typing import Dict, List, Optional
+
+
+BAR_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+class BarStore:
+    """
+    Partitioned Parquet store of OHLCV bars indexed by UTC 'datetime'.
+    """
+    META_FILE = '_meta.json'
+
+    def __init__(self, root: str = 'bar_store'):
+        """
+        Args:
+            root (str): Store directory; one sub-directory per symbol.
+        """
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        # Serializes appends from concurrent fetchers
+        self._lock = threading.Lock()
+
+    # -- Paths and metadata --
+    def _symbol_dir(self, symbol: str) -> str:
+        return os.path.join(self.root, symbol.replace('/', '_'))
+
+    def _month_dir(self, symbol: str, month: str) -> str:
+        return os.path.join(self._symbol_dir(symbol), f"month={month}")
+
+    def meta(self, symbol: str) -> Dict:
+        """
+        Bookkeeping of a symbol: number of rows, first and last stored timestamps (ISO strings).
+        """
+        path = os.path.join(self._symbol_dir(symbol), self.META_FILE)
+        if not os.path.exists(path):
+            return {'rows': 0, 'first': None, 'last': None}
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_meta(self, symbol: str, meta: Dict):
+        path = os.path.join(self._symbol_dir(symbol), self.META_FILE)
+        partial = f"{path}.tmp"
+        with open(partial, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=1)
+        os.replace(partial, path)
+
+    def last_timestamp(self, symbol: str) -> Optional[pd.Timestamp]:
+        """Last stored bar time, or None for an empty symbol."""
+        last = self.meta(symbol)['last']
+        return pd.Timestamp(last) if last else None
+
+    def months(self, symbol: str) -> List[str]:
+        """Stored months of a symbol, oldest first."""
+        directory = self._symbol_dir(symbol)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name.split('=', 1)[1] for name in os.listdir(directory) if name.startswith('month='))
+
+    def files(self, symbol: str, month: str) -> int:
+        """Number of files of one month (one per append until compacted)."""
+        directory = self._month_dir(symbol, month)
+        return sum(name.endswith('.parquet') for name in os.listdir(directory)) if os.path.isdir(directory) else 0
+
+    def _stored_times(self, symbol: str, month: str) -> pd.DatetimeIndex:
+        directory = self._month_dir(symbol, month)
+        files = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.parquet')] \
+            if os.path.isdir(directory) else []
+        if not files:
+            return pd.DatetimeIndex([], tz='UTC')
+        times = pa.concat_tables([pq.read_table(path, columns=['datetime']) for path in files])
+        return pd.DatetimeIndex(times.column('datetime').to_pandas())
+
+    # -- Writes --
+    def append(self, symbol: str, bars: pd.DataFrame) -> int:
+        """
+        Add bars whose timestamps are not stored yet, as new files (existing files are left untouched).
+
+        Args:
+            symbol (str): Symbol, e.g. 'BTC-USD.CC'.
+            bars (pd.DataFrame): OHLCV bars indexed by datetime (naive times are taken as UTC).
+
+        Returns:
+            int: Number of new rows written.
+        """
+        if bars.empty:
+            return 0
+        bars = bars[[c for c in BAR_COLUMNS if c in bars.columns]]
+        index = pd.DatetimeIndex(bars.index)
+        bars = bars.set_axis(index.tz_localize('UTC') if index.tz is None else index.tz_convert('UTC'))
+        bars = bars[~bars.index.duplicated(keep='last')].sort_index()
+        bars.index.name = 'datetime'
+
+        written = 0
+        with self._lock:
+            meta = self.meta(symbol)
+            months = bars.index.strftime('%Y-%m')
+            for month in pd.unique(months):
+                part = bars[months == month]
+                # Only months that may overlap the stored range need their timestamps checked
+                if meta['last'] and part.index[0] <= pd.Timestamp(meta['last']) \
+                        and part.index[-1] >= pd.Timestamp(meta['first']):
+                    part = part[~part.index.isin(self._stored_times(symbol, month))]
+                if part.empty:
+                    continue
+                directory = self._month_dir(symbol, month)
+                os.makedirs(directory, exist_ok=True)
+                name = f"part-{part.index[0]:%Y%m%d%H%M}-{part.index[-1]:%Y%m%d%H%M}-{uuid.uuid4().hex[:8]}.parquet"
+                # Hidden temporary name: pyarrow datasets skip files starting with '.'
+                partial = os.path.join(directory, f".{name}.tmp")
+                pq.write_table(pa.Table.from_pandas(part, preserve_index=True), partial)
+                os.replace(partial, os.path.join(directory, name))
+                written += len(part)
+                first, last = part.index[0].isoformat(), part.index[-1].isoformat()
+                meta['first'] = min(meta['first'], first) if meta['first'] else first
+                meta['last'] = max(meta['last'], last) if meta['last'] else last
+            meta['rows'] += written
+            os.makedirs(self._symbol_dir(symbol), exist_ok=True)
+            self._save_meta(symbol, meta)
+        return written
+
+    def compact(self, symbol: str, month: str) -> int:
+        """
+        Merge the files of one month into a single file (e.g. once the month is complete).
+
+        Returns:
+            int: Number of files merged.
+        """
+        with self._lock:
+            directory = self._month_dir(symbol, month)
+            files = sorted(name for name in os.listdir(directory) if name.endswith('.parquet'))
+            if len(files) < 2:
+                return len(files)
+            table = pa.concat_tables([pq.read_table(os.path.join(directory, name)) for name in files])
+            frame = table.to_pandas().sort_index()
+            name = f"part-{frame.index[0]:%Y%m%d%H%M}-{frame.index[-1]:%Y%m%d%H%M}-{uuid.uuid4().hex[:8]}.parquet"
+            partial = os.path.join(directory, f".{name}.tmp")
+            pq.write_table(pa.Table.from_pandas(frame, preserve_index=True), partial)
+            os.replace(partial, os.path.join(directory, name))
+            for old in files:
+                os.remove(os.path.join(directory, old))
+            return len(files)
+
+    # -- Reads --
+    def read(self, symbol: str, start=None, end=None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Bars of a symbol over [start, end), optionally a column subset; only matching months are opened.
+        """
+        directory = self._symbol_dir(symbol)
+        if not self.months(symbol):
+            return pd.DataFrame(columns=columns or BAR_COLUMNS, index=pd.DatetimeIndex([], tz='UTC', name='datetime'))
+        dataset = ds.dataset(directory, format='parquet', partitioning='hive')
+        condition = None
+        for bound, month_op, time_op in ((start, '__ge__', '__ge__'), (end, '__le__', '__lt__')):
+            if bound is None:
+                continue
+            bound = pd.Timestamp(bound)
+            bound = bound.tz_localize('UTC') if bound.tzinfo is None else bound.tz_convert('UTC')
+            clause = (getattr(ds.field('month'), month_op)(bound.strftime('%Y-%m'))
+                      & getattr(ds.field('datetime'), time_op)(pa.scalar(bound.to_pydatetime(),
+                                                                          dataset.schema.field('datetime').type)))
+            condition = clause if condition is None else condition & clause
+        load = None if columns is None else ['datetime'] + list(columns)
+        frame = dataset.to_table(columns=load, filter=condition).to_pandas().drop(columns=['month'], errors='ignore')
+        if 'datetime' in frame.columns:
+            frame = frame.set_index('datetime')
+        return frame.sort_index()
@@ -0,0 +1,276 @@
+## Resumable historical backfill of EODHD intraday bars
+## Splits a long date range into from/to windows, fetches them concurrently (bounded asyncio concurrency over the
+## pooled, rate-limited HttpClient of Tools/Quant_Toolbox/http_client.py), appends each window to the partitioned bar store and checkpoints completed windows,
+## so an interrupted backfill resumes where it stopped.
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import threading
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+
+from bar_store import BarStore
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'Tools', 'Quant_Toolbox'))
+from http_client import HttpClient, DEFAULT_RATE_LIMITS
+
+
+EODHD_URL = "https://eodhd.com/api"
+
+# Longest from/to range the intraday endpoint serves per request, in days
+MAX_WINDOW_DAYS = {'1m': 120, '5m': 600, '1h': 7200}
+
+INTERVAL_SECONDS = {'1m': 60, '5m': 300, '1h': 3600}
+
+
+def time_windows(start: str, end: str, window_days: int) -> List[Tuple[int, int]]:
+    """
+    Split [start, end) into consecutive (from, to) unix-second windows; 'to' is inclusive like the API's.
+    """
+    first = int(pd.Timestamp(start, tz='UTC').timestamp())
+    last = int(pd.Timestamp(end, tz='UTC').timestamp())
+    step = window_days * 86400
+    return [(t, min(t + step, last) - 1) for t in range(first, last, step)]
+
+
+def candles_to_frame(candles: List[Dict], sort: bool = True) -> pd.DataFrame:
+    """
+    Convert intraday JSON candles to a DataFrame indexed by UTC datetime (as get_btc_5min does).
+    With sort=False the rows keep the order in which they were received.
+    """
+    if not candles:
+        return pd.DataFrame(columns=['open', 'high', 'low', 'close', 'volume'],
+                            index=pd.DatetimeIndex([], tz='UTC', name='datetime'), dtype=float)
+    df = pd.DataFrame(candles)
+    if 'timestamp' in df.columns:
+        df['datetime'] = pd.to_datetime(df['timestamp'], unit='s', utc=True)
+    else:
+        df['datetime'] = pd.to_datetime(df['datetime'], utc=True)
+    df = df.set_index('datetime')
+    if sort:
+        df = df.sort_index()
+    num_cols = ['open', 'high', 'low', 'close', 'volume']
+    df[num_cols] = df[num_cols].apply(pd.to_numeric, errors='coerce')
+    return df[num_cols]
+
+
+def make_client(pool_size: int = 16, rate: Optional[Tuple[float, int]] = None) -> HttpClient:
+    """
+    HttpClient keeping `pool_size` keep-alive connections per host, rate-limited to the EODHD plan's limit.
+
+    Args:
+        pool_size (int): Connections kept per host (the number of requests in flight).
+        rate (Optional[Tuple[float, int]]): (requests per second, burst); defaults to DEFAULT_RATE_LIMITS['eodhd.com'].
+    """
+    return HttpClient(pool_size=pool_size, rate_limits={'eodhd.com': rate or DEFAULT_RATE_LIMITS['eodhd.com']})
+
+
+def fetch_window(client: HttpClient, symbol: str, start: int, end: int, token: str,
+                 interval: str = '5m', base_url: str = EODHD_URL) -> List[Dict]:
+    """
+    Fetch the candles of one window; the client retries 429, 5xx and connection errors with jittered backoff.
+    """
+    url = f"{base_url}/intraday/{symbol}"
+    params = {'api_token': token, 'interval': interval, 'fmt': 'json', 'from': start, 'to': end}
+    response = client.get(url, params=params)
+    response.raise_for_status()
+    return response.json()
+
+
+class Checkpoint:
+    """
+    JSON record of the windows already fetched and stored, keyed by 'symbol:interval:from-to'.
+    """
+    def __init__(self, path: str = 'backfill_checkpoint.json'):
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.done: Dict[str, int] = json.load(f)
+        else:
+            self.done = {}
+
+    @staticmethod
+    def key(symbol: str, interval: str, window: Tuple[int, int]) -> str:
+        return f"{symbol}:{interval}:{window[0]}-{window[1]}"
+
+    def is_done(self, key: str) -> bool:
+        return key in self.done
+
+    def mark(self, key: str, rows: int):
+        with self._lock:
+            self.done[key] = rows
+            partial = f"{self.path}.tmp"
+            with open(partial, 'w', encoding='utf-8') as f:
+                json.dump(self.done, f, indent=1, sort_keys=True)
+            os.replace(partial, self.path)
+
+
+async def backfill(symbol: str, start: str, end: str, store: BarStore, checkpoint: Checkpoint, token: str,
+                   interval: str = '5m', window_days: Optional[int] = None, concurrency: int = 8,
+                   base_url: str = EODHD_URL, client: Optional[HttpClient] = None
+                   ) -> Dict[str, Union[float, List[Tuple[int, int]]]]:
+    """
+    Fetch every window of [start, end) not yet in the checkpoint and append it to the store.
+
+    Args:
+        symbol (str): EODHD symbol, e.g. 'BTC-USD.CC'.
+        start (str): First date ('YYYY-MM-DD', UTC).
+        end (str): End date (exclusive).
+        store (BarStore): Destination; timestamps already stored are skipped.
+        checkpoint (Checkpoint): Completed windows; a window is marked only once its bars are stored.
+        token (str): EODHD API token.
+        interval (str): '1m', '5m' or '1h'.
+        window_days (Optional[int]): Days per request. Defaults to the endpoint's maximum for the interval.
+        concurrency (int): Requests in flight at once.
+        base_url (str): API root (the local stub in tests).
+        client (Optional[HttpClient]): Pooled, rate-limited client. Defaults to one sized for `concurrency`.
+
+    Returns:
+        Dict[str, Union[float, List[Tuple[int, int]]]]: Windows fetched and skipped, rows received and written,
+            failures, the failed (from, to) windows (left out of the checkpoint, so a rerun retries them) and
+            elapsed seconds.
+    """
+    window_days = window_days or MAX_WINDOW_DAYS.get(interval, 100)
+    client = client or make_client(concurrency)
+    windows = time_windows(start, end, window_days)
+    pending = [w for w in windows if not checkpoint.is_done(Checkpoint.key(symbol, interval, w))]
+    semaphore = asyncio.Semaphore(concurrency)
+    totals = {'windows': len(pending), 'skipped': len(windows) - len(pending), 'received': 0, 'written': 0,
+              'failed': 0, 'failed_windows': []}
+
+    # Dedicated threads: the default executor of asyncio.to_thread may be smaller than `concurrency`.
+    # Windows are parsed on the fetching threads; appends (serialised by the store's lock anyway) and
+    # checkpointing go to one writer thread, so that they never hold a fetch slot.
+    fetcher = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='eodhd-backfill')
+    writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='eodhd-backfill-store')
+    loop = asyncio.get_running_loop()
+
+    def fetch(window: Tuple[int, int]) -> pd.DataFrame:
+        return candles_to_frame(fetch_window(client, symbol, window[0], window[1], token, interval, base_url))
+
+    def store_window(window: Tuple[int, int], frame: pd.DataFrame) -> int:
+        written = store.append(symbol, frame)
+        checkpoint.mark(Checkpoint.key(symbol, interval, window), len(frame))
+        return written
+
+    async def run(window: Tuple[int, int]):
+        stage = 'fetching'
+        try:
+            async with semaphore:
+                frame = await loop.run_in_executor(fetcher, fetch, window)
+            stage = 'storing'
+            written = await loop.run_in_executor(writer, store_window, window, frame)
+        except Exception as e:
+            print(f"Error {stage} {symbol} {window}: {e}")
+            totals['failed'] += 1
+            totals['failed_windows'].append(window)
+            return
+        totals['received'] += len(frame)
+        totals['written'] += written
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(run(window) for window in pending))
+    finally:
+        fetcher.shutdown(wait=False)
+        writer.shutdown(wait=True)
+    totals['failed_windows'].sort()
+    totals['seconds'] = time.perf_counter() - started
+    return totals
+
+
+def benchmark(years: int = 2, window_days: int = 10, latency_ms: float = 50.0) -> None:
+    """
+    Backfill synthetic 5-minute bars from the local stub at several concurrency levels. The stub runs in its own
+    process, so encoding its responses does not share this process's GIL. The CPU seconds of this process (parsing
+    and storing) are printed too: once they approach the elapsed time, more concurrency cannot help.
+    """
+    import tempfile
+    from eodhd_stub import StubProcess
+
+    end = pd.Timestamp('2024-01-01')
+    start = end - pd.DateOffset(years=years)
+    stub = StubProcess(['BTC-USD.CC'], str(start.date()), str(end.date()), latency_ms=latency_ms).start()
+    try:
+        for concurrency in (1, 4, 16):
+            with tempfile.TemporaryDirectory() as tmp:
+                store = BarStore(os.path.join(tmp, 'bars'))
+                checkpoint = Checkpoint(os.path.join(tmp, 'checkpoint.json'))
+                cpu = time.process_time()
+                totals = asyncio.run(backfill('BTC-USD.CC', str(start.date()), str(end.date()), store, checkpoint,
+                                              'demo', window_days=window_days, concurrency=concurrency,
+                                              base_url=stub.base_url))
+                cpu = time.process_time() - cpu
+                print(f"latency={latency_ms:.0f}ms concurrency={concurrency:2d}: {totals['windows']} windows, "
+                      f"{totals['written']} bars in {totals['seconds']:.2f}s "
+                      f"({totals['written'] / totals['seconds']:,.0f} bars/s, {cpu:.2f} CPU s)")
+    finally:
+        stub.stop()
+
+
+def check_failures() -> bool:
+    """
+    Backfill from the local stub into a store that fails on one window: the other windows must still be stored,
+    and the failed window reported in totals and left out of the checkpoint.
+    """
+    import tempfile
+    from eodhd_stub import StubEODHD, synthetic_candles
+
+    class FailingStore(BarStore):
+        def append(self, symbol, bars):
+            if len(bars) and bars.index[0] == pd.Timestamp('2023-11-11', tz='UTC'):
+                raise OSError("disk full")
+            return super().append(symbol, bars)
+
+    stub = StubEODHD({'BTC-USD.CC': synthetic_candles('2023-11-01', '2024-01-01')}).start()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = FailingStore(os.path.join(tmp, 'bars'))
+            checkpoint = Checkpoint(os.path.join(tmp, 'checkpoint.json'))
+            totals = asyncio.run(backfill('BTC-USD.CC', '2023-11-01', '2024-01-01', store, checkpoint, 'demo',
+                                          window_days=10, concurrency=4, base_url=stub.base_url))
+    finally:
+        stub.stop()
+    failed = [time_windows('2023-11-01', '2024-01-01', 10)[1]]
+    ok = (totals['failed_windows'] == failed and totals['windows'] == 7 and len(checkpoint.done) == 6
+          and totals['written'] == (61 - 10) * 288)
+    print(f"{totals['failed']} failed window(s) {totals['failed_windows']}, {len(checkpoint.done)} checkpointed, "
+          f"{totals['written']} bars written: {'OK' if ok else 'FAILED'}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resumable backfill of EODHD intraday bars.")
+    parser.add_argument('symbol', nargs='?', default='BTC-USD.CC', help="EODHD symbol")
+    parser.add_argument('--start', default='2020-01-01', help="First date (UTC)")
+    parser.add_argument('--end', default=str(pd.Timestamp.now(tz='UTC').date()), help="End date (exclusive)")
+    parser.add_argument('--interval', default='5m', choices=sorted(INTERVAL_SECONDS))
+    parser.add_argument('--window-days', type=int, default=None, help="Days per request")
+    parser.add_argument('--concurrency', type=int, default=8, help="Requests in flight")
+    parser.add_argument('--store', default='bar_store', help="Bar store directory")
+    parser.add_argument('--checkpoint', default='backfill_checkpoint.json', help="Checkpoint file")
+    parser.add_argument('--base-url', default=EODHD_URL, help="API root (e.g. a local stub)")
+    parser.add_argument('--bench', action='store_true', help="Benchmark against the local stub and exit")
+    parser.add_argument('--latency-ms', type=float, default=50.0, help="Stub latency per request in the benchmark")
+    parser.add_argument('--check', action='store_true', help="Check that failed windows are reported and exit")
+    args = parser.parse_args()
+
+    if args.bench:
+        benchmark(latency_ms=args.latency_ms)
+    elif args.check:
+        check_failures()
+    else:
+        token = os.getenv('EODHD_TOKEN')
+        if not token:
+            print("Set the EODHD_TOKEN environment variable.")
+        else:
+            totals = asyncio.run(backfill(args.symbol, args.start, args.end, BarStore(args.store),
+                                          Checkpoint(args.checkpoint), token, args.interval, args.window_days,
+                                          args.concurrency, args.base_url))
+            print(totals)
@@ -0,0 +1,205 @@
+## Local stand-in for the EODHD intraday endpoint
+## Serves recorded (or synthetic) candles on /api/intraday/<SYMBOL> with the from/to query parameters of the
+## real API, so that the fetchers can be tested and benchmarked offline. Optional latency per request, a request
+## rate above which it answers 429 like the real API, and ETag / If-None-Match revalidation. StubProcess runs the
+## server in a separate process, so that encoding its responses does not compete for the client's GIL in benchmarks.
+
+import json
+import time
+import hashlib
+import threading
+import multiprocessing
+import numpy as np
+import pandas as pd
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from collections import deque
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import urlparse, parse_qs
+
+
+def synthetic_candles(start: str, end: str, interval_seconds: int = 300, price: float = 30000.0,
+                      seed: int = 0) -> List[Dict]:
+    """
+    Random-walk candles in the EODHD intraday JSON format, every `interval_seconds` over [start, end).
+    """
+    times = np.arange(pd.Timestamp(start, tz='UTC').timestamp(), pd.Timestamp(end, tz='UTC').timestamp(),
+                      interval_seconds).astype(np.int64)
+    rng = np.random.default_rng(seed)
+    close = price * np.exp(np.cumsum(rng.normal(0, 0.002, len(times))))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.001, len(times))))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.001, len(times))))
+    volume = rng.lognormal(3, 1, len(times))
+    stamps = pd.to_datetime(times, unit='s').strftime('%Y-%m-%d %H:%M:%S')
+    return [{'timestamp': int(t), 'gmtoffset': 0, 'datetime': d, 'open': float(o), 'high': float(h),
+             'low': float(l), 'close': float(c), 'volume': float(v)}
+            for t, d, o, h, l, c, v in zip(times, stamps, open_, high, low, close, volume)]
+
+
+def load_recording(path: str) -> List[Dict]:
+    """
+    Candles recorded from the real endpoint (a JSON list as returned by /api/intraday).
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class StubEODHD:
+    """
+    Threaded HTTP server answering /api/intraday/<SYMBOL>?from=<unix>&to=<unix> from in-memory candles.
+    Without from/to it returns the last `default_rows` candles, like the real endpoint's default window.
+    """
+    def __init__(self, candles: Dict[str, List[Dict]], latency_ms: float = 0.0, default_rows: int = 2000,
+                 host: str = '127.0.0.1', port: int = 0, max_rps: Optional[float] = None):
+        """
+        Args:
+            candles (Dict[str, List[Dict]]): Candles per symbol, oldest first.
+            latency_ms (float): Delay added to every response.
+            default_rows (int): Candles returned when no range is requested.
+            host (str): Bind address.
+            port (int): Port (0 picks a free one).
+            max_rps (Optional[float]): Requests per second (over a sliding second) above which it answers 429.
+        """
+        self.candles = candles
+        self._times = {symbol: np.array([c['timestamp'] for c in rows], dtype=np.int64)
+                       for symbol, rows in candles.items()}
+        self.latency = latency_ms / 1000
+        self.default_rows = default_rows
+        self.max_rps = max_rps
+        self.requests = 0
+        self.throttled = 0
+        self._recent = deque()
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+    def extend(self, symbol: str, candles: List[Dict]):
+        """
+        Append newer candles to a symbol, e.g. to simulate live bars between polls.
+        """
+        with self._lock:
+            self.candles[symbol] = self.candles.get(symbol, []) + list(candles)
+            self._times[symbol] = np.array([c['timestamp'] for c in self.candles[symbol]], dtype=np.int64)
+
+    def select(self, symbol: str, start: Optional[int], end: Optional[int]) -> List[Dict]:
+        times = self._times.get(symbol)
+        if times is None:
+            return []
+        if start is None and end is None:
+            return self.candles[symbol][-self.default_rows:]
+        lo = 0 if start is None else int(np.searchsorted(times, start, side='left'))
+        hi = len(times) if end is None else int(np.searchsorted(times, end, side='right'))
+        return self.candles[symbol][lo:hi]
+
+    def _handler(self) -> type:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests += 1
+                    now = time.monotonic()
+                    while stub._recent and stub._recent[0] <= now - 1.0:
+                        stub._recent.popleft()
+                    throttled = stub.max_rps is not None and len(stub._recent) >= stub.max_rps
+                    if throttled:
+                        stub.throttled += 1
+                    else:
+                        stub._recent.append(now)
+                if throttled:
+                    self._reply(429, {'error': 'too many requests'}, {'Retry-After': '1'})
+                    return
+                url = urlparse(self.path)
+                if not url.path.startswith('/api/intraday/'):
+                    self._reply(404, {'error': 'not found'})
+                    return
+                query = parse_qs(url.query)
+                start = int(query['from'][0]) if 'from' in query else None
+                end = int(query['to'][0]) if 'to' in query else None
+                if stub.latency:
+                    time.sleep(stub.latency)
+                self._reply(200, stub.select(url.path.rsplit('/', 1)[-1], start, end))
+
+            def _reply(self, status: int, payload, headers: Optional[Dict[str, str]] = None):
+                body = json.dumps(payload).encode('utf-8')
+                headers = dict(headers or {})
+                if status == 200:
+                    etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+                    headers['ETag'] = etag
+                    if self.headers.get('If-None-Match') == etag:
+                        status, body = 304, b''
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> 'StubEODHD':
+        threading.Thread(target=self.server.serve_forever, name='eodhd-stub', daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _serve(symbols: Sequence[str], start: str, end: str, interval_seconds: int, latency_ms: float,
+           max_rps: Optional[float], address, stop):
+    stub = StubEODHD({symbol: synthetic_candles(start, end, interval_seconds) for symbol in symbols},
+                     latency_ms=latency_ms, max_rps=max_rps).start()
+    address.put(stub.base_url)
+    stop.wait()
+    stub.stop()
+
+
+class StubProcess:
+    """
+    StubEODHD serving synthetic candles from a separate (spawned) process.
+    """
+    def __init__(self, symbols: Sequence[str], start: str, end: str, interval_seconds: int = 300,
+                 latency_ms: float = 0.0, max_rps: Optional[float] = None):
+        """
+        Args:
+            symbols (Sequence[str]): Symbols to serve, each with synthetic_candles(start, end, interval_seconds).
+            start (str): First date of the candles.
+            end (str): End date (exclusive).
+            interval_seconds (int): Seconds between candles.
+            latency_ms (float): Delay added to every response.
+            max_rps (Optional[float]): Requests per second above which it answers 429.
+        """
+        self.args = (list(symbols), start, end, interval_seconds, latency_ms, max_rps)
+        self.base_url = None
+        self._process = None
+        self._stop = None
+
+    def start(self, timeout: float = 60.0) -> 'StubProcess':
+        context = multiprocessing.get_context('spawn')
+        address = context.Queue()
+        self._stop = context.Event()
+        self._process = context.Process(target=_serve, args=self.args + (address, self._stop), name='eodhd-stub',
+                                        daemon=True)
+        self._process.start()
+        self.base_url = address.get(timeout=timeout)
+        return self
+
+    def stop(self):
+        if self._process is not None:
+            self._stop.set()
+            self._process.join(10)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process = None
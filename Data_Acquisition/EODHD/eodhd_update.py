@@ -0,0 +1,178 @@
+## Incremental updater of the intraday bar store
+## Reads the last stored timestamp, requests only newer candles, checks their continuity (gaps, duplicates,
+## out-of-order or already-stored bars) and appends them as a new file, so each poll costs in proportion to the
+## new bars rather than the whole history.
+
+import os
+import sys
+import time
+import argparse
+import pandas as pd
+from typing import Dict, List, Optional
+
+from bar_store import BarStore
+from eodhd_backfill import EODHD_URL, INTERVAL_SECONDS, candles_to_frame, fetch_window, make_client
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'Tools', 'Quant_Toolbox'))
+from http_client import HttpClient
+
+
+def check_continuity(bars: pd.DataFrame, interval: str = '5m', last: Optional[pd.Timestamp] = None) -> Dict:
+    """
+    Continuity report of newly fetched bars, relative to the last stored bar.
+
+    Args:
+        bars (pd.DataFrame): New bars indexed by UTC datetime, in the order received.
+        interval (str): Bar interval ('1m', '5m', '1h').
+        last (Optional[pd.Timestamp]): Last stored bar time.
+
+    Returns:
+        Dict: 'duplicates' (repeated timestamps), 'stale' (bars at or before `last`), 'unordered' (bool),
+              'gaps' (list of (previous bar, next bar, missing bars)) and 'missing' (total missing bars).
+    """
+    step = pd.Timedelta(seconds=INTERVAL_SECONDS[interval])
+    index = pd.DatetimeIndex(bars.index)
+    report = {'duplicates': int(index.duplicated().sum()),
+              'stale': int((index <= last).sum()) if last is not None else 0,
+              'unordered': not index.is_monotonic_increasing,
+              'gaps': [], 'missing': 0}
+    times = index.unique().sort_values()
+    if last is not None:
+        times = times[times > last]
+        times = pd.DatetimeIndex([last]).append(times) if len(times) else times
+    if len(times) > 1:
+        deltas = times[1:] - times[:-1]
+        for i in (deltas > step).nonzero()[0]:
+            missing = int(deltas[i] / step) - 1
+            report['gaps'].append((times[i], times[i + 1], missing))
+            report['missing'] += missing
+    return report
+
+
+def update(symbol: str, store: BarStore, token: str, interval: str = '5m', base_url: str = EODHD_URL,
+           client: Optional[HttpClient] = None, now: Optional[pd.Timestamp] = None,
+           compact: bool = True) -> Dict:
+    """
+    Fetch the bars after the last stored one and append them.
+
+    Only bars closed by `now` are requested, so a poll never stores a candle that is still forming. When the
+    store is empty, the endpoint's default window is fetched (use eodhd_backfill.py for longer histories). Once a
+    month is over, its per-poll files are merged into one.
+
+    Args:
+        symbol (str): EODHD symbol, e.g. 'BTC-USD.CC'.
+        store (BarStore): Bar store.
+        token (str): EODHD API token.
+        interval (str): '1m', '5m' or '1h'.
+        base_url (str): API root (the local stub in tests).
+        client (Optional[HttpClient]): Pooled, rate-limited client reused between polls.
+        now (Optional[pd.Timestamp]): Current UTC time (defaults to the clock).
+        compact (bool): Merge the files of months that are over.
+
+    Returns:
+        Dict: Continuity report (see check_continuity) plus 'received' and 'written' rows.
+    """
+    client = client or make_client(1)
+    now = pd.Timestamp.now(tz='UTC') if now is None else pd.Timestamp(now)
+    step = INTERVAL_SECONDS[interval]
+    last = store.last_timestamp(symbol)
+    # The bar starting at t closes at t + step; request only bars already closed
+    end = int(now.timestamp()) - step
+    if last is None:
+        candles = fetch_window(client, symbol, end - 30 * 86400, end, token, interval, base_url)
+    elif int(last.timestamp()) + step > end:
+        candles = []
+    else:
+        candles = fetch_window(client, symbol, int(last.timestamp()) + step, end, token, interval, base_url)
+
+    # Checked in the order received: once sorted, out-of-order candles could no longer be detected
+    received = candles_to_frame(candles, sort=False)
+    report = check_continuity(received, interval, last)
+    bars = received.sort_index()
+    if report['duplicates'] or report['stale'] or report['unordered']:
+        print(f"{symbol}: {report['duplicates']} duplicate, {report['stale']} already stored bars, "
+              f"unordered={report['unordered']}; keeping the last copy of each new timestamp")
+    if report['gaps']:
+        print(f"{symbol}: {report['missing']} missing bars in {len(report['gaps'])} gaps, "
+              f"e.g. {report['gaps'][0][0]} -> {report['gaps'][0][1]}")
+    if last is not None and not bars.empty:
+        bars = bars[bars.index > last]
+    report['received'] = len(candles)
+    report['written'] = store.append(symbol, bars)
+
+    if compact:
+        current = now.strftime('%Y-%m')
+        for month in store.months(symbol):
+            if month < current and store.files(symbol, month) > 1:
+                store.compact(symbol, month)
+    return report
+
+
+def poll(symbols: List[str], store: BarStore, token: str, interval: str = '5m', base_url: str = EODHD_URL,
+         delay: float = 15.0, iterations: Optional[int] = None):
+    """
+    Update every symbol after each bar close (plus `delay` seconds for the provider to publish it).
+    """
+    client = make_client(len(symbols))
+    step = INTERVAL_SECONDS[interval]
+    done = 0
+    while iterations is None or done < iterations:
+        for symbol in symbols:
+            try:
+                report = update(symbol, store, token, interval, base_url, client)
+                print(f"{pd.Timestamp.now(tz='UTC'):%Y-%m-%d %H:%M:%S} {symbol}: {report['written']} new bars")
+            except Exception as e:
+                print(f"Error updating {symbol}: {e}")
+        done += 1
+        time.sleep(step - time.time() % step + delay)
+
+
+def benchmark(days: int = 365) -> None:
+    """
+    Time one poll adding a single bar to stores holding increasing histories, against rewriting a whole file.
+    """
+    import tempfile
+    from eodhd_stub import StubEODHD, synthetic_candles
+
+    end = pd.Timestamp('2024-01-01', tz='UTC')
+    for history_days in (30, days):
+        start = end - pd.Timedelta(days=history_days)
+        candles = synthetic_candles(str(start), str(end + pd.Timedelta(minutes=5)))
+        stub = StubEODHD({'BTC-USD.CC': candles[:-1]}).start()
+        with tempfile.TemporaryDirectory() as tmp:
+            store = BarStore(os.path.join(tmp, 'bars'))
+            store.append('BTC-USD.CC', candles_to_frame(candles[:-1]))
+            stub.extend('BTC-USD.CC', candles[-1:])
+            started = time.perf_counter()
+            report = update('BTC-USD.CC', store, 'demo', base_url=stub.base_url,
+                            now=end + pd.Timedelta(minutes=10), compact=False)
+            incremental = time.perf_counter() - started
+
+            path = os.path.join(tmp, 'full.parquet')
+            started = time.perf_counter()
+            candles_to_frame(candles).to_parquet(path)
+            rewrite = time.perf_counter() - started
+        stub.stop()
+        print(f"{history_days:4d} days stored: poll adding {report['written']} bar took {incremental * 1000:.1f} ms; "
+              f"rewriting the whole file {rewrite * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Append new EODHD intraday bars to the bar store.")
+    parser.add_argument('symbols', nargs='*', default=['BTC-USD.CC'], help="EODHD symbols")
+    parser.add_argument('--interval', default='5m', choices=sorted(INTERVAL_SECONDS))
+    parser.add_argument('--store', default='bar_store', help="Bar store directory")
+    parser.add_argument('--base-url', default=EODHD_URL, help="API root (e.g. a local stub)")
+    parser.add_argument('--poll', action='store_true', help="Keep polling after every bar close")
+    parser.add_argument('--bench', action='store_true', help="Benchmark against the local stub and exit")
+    args = parser.parse_args()
+
+    if args.bench:
+        benchmark()
+    elif not os.getenv('EODHD_TOKEN'):
+        print("Set the EODHD_TOKEN environment variable.")
+    elif args.poll:
+        poll(args.symbols, BarStore(args.store), os.getenv('EODHD_TOKEN'), args.interval, args.base_url)
+    else:
+        for symbol in args.symbols:
+            print(symbol, update(symbol, BarStore(args.store), os.getenv('EODHD_TOKEN'), args.interval, args.base_url))
@@ -20,6 +20,8 @@ import logging
 import pandas as pd
 import webbrowser
 
+from http_client import get_default_client
+
 # ---------------------------
 # Configuration and Setup
 # ---------------------------
@@ -52,7 +54,8 @@ def search_crossref(query: str, rows: int = 5) -> List[dict]:
     }
 
     try:
-        response = requests.get(url, params=params)
+        # Shared pooled client: rate-limited for api.crossref.org, retried on 429/5xx, cached when HTTP_CACHE_DIR is set
+        response = get_default_client().get(url, params=params)
         response.raise_for_status()
         data = response.json()
     except requests.exceptions.RequestException as e:
@@ -0,0 +1,155 @@
+## Schema-driven loader for FinViz screener exports
+## Numeric columns are parsed straight to float32/float64, text columns become categoricals,
+## and the parsed frame is cached as Parquet keyed by the source file's mtime and hash
+
+import os
+import json
+import hashlib
+import pandas as pd
+from typing import Dict, Optional
+
+
+# Numeric columns used by the Universe strategies and their target dtypes.
+# Prices, volumes and market caps keep float64; ratios and percentages fit in float32.
+FINVIZ_SCHEMA: Dict[str, str] = {
+    'Price': 'float64',
+    '20-Day Simple Moving Average': 'float64',
+    '50-Day Simple Moving Average': 'float64',
+    '200-Day Simple Moving Average': 'float64',
+    'Volume': 'float64',
+    'Average Volume': 'float64',
+    'Market Cap': 'float64',
+    'Current Ratio': 'float32',
+    'Profit Margin': 'float32',
+    'Return on Assets': 'float32',
+    'Return on Equity': 'float32',
+    'LT Debt/Equity': 'float32',
+    'P/E': 'float32',
+    'P/B': 'float32',
+    'EPS (ttm)': 'float32',
+}
+
+# Text columns that stay plain strings (unique keys gain nothing from a categorical)
+KEY_COLUMNS = ['Ticker']
+
+CACHE_INDEX_FILE = '_index.json'
+
+
+def _to_float(column: pd.Series, dtype: str) -> pd.Series:
+    """
+    Convert a raw FinViz text column such as '1,234.5' or '-3.2%' to floats, coercing errors to NaN.
+
+    Args:
+        column (pd.Series): Column read as strings.
+        dtype (str): Target dtype, 'float32' or 'float64'.
+
+    Returns:
+        pd.Series: Parsed column.
+    """
+    text = column.astype('string')
+    if text.str.contains(',', regex=False).any():
+        text = text.str.replace(',', '', regex=False)
+    if text.str.contains('%', regex=False).any():
+        text = text.str.replace('%', '', regex=False)
+    return pd.to_numeric(text, errors='coerce').astype(dtype)
+
+
+def parse_screener(data_path: str, schema: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """
+    Parse a FinViz CSV export into a typed DataFrame.
+
+    Args:
+        data_path (str): Path to the CSV file.
+        schema (Optional[Dict[str, str]]): Numeric column -> dtype mapping. Defaults to FINVIZ_SCHEMA.
+
+    Returns:
+        pd.DataFrame: Frame with stripped headers, float schema columns and categorical text columns.
+    """
+    schema = schema if schema is not None else FINVIZ_SCHEMA
+
+    # Read the header first so that schema columns can be forced to text whatever their padding
+    header = pd.read_csv(data_path, nrows=0).columns
+    raw_dtypes = {raw: 'string' for raw in header if raw.strip() in schema}
+    data = pd.read_csv(data_path, dtype=raw_dtypes)
+    data.columns = data.columns.str.strip()
+
+    for col, dtype in schema.items():
+        if col in data.columns:
+            data[col] = _to_float(data[col], dtype)
+
+    for col in data.columns:
+        if col in schema:
+            continue
+        if col in KEY_COLUMNS:
+            # Missing keys stay NaN (astype(str) would turn them into a 'nan' ticker that dropna keeps)
+            data[col] = data[col].where(data[col].isna(), data[col].astype(str))
+        elif data[col].dtype == object or pd.api.types.is_string_dtype(data[col]):
+            data[col] = data[col].astype('category')
+    return data
+
+
+def _file_hash(path: str) -> str:
+    sha = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def load_screener(data_path: str, cache_dir: Optional[str] = 'finviz_cache',
+                  schema: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """
+    Load a FinViz CSV export, reusing the cached Parquet parse when the file is unchanged.
+
+    The source file is hashed only when its mtime or size differs from the cached entry,
+    and the Parquet file is named after the content hash, so touching a file without
+    changing it does not trigger a reparse.
+
+    Args:
+        data_path (str): Path to the CSV file.
+        cache_dir (Optional[str]): Directory for cached Parquet files. If None, always parses.
+        schema (Optional[Dict[str, str]]): Numeric column -> dtype mapping. Defaults to FINVIZ_SCHEMA.
+
+    Returns:
+        pd.DataFrame: Typed screener data.
+    """
+    schema = schema if schema is not None else FINVIZ_SCHEMA
+    if cache_dir is None:
+        return parse_screener(data_path, schema)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    index_path = os.path.join(cache_dir, CACHE_INDEX_FILE)
+    index = {}
+    if os.path.exists(index_path):
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+
+    source = os.path.realpath(data_path)
+    stat = os.stat(source)
+    entry = index.get(source)
+    if entry and entry['mtime'] == stat.st_mtime and entry['size'] == stat.st_size:
+        digest = entry['hash']
+    else:
+        digest = _file_hash(source)
+
+    # The schema is part of the key so that a different schema never reuses another parse
+    schema_key = hashlib.sha1(json.dumps(schema, sort_keys=True).encode()).hexdigest()[:8]
+    cache_path = os.path.join(cache_dir, f"{digest}-{schema_key}.parquet")
+    if os.path.exists(cache_path):
+        try:
+            data = pd.read_parquet(cache_path)
+        except Exception as e:
+            print(f"Error reading cached screener {cache_path}: {e}")
+            data = None
+    else:
+        data = None
+
+    if data is None:
+        data = parse_screener(data_path, schema)
+        data.to_parquet(cache_path, index=False)
+
+    if index.get(source) != {'mtime': stat.st_mtime, 'size': stat.st_size, 'hash': digest}:
+        index[source] = {'mtime': stat.st_mtime, 'size': stat.st_size, 'hash': digest}
+        with open(index_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=1)
+    return data
@@ -0,0 +1,450 @@
+## Shared HTTP client of the data fetchers
+## One requests.Session with keep-alive connection pools, a token-bucket rate limiter per host, retries with
+## jittered exponential backoff (honouring Retry-After), an on-disk response cache revalidated with ETag once its
+## TTL expires, and per-host latency metrics. Libraries that manage their own connections (yfinance) can still go
+## through the limiter, retries and metrics with HttpClient.call.
+
+import os
+import json
+import time
+import random
+import hashlib
+import threading
+import numpy as np
+import requests
+from collections import deque
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+
+# Requests per second and burst size per host; hosts not listed are only limited by `default_rate`
+DEFAULT_RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+    'eodhd.com': (15.0, 30),              # 1000 requests per minute on the paid plans
+    'api.crossref.org': (10.0, 10),       # well inside the polite pool's 50 requests per second
+    'query1.finance.yahoo.com': (2.0, 4),
+    'query2.finance.yahoo.com': (2.0, 4),
+}
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Methods that may be sent twice; others are only retried when the request never reached the server
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+
+# Network errors of requests and curl_cffi (yfinance) both derive from OSError; programming errors do not
+CALL_RETRY_ERRORS: Tuple[type, ...] = (OSError,)
+
+# Query parameters whose values are never written to the response cache
+SENSITIVE_PARAMS = ('api_token', 'apikey', 'api_key', 'token', 'access_token', 'key', 'secret', 'password')
+
+
+def redact_url(url: str) -> str:
+    """
+    URL with the values of SENSITIVE_PARAMS query parameters replaced by 'REDACTED'.
+    """
+    parts = urlparse(url)
+    if not parts.query:
+        return url
+    query = [(name, 'REDACTED' if name.lower() in SENSITIVE_PARAMS else value)
+             for name, value in parse_qsl(parts.query, keep_blank_values=True)]
+    return parts._replace(query=urlencode(query)).geturl()
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, at most `burst` stored.
+    """
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Take one token, sleeping until one is available.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Reserve the token now (the balance may go negative) so concurrent callers queue in order
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float):
+        """
+        Hold back every caller for `seconds`, e.g. after a 429 with Retry-After.
+        """
+        with self._lock:
+            # Not cumulative: simultaneous 429s of one burst pause the bucket once
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+
+class ResponseCache:
+    """
+    On-disk cache of GET responses: one body file and one JSON header file per request key.
+    """
+    def __init__(self, cache_dir: str = 'http_cache'):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(method: str, url: str, params: Optional[Dict] = None) -> str:
+        query = urlencode(sorted((params or {}).items()), doseq=True)
+        return hashlib.sha1(f"{method.upper()} {url}?{query}".encode('utf-8')).hexdigest()
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        return os.path.join(self.cache_dir, f"{key}.json"), os.path.join(self.cache_dir, f"{key}.body")
+
+    def load(self, key: str) -> Optional[Dict]:
+        """
+        Cached entry ('status', 'headers', 'url', 'stored' time and 'content' bytes), or None.
+        """
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            with open(body_path, 'rb') as f:
+                entry['content'] = f.read()
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def save(self, key: str, response: requests.Response):
+        meta_path, body_path = self._paths(key)
+        # Body first, then metadata, each via a temporary file, so a reader never sees a half-written entry
+        for path, mode, payload in ((body_path, 'wb', response.content),
+                                    (meta_path, 'w', json.dumps({'status': response.status_code,
+                                                                 'headers': dict(response.headers),
+                                                                 'url': redact_url(response.url),
+                                                                 'stored': time.time()}))):
+            partial = f"{path}.{threading.get_ident()}.tmp"
+            with open(partial, mode, **({} if 'b' in mode else {'encoding': 'utf-8'})) as f:
+                f.write(payload)
+            os.replace(partial, path)
+
+    def touch(self, key: str):
+        """Restart the TTL of an entry revalidated by a 304."""
+        meta_path, _ = self._paths(key)
+        entry = self.load(key)
+        if entry is not None:
+            entry.pop('content')
+            entry['stored'] = time.time()
+            partial = f"{meta_path}.{threading.get_ident()}.tmp"
+            with open(partial, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(partial, meta_path)
+
+
+def _cached_response(entry: Dict) -> requests.Response:
+    response = requests.Response()
+    response.status_code = entry['status']
+    response.headers = CaseInsensitiveDict(entry['headers'])
+    response.url = entry['url']
+    response._content = entry['content']
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    response.from_cache = True
+    return response
+
+
+class HttpClient:
+    """
+    Pooled, rate-limited HTTP client with retries, ETag/TTL caching and latency metrics.
+    """
+    def __init__(self, pool_size: int = 16, rate_limits: Optional[Dict[str, Tuple[float, int]]] = None,
+                 default_rate: Optional[Tuple[float, int]] = None, retries: int = 4, backoff: float = 0.5,
+                 max_backoff: float = 30.0, timeout: float = 30.0, cache_dir: Optional[str] = None,
+                 ttl: float = 0.0, latency_window: int = 10_000):
+        """
+        Args:
+            pool_size (int): Keep-alive connections kept per host.
+            rate_limits (Optional[Dict[str, Tuple[float, int]]]): (requests per second, burst) per host;
+                                                                  defaults to DEFAULT_RATE_LIMITS.
+            default_rate (Optional[Tuple[float, int]]): Limit of the other hosts (None: unlimited).
+            retries (int): Retries after a connection error, timeout, 429 or 5xx (see `request` for non-idempotent
+                           methods).
+            backoff (float): First backoff in seconds, doubled at each retry and jittered by +/-50%.
+            max_backoff (float): Longest backoff.
+            timeout (float): Request timeout in seconds.
+            cache_dir (Optional[str]): Directory of the response cache (None: no caching).
+            ttl (float): Default seconds a cached GET is served without contacting the server.
+            latency_window (int): Recent latencies kept per host for the percentiles of `metrics()`.
+        """
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.rate_limits = dict(DEFAULT_RATE_LIMITS if rate_limits is None else rate_limits)
+        self.default_rate = default_rate
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.cache = ResponseCache(cache_dir) if cache_dir else None
+        self.ttl = ttl
+        self.latency_window = latency_window
+        self._buckets: Dict[str, Optional[TokenBucket]] = {}
+        self._metrics: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    # -- Rate limiting --
+    def set_rate(self, host: str, rate: float, burst: int = 1):
+        """Set (or replace) the limit of a host."""
+        with self._lock:
+            self.rate_limits[host] = (rate, burst)
+            self._buckets[host] = TokenBucket(rate, burst)
+
+    def bucket(self, host: str) -> Optional[TokenBucket]:
+        """Token bucket of a host (None when unlimited); 'www.' and sub-domains share a listed parent's limit."""
+        with self._lock:
+            if host not in self._buckets:
+                limit = next((self.rate_limits[h] for h in self.rate_limits
+                              if host == h or host.endswith(f".{h}")), self.default_rate)
+                self._buckets[host] = TokenBucket(*limit) if limit else None
+            return self._buckets[host]
+
+    # -- Metrics --
+    def _record(self, host: str, seconds: float, status: Optional[int], waited: float = 0.0,
+                retries: int = 0, cached: bool = False):
+        with self._lock:
+            stats = self._metrics.setdefault(host, {'requests': 0, 'cache_hits': 0, 'not_modified': 0,
+                                                    'retries': 0, 'errors': 0, 'throttled_s': 0.0,
+                                                    'latencies': deque(maxlen=self.latency_window)})
+            stats['requests'] += 1
+            stats['cache_hits'] += cached
+            stats['not_modified'] += status == 304
+            stats['retries'] += retries
+            stats['errors'] += status is None or status >= 400
+            stats['throttled_s'] += waited
+            if not cached:
+                stats['latencies'].append(seconds)
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """
+        Per-host counters and network latency percentiles (milliseconds, over the last `latency_window` requests),
+        excluding rate-limit waits.
+        """
+        with self._lock:
+            report = {}
+            for host, stats in self._metrics.items():
+                latencies = np.array(stats['latencies']) * 1000
+                report[host] = {k: v for k, v in stats.items() if k != 'latencies'}
+                report[host]['throttled_s'] = round(stats['throttled_s'], 3)
+                if len(latencies):
+                    for name, q in (('p50_ms', 50), ('p95_ms', 95), ('p99_ms', 99)):
+                        report[host][name] = round(float(np.percentile(latencies, q)), 2)
+                    report[host]['max_ms'] = round(float(latencies.max()), 2)
+            return report
+
+    def reset_metrics(self):
+        with self._lock:
+            self._metrics.clear()
+
+    # -- Requests --
+    def _sleep_before_retry(self, attempt: int, bucket: Optional[TokenBucket], retry_after: Optional[str]):
+        delay = min(self.max_backoff, self.backoff * 2 ** attempt) * random.uniform(0.5, 1.5)
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                pass
+            if bucket is not None:
+                # Every thread of this host waits, not only the one that was told to
+                bucket.pause(delay)
+        time.sleep(delay)
+
+    def request(self, method: str, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+                ttl: Optional[float] = None, timeout: Optional[float] = None, retry_unsafe: bool = False,
+                **kwargs) -> requests.Response:
+        """
+        Send a request through the host's rate limiter, retrying connection errors, timeouts, 429 and 5xx.
+
+        Non-idempotent methods (POST, PATCH) may already have taken effect after a read timeout or a 5xx, so they
+        are only retried on connection errors and 429 unless `retry_unsafe` is set.
+
+        GET responses are cached when the client has a cache directory and `ttl` (or the client's ttl) is positive:
+        within the TTL the cached response is returned without a request; after it, the request carries
+        If-None-Match and a 304 answer renews the cached copy.
+
+        Args:
+            method (str): HTTP method.
+            url (str): URL.
+            params (Optional[Dict]): Query parameters.
+            headers (Optional[Dict]): Extra headers.
+            ttl (Optional[float]): Cache TTL of this request in seconds (0 disables caching).
+            timeout (Optional[float]): Request timeout, defaults to the client's.
+            retry_unsafe (bool): Retry a non-idempotent request on timeouts and 5xx as well.
+            **kwargs: Passed to requests.Session.request (json, data, ...).
+
+        Returns:
+            requests.Response: Final response (possibly an error status once retries are exhausted); cached
+                               responses have `from_cache` set to True.
+
+        Raises:
+            requests.RequestException: Connection error or timeout after the last retry.
+        """
+        host = urlparse(url).hostname or ''
+        ttl = self.ttl if ttl is None else ttl
+        key, entry = None, None
+        if self.cache is not None and ttl > 0 and method.upper() == 'GET':
+            key = ResponseCache.key(method, url, params)
+            entry = self.cache.load(key)
+            if entry is not None and time.time() - entry['stored'] < ttl:
+                self._record(host, 0.0, entry['status'], cached=True)
+                return _cached_response(entry)
+            etag = entry and CaseInsensitiveDict(entry['headers']).get('ETag')
+            if etag:
+                headers = {**(headers or {}), 'If-None-Match': etag}
+
+        bucket = self.bucket(host)
+        idempotent = retry_unsafe or method.upper() in IDEMPOTENT_METHODS
+        waited = 0.0
+        for attempt in range(self.retries + 1):
+            if bucket is not None:
+                waited += bucket.acquire()
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, params=params, headers=headers,
+                                                timeout=timeout or self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                # ConnectTimeout is a ConnectionError; a ReadTimeout means the server may have acted on the request
+                if attempt == self.retries or not (idempotent or isinstance(e, requests.ConnectionError)):
+                    self._record(host, time.perf_counter() - started, None, waited, attempt)
+                    raise
+                self._sleep_before_retry(attempt, bucket, None)
+                continue
+            retryable = response.status_code in RETRY_STATUSES if idempotent else response.status_code == 429
+            if retryable and attempt < self.retries:
+                self._sleep_before_retry(attempt, bucket, response.headers.get('Retry-After'))
+                continue
+            break
+        self._record(host, time.perf_counter() - started, response.status_code, waited, attempt)
+
+        if key is not None:
+            if response.status_code == 304 and entry is not None:
+                self.cache.touch(key)
+                return _cached_response(entry)
+            if response.status_code == 200:
+                self.cache.save(key, response)
+        response.from_cache = False
+        return response
+
+    def get(self, url: str, params: Optional[Dict] = None, **kwargs) -> requests.Response:
+        return self.request('GET', url, params=params, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def call(self, host: str, fn: Callable, *args, retry_on: Tuple[type, ...] = CALL_RETRY_ERRORS,
+             retry_if: Optional[Callable[[Any], bool]] = None, **kwargs):
+        """
+        Run a third-party fetch (e.g. yf.download) under the host's rate limit, retries and metrics.
+
+        Args:
+            host (str): Host whose rate limit applies, e.g. 'query1.finance.yahoo.com'.
+            fn (Callable): Function performing the request(s).
+            retry_on (Tuple[type, ...]): Exceptions that trigger a retry; others propagate at once.
+            retry_if (Optional[Callable[[Any], bool]]): Predicate on the result that triggers a retry, for libraries
+                                                        that report failures as empty results (yf.download).
+
+        Returns:
+            Whatever `fn` returns; after the last retry, the last result even if `retry_if` still rejects it.
+        """
+        bucket = self.bucket(host)
+        waited = 0.0
+        for attempt in range(self.retries + 1):
+            if bucket is not None:
+                waited += bucket.acquire()
+            started = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except retry_on:
+                if attempt == self.retries:
+                    self._record(host, time.perf_counter() - started, None, waited, attempt)
+                    raise
+                self._sleep_before_retry(attempt, bucket, None)
+                continue
+            if retry_if is not None and retry_if(result):
+                if attempt == self.retries:
+                    self._record(host, time.perf_counter() - started, None, waited, attempt)
+                    return result
+                self._sleep_before_retry(attempt, bucket, None)
+                continue
+            self._record(host, time.perf_counter() - started, 200, waited, attempt)
+            return result
+
+    def close(self):
+        self.session.close()
+
+
+_default_client: Optional[HttpClient] = None
+_default_lock = threading.Lock()
+
+
+def get_default_client() -> HttpClient:
+    """
+    Return the process-wide HttpClient shared by the fetchers that are not given their own.
+    The cache directory and default TTL come from the HTTP_CACHE_DIR and HTTP_CACHE_TTL environment variables.
+    """
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HttpClient(cache_dir=os.getenv('HTTP_CACHE_DIR') or None,
+                                         ttl=float(os.getenv('HTTP_CACHE_TTL', '0')))
+    return _default_client
+
+
+def benchmark(n_requests: int = 300, rate: float = 50.0, server_rate: float = 60.0, threads: int = 16) -> None:
+    """
+    Hammer a local server that answers 429 above `server_rate` requests per second, with and without the
+    client-side limiter, then show the ETag cache.
+    """
+    import sys
+    from concurrent.futures import ThreadPoolExecutor
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'Data_Acquisition', 'EODHD'))
+    from eodhd_stub import StubEODHD, synthetic_candles
+
+    stub = StubEODHD({'BTC-USD.CC': synthetic_candles('2023-12-01', '2024-01-01')}, latency_ms=5,
+                     max_rps=server_rate).start()
+    url = f"{stub.base_url}/intraday/BTC-USD.CC"
+    try:
+        for label, limit in (('unlimited', None), (f'{rate:.0f} req/s bucket', (rate, int(rate // 10)))):
+            client = HttpClient(pool_size=threads, rate_limits={}, default_rate=limit, retries=6, backoff=0.05)
+            stub.requests = stub.throttled = 0
+            # Let the server's one-second window of the previous run expire
+            time.sleep(1.1)
+            started = time.perf_counter()
+            with ThreadPoolExecutor(threads) as pool:
+                statuses = list(pool.map(lambda i: client.get(url, params={'from': 1701388800 + 300 * i,
+                                                                           'to': 1701388800 + 300 * i + 3000}).status_code,
+                                         range(n_requests)))
+            seconds = time.perf_counter() - started
+            stats = client.metrics()['127.0.0.1']
+            print(f"{label:>18}: {statuses.count(200)}/{n_requests} ok in {seconds:.2f}s "
+                  f"({statuses.count(200) / seconds:.0f} ok/s), {stub.throttled} answered 429, "
+                  f"{stub.requests} sent, p50 {stats['p50_ms']} ms, p99 {stats['p99_ms']} ms")
+
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            client = HttpClient(rate_limits={}, cache_dir=tmp, ttl=0.2)
+            stub.requests = 0
+            for _ in range(3):
+                client.get(url)
+            time.sleep(0.3)
+            client.get(url)
+            print(f"ETag cache: 4 GETs sent {stub.requests} requests; {client.metrics()['127.0.0.1']}")
+    finally:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    benchmark()
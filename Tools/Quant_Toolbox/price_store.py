@@ -0,0 +1,305 @@
+## On-disk OHLCV cache shared by the quantanalyst.py Universe classes
+## Parquet file per ticker + JSON bookkeeping of the date range already on disk
+
+import os
+import json
+import threading
+import pandas as pd
+import yfinance as yf
+from yfinance.exceptions import YFRateLimitError
+from typing import Dict, List, Optional, Tuple
+
+from http_client import HttpClient, get_default_client
+
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+
+
+class PriceProvider:
+    """
+    Base class for a source of daily OHLCV bars.
+    Subclasses return one DataFrame per ticker indexed by date.
+    """
+    def fetch(self, tickers: List[str], start: str, end: str) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch daily bars for the given tickers.
+
+        Args:
+            tickers (List[str]): Ticker symbols to fetch.
+            start (str): First date to fetch (inclusive, 'YYYY-MM-DD').
+            end (str): Last date to fetch (exclusive, 'YYYY-MM-DD').
+
+        Returns:
+            Dict[str, pd.DataFrame]: OHLCV frame per ticker. Tickers without data are omitted.
+        """
+        raise NotImplementedError
+
+
+class YFinanceProvider(PriceProvider):
+    """
+    Fetches daily bars from Yahoo Finance with a single multi-ticker download.
+    yfinance keeps its own (curl_cffi) session, so the shared HttpClient only applies its Yahoo rate limit,
+    retries and latency metrics around each download.
+    """
+    def __init__(self, client: Optional[HttpClient] = None):
+        self.client = client
+
+    def fetch(self, tickers: List[str], start: str, end: str) -> Dict[str, pd.DataFrame]:
+        if not tickers:
+            return {}
+        client = self.client or get_default_client()
+        # yf.download logs failures (rate limits included) and returns an empty frame, so retry on that too
+        raw = client.call('query1.finance.yahoo.com', yf.download, tickers, start=start, end=end, progress=False,
+                          group_by='ticker', auto_adjust=False, retry_on=(OSError, YFRateLimitError),
+                          retry_if=lambda frame: frame is None or frame.empty)
+        if raw is None or raw.empty:
+            return {}
+
+        frames = {}
+        for ticker in tickers:
+            if isinstance(raw.columns, pd.MultiIndex):
+                if ticker in raw.columns.get_level_values(0):
+                    data = raw[ticker]
+                elif ticker in raw.columns.get_level_values(-1):
+                    data = raw.xs(ticker, axis=1, level=-1)
+                else:
+                    continue
+            else:
+                data = raw
+            data = data.dropna(how='all')
+            if not data.empty:
+                frames[ticker] = data[[c for c in OHLCV_COLUMNS if c in data.columns]]
+        return frames
+
+
+class FixtureProvider(PriceProvider):
+    """
+    Reads daily bars from local '<TICKER>.csv' or '<TICKER>.parquet' files.
+    Used as the offline fallback when the network provider is unavailable.
+    """
+    def __init__(self, fixture_dir: str = 'price_fixtures'):
+        """
+        Args:
+            fixture_dir (str): Directory holding one fixture file per ticker.
+        """
+        self.fixture_dir = fixture_dir
+
+    def fetch(self, tickers: List[str], start: str, end: str) -> Dict[str, pd.DataFrame]:
+        frames = {}
+        for ticker in tickers:
+            parquet_path = os.path.join(self.fixture_dir, f"{ticker}.parquet")
+            csv_path = os.path.join(self.fixture_dir, f"{ticker}.csv")
+            if os.path.exists(parquet_path):
+                data = pd.read_parquet(parquet_path)
+            elif os.path.exists(csv_path):
+                data = pd.read_csv(csv_path, index_col=0, parse_dates=True)
+            else:
+                continue
+            data = data.sort_index()
+            data = data.loc[(data.index >= pd.Timestamp(start)) & (data.index < pd.Timestamp(end))]
+            if not data.empty:
+                frames[ticker] = data
+        return frames
+
+
+class PriceStore:
+    """
+    Read-through cache of daily OHLCV bars stored as one Parquet file per ticker.
+
+    The covered date range of every ticker is recorded in a JSON index so that
+    only the missing head or tail of a requested window is fetched from the provider.
+    """
+    INDEX_FILE = '_ranges.json'
+
+    def __init__(self, cache_dir: str = 'price_cache',
+                 provider: Optional[PriceProvider] = None,
+                 fallback: Optional[PriceProvider] = None):
+        """
+        Args:
+            cache_dir (str): Directory for the Parquet files and the range index.
+            provider (Optional[PriceProvider]): Primary source. Defaults to Yahoo Finance.
+            fallback (Optional[PriceProvider]): Source used when the primary one fails.
+                                                Defaults to fixtures in 'price_fixtures'.
+        """
+        self.cache_dir = cache_dir
+        self.provider = provider if provider is not None else YFinanceProvider()
+        self.fallback = fallback if fallback is not None else FixtureProvider()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._ranges = self._load_index()
+        self._frames: Dict[str, pd.DataFrame] = {}
+        # Guards the range index and the Parquet files; provider calls run outside it
+        self._lock = threading.RLock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def _index_path(self) -> str:
+        return os.path.join(self.cache_dir, self.INDEX_FILE)
+
+    def _ticker_path(self, ticker: str) -> str:
+        return os.path.join(self.cache_dir, f"{ticker.replace('/', '_')}.parquet")
+
+    def _load_index(self) -> Dict[str, List[str]]:
+        if not os.path.exists(self._index_path()):
+            return {}
+        with open(self._index_path(), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_index(self):
+        with open(self._index_path(), 'w', encoding='utf-8') as f:
+            json.dump(self._ranges, f, indent=1, sort_keys=True)
+
+    def _read_ticker(self, ticker: str) -> pd.DataFrame:
+        if ticker not in self._frames:
+            path = self._ticker_path(ticker)
+            self._frames[ticker] = pd.read_parquet(path) if os.path.exists(path) else pd.DataFrame()
+        return self._frames[ticker]
+
+    def _missing_ranges(self, ticker: str, start: str, end: str) -> List[Tuple[str, str]]:
+        """
+        Return the (start, end) windows of [start, end) not yet covered on disk.
+        """
+        if ticker not in self._ranges:
+            return [(start, end)]
+        covered_start, covered_end = self._ranges[ticker]
+        missing = []
+        if start < covered_start:
+            missing.append((start, covered_start))
+        if end > covered_end:
+            missing.append((covered_end, end))
+        return missing
+
+    def _fetch(self, tickers: List[str], start: str, end: str) -> Tuple[Dict[str, pd.DataFrame], bool]:
+        """
+        Fetch a window from the primary provider.
+
+        Returns:
+            Tuple[Dict[str, pd.DataFrame], bool]: Frames per ticker and whether the provider answered.
+        """
+        try:
+            return self.provider.fetch(tickers, start, end), True
+        except Exception as e:
+            print(f"Error fetching {len(tickers)} tickers from provider: {e}")
+            return {}, False
+
+    def _update(self, ticker: str, new_data: Optional[pd.DataFrame], start: str, end: str):
+        """
+        Merge freshly fetched bars into the ticker file and extend its covered range.
+        """
+        data = self._read_ticker(ticker)
+        if new_data is not None and not new_data.empty:
+            new_data = new_data.copy()
+            new_data.index = pd.to_datetime(new_data.index).tz_localize(None)
+            data = pd.concat([data, new_data]) if not data.empty else new_data
+            data = data[~data.index.duplicated(keep='last')].sort_index()
+            data.to_parquet(self._ticker_path(ticker))
+            self._frames[ticker] = data
+
+        covered = self._ranges.get(ticker, [start, end])
+        self._ranges[ticker] = [min(covered[0], start), max(covered[1], end)]
+
+    def get(self, tickers: List[str], start: str, end: str) -> Dict[str, pd.DataFrame]:
+        """
+        Return daily bars for every ticker over [start, end), fetching only missing ranges.
+
+        Args:
+            tickers (List[str]): Ticker symbols.
+            start (str): First date (inclusive, 'YYYY-MM-DD').
+            end (str): Last date (exclusive, 'YYYY-MM-DD').
+
+        Returns:
+            Dict[str, pd.DataFrame]: OHLCV frame per ticker. Tickers without data are omitted.
+        """
+        tickers = list(dict.fromkeys(tickers))
+
+        # Group tickers by missing window so that each window is a single provider call
+        pending: Dict[Tuple[str, str], List[str]] = {}
+        with self._lock:
+            for ticker in tickers:
+                for window in self._missing_ranges(ticker, start, end):
+                    pending.setdefault(window, []).append(ticker)
+
+        unresolved = set()
+        for (window_start, window_end), window_tickers in pending.items():
+            frames, answered = self._fetch(window_tickers, window_start, window_end)
+            with self._lock:
+                for ticker in window_tickers:
+                    # An empty answer for a known ticker (e.g. a non-trading day) still counts as covered;
+                    # unknown tickers and provider failures are retried on the next call
+                    if ticker in frames or (answered and ticker in self._ranges):
+                        self._update(ticker, frames.get(ticker), window_start, window_end)
+                    else:
+                        unresolved.add(ticker)
+        if pending:
+            with self._lock:
+                self._save_index()
+
+        # Fixture data is served but never written to the cache, so it cannot mask real data later
+        offline = {}
+        if unresolved and self.fallback is not None:
+            offline = self.fallback.fetch(sorted(unresolved), start, end)
+
+        result = {}
+        for ticker in tickers:
+            if ticker in offline:
+                data = offline[ticker]
+            else:
+                with self._lock:
+                    data = self._read_ticker(ticker)
+            if data.empty:
+                continue
+            window = data.loc[(data.index >= pd.Timestamp(start)) & (data.index < pd.Timestamp(end))]
+            if not window.empty:
+                result[ticker] = window.copy()
+        return result
+
+    def history(self, ticker: str, start: str, end: str) -> pd.DataFrame:
+        """
+        Return daily bars of a single ticker over [start, end), or an empty frame.
+        """
+        return self.get([ticker], start, end).get(ticker, pd.DataFrame())
+
+    def panels(self, tickers: List[str], start: str, end: str, fields: List[str]) -> Dict[str, pd.DataFrame]:
+        """
+        Return several fields of several tickers as wide (date x ticker) frames from a single read.
+
+        Args:
+            tickers (List[str]): Ticker symbols.
+            start (str): First date (inclusive, 'YYYY-MM-DD').
+            end (str): Last date (exclusive, 'YYYY-MM-DD').
+            fields (List[str]): OHLCV columns to extract, e.g. ['High', 'Low', 'Close'].
+
+        Returns:
+            Dict[str, pd.DataFrame]: One frame per field, aligned on the union of dates.
+                                     Tickers without data are omitted.
+        """
+        frames = self.get(tickers, start, end)
+        return {
+            field: pd.DataFrame({ticker: data[field] for ticker, data in frames.items() if field in data.columns})
+            for field in fields
+        }
+
+    def panel(self, tickers: List[str], start: str, end: str, field: str = 'Adj Close') -> pd.DataFrame:
+        """
+        Return one field of several tickers as a wide (date x ticker) frame.
+        """
+        return self.panels(tickers, start, end, [field])[field]
+
+
+_default_store: Optional[PriceStore] = None
+
+
+def get_default_store() -> PriceStore:
+    """
+    Return the process-wide PriceStore shared by every Universe that is not given its own.
+    """
+    global _default_store
+    if _default_store is None:
+        _default_store = PriceStore()
+    return _default_store
@@ -0,0 +1,147 @@
+## Headless rendering of Universe.profile results
+## Figures are drawn with the Agg canvas in a background thread pool, so batch jobs never block on a display
+
+import os
+import re
+import json
+import math
+from concurrent.futures import Future, ThreadPoolExecutor
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from typing import Dict, List, Optional, Tuple
+
+
+def _show_message(ax, message: str, title: str):
+    ax.text(0.5, 0.5, message, horizontalalignment='center', verticalalignment='center', fontsize=12)
+    ax.set_title(title)
+    ax.axis('off')
+
+
+def draw_profile(axs, profile: Dict, universe_name: str):
+    """
+    Draw the volatility/return scatter and the portfolio vs benchmark comparison on two axes.
+
+    Args:
+        axs: Pair of matplotlib axes.
+        profile (Dict): Arrays returned by Universe.profile_data.
+        universe_name (str): Name of the sub-universe for the plot titles.
+    """
+    # ------------------ Scatter Plot ------------------
+    axs[0].scatter(profile['volatility'], profile['cumulative_return'], alpha=0.7)
+    for i, ticker in enumerate(profile['tickers']):
+        axs[0].annotate(ticker, (profile['volatility'][i], profile['cumulative_return'][i]), fontsize=9)
+    axs[0].set_xlabel('Volatility (Std Dev of Daily Returns)')
+    axs[0].set_ylabel('Cumulative Return (Last 3 Months)')
+    axs[0].set_title(f'Volatility vs. Return for {universe_name}')
+    axs[0].grid(True)
+
+    # ------------------ Portfolio vs Benchmark Plot ------------------
+    benchmark = profile['benchmark_ticker']
+    title = f'Portfolio vs {benchmark} for {universe_name}'
+    if profile['message'] is not None:
+        _show_message(axs[1], profile['message'], title)
+        return
+    axs[1].plot(profile['dates'], profile['portfolio'], label='Equally Weighted Portfolio')
+    axs[1].plot(profile['dates'], profile['benchmark'], label=f'{benchmark} Benchmark')
+    axs[1].set_xlabel('Date')
+    axs[1].set_ylabel('Cumulative Return')
+    axs[1].set_title(title)
+    axs[1].legend()
+    axs[1].grid(True)
+
+
+def _finite(values) -> List[Optional[float]]:
+    # NaN/inf have no JSON representation; json.dump would write bare NaN/Infinity tokens
+    return [float(v) if math.isfinite(v) else None for v in values]
+
+
+def profile_to_json(profile: Dict, universe_name: str) -> Dict:
+    """
+    Convert profile arrays to a JSON-serializable dictionary; missing (NaN or infinite) statistics become None.
+    """
+    return {
+        'universe_name': universe_name,
+        'benchmark_ticker': profile['benchmark_ticker'],
+        'tickers': list(profile['tickers']),
+        'volatility': _finite(profile['volatility']),
+        'cumulative_return': _finite(profile['cumulative_return']),
+        'dates': [str(d)[:10] for d in profile['dates']],
+        'portfolio': _finite(profile['portfolio']),
+        'benchmark': _finite(profile['benchmark']),
+        'message': profile['message'],
+    }
+
+
+class ProfileRenderer:
+    """
+    Writes profile artifacts (PNG, SVG and/or JSON) asynchronously without any display.
+    """
+    FORMATS = ('png', 'svg', 'json')
+
+    def __init__(self, output_dir: str = 'profiles', formats: Tuple[str, ...] = ('png',),
+                 max_workers: int = 4, dpi: int = 100):
+        """
+        Args:
+            output_dir (str): Directory receiving one file per universe and format.
+            formats (Tuple[str, ...]): Any of 'png', 'svg' and 'json'.
+            max_workers (int): Number of background rendering threads.
+            dpi (int): Resolution of PNG files.
+        """
+        unknown = [fmt for fmt in formats if fmt not in self.FORMATS]
+        if unknown:
+            raise ValueError(f"Unsupported profile formats: {unknown}")
+        self.output_dir = output_dir
+        self.formats = formats
+        self.dpi = dpi
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def _path(self, universe_name: str, fmt: str) -> str:
+        stem = re.sub(r'[^A-Za-z0-9_-]+', '_', universe_name).strip('_') or 'universe'
+        return os.path.join(self.output_dir, f"{stem}.{fmt}")
+
+    def _render(self, profile: Dict, universe_name: str) -> List[str]:
+        paths = []
+        if 'json' in self.formats:
+            path = self._path(universe_name, 'json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(profile_to_json(profile, universe_name), f, allow_nan=False)
+            paths.append(path)
+
+        image_formats = [fmt for fmt in self.formats if fmt != 'json']
+        if image_formats:
+            # A standalone Figure on an Agg canvas: no pyplot state, safe to use from worker threads
+            fig = Figure(figsize=(18, 7))
+            FigureCanvasAgg(fig)
+            draw_profile(fig.subplots(1, 2), profile, universe_name)
+            fig.tight_layout()
+            for fmt in image_formats:
+                path = self._path(universe_name, fmt)
+                fig.savefig(path, format=fmt, dpi=self.dpi)
+                paths.append(path)
+        return paths
+
+    def submit(self, profile: Dict, universe_name: str) -> Future:
+        """
+        Queue the artifacts of one profile for writing.
+
+        Args:
+            profile (Dict): Arrays returned by Universe.profile_data.
+            universe_name (str): Name used for the titles and the file names.
+
+        Returns:
+            Future: Resolves to the list of written file paths.
+        """
+        return self._executor.submit(self._render, profile, universe_name)
+
+    def close(self, wait: bool = True):
+        """
+        Stop accepting profiles and, by default, wait for the queued ones to be written.
+        """
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
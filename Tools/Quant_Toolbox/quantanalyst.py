@@ -4,12 +4,71 @@
 
 import pandas as pd
 import numpy as np
-import yfinance as yf
 import matplotlib.pyplot as plt
 import mplfinance as mpf
-from typing import List, Optional
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
+from price_store import PriceStore, get_default_store
+from finviz_loader import FINVIZ_SCHEMA, load_screener
+from screen_runner import StrategyTask, run_strategies
+from profile_renderer import ProfileRenderer, draw_profile
+
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Column-wise rolling mean of a (date x ticker) array using cumulative sums.
+    A window containing a NaN yields NaN, as with pandas rolling(window).mean().
+
+    Args:
+        values (np.ndarray): 2D array of observations, one column per ticker.
+        window (int): Rolling window size.
+
+    Returns:
+        np.ndarray: Array of the same shape, NaN until a full window is available.
+    """
+    result = np.full(values.shape, np.nan)
+    if values.shape[0] < window:
+        return result
+    valid = ~np.isnan(values)
+    zero = np.zeros((1, values.shape[1]))
+    csum = np.vstack([zero, np.cumsum(np.where(valid, values, 0.0), axis=0)])
+    ccount = np.vstack([zero, np.cumsum(valid, axis=0)])
+    window_sum = csum[window:] - csum[:-window]
+    window_count = ccount[window:] - ccount[:-window]
+    result[window - 1:] = np.where(window_count == window, window_sum / window, np.nan)
+    return result
+
+
+def _last_valid(values: np.ndarray, reference: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Return the value of each column at its last observed row (NaN if the column is empty).
+
+    Args:
+        values (np.ndarray): 2D array to read from.
+        reference (Optional[np.ndarray]): Array whose non-NaN entries define the observed rows.
+                                          If None, uses values itself.
+
+    Returns:
+        np.ndarray: One value per column.
+    """
+    valid = ~np.isnan(values if reference is None else reference)
+    last_row = values.shape[0] - 1 - np.argmax(valid[::-1], axis=0)
+    result = values[last_row, np.arange(values.shape[1])]
+    return np.where(valid.any(axis=0), result, np.nan)
+
+
+# Strategy columns derived from the screener data, computed on first use and memoized
+DERIVED_COLUMNS: Dict[str, Callable[[pd.DataFrame], pd.Series]] = {
+    'Above_SMA20': lambda d: d['Price'] > d['20-Day Simple Moving Average'],
+    'MA_Hierarchy': lambda d: (
+        (d['20-Day Simple Moving Average'] > d['50-Day Simple Moving Average']) &
+        (d['50-Day Simple Moving Average'] > d['200-Day Simple Moving Average'])
+    ),
+    'Relative_Volume': lambda d: d['Volume'] / d['Average Volume'],
+    'Price_Change': lambda d: d['Price'] / d['20-Day Simple Moving Average'] - 1,
+}
 
 
 class Universe:
@@ -17,39 +76,73 @@ class Universe:
     Base class representing a universe of stocks loaded from a CSV file.
     Provides common preprocessing and utility methods.
     """
-    def __init__(self, data_path: str):
+    def __init__(self, data_path: str, price_store: Optional[PriceStore] = None):
         """
         Initialize the Universe with data from the specified CSV file.
+        The typed parse of the file is cached, so repeated loads skip the CSV parsing.
 
         Args:
             data_path (str): Path to the CSV file containing stock data.
+            price_store (Optional[PriceStore]): Cache used for all price history reads.
+                                                If None, uses the shared default store.
         """
-        self.data = pd.read_csv(data_path)
+        self.data = load_screener(data_path)
+        self.price_store = price_store if price_store is not None else get_default_store()
+        self._derived: Dict[str, pd.Series] = {}
         self.preprocess_data()
 
+    @classmethod
+    def from_frame(cls, data: pd.DataFrame, price_store: Optional[PriceStore] = None,
+                   derived: Optional[Dict[str, pd.Series]] = None) -> 'Universe':
+        """
+        Build a universe on already preprocessed data without reading the CSV again.
+
+        Args:
+            data (pd.DataFrame): Preprocessed screener data. Columns added by the universe stay local to it.
+            price_store (Optional[PriceStore]): Cache used for all price history reads.
+                                                If None, uses the shared default store.
+            derived (Optional[Dict[str, pd.Series]]): Memo of derived columns to share with other universes.
+
+        Returns:
+            Universe: Instance of the calling class.
+        """
+        universe = cls.__new__(cls)
+        # A shallow copy: adding columns never touches the shared frame
+        universe.data = data.copy(deep=False)
+        universe.price_store = price_store if price_store is not None else get_default_store()
+        universe._derived = derived if derived is not None else {}
+        return universe
+
+    def column(self, name: str) -> pd.Series:
+        """
+        Get a derived strategy column such as 'Above_SMA20' or 'Relative_Volume', computing it once.
+
+        Args:
+            name (str): Name of a column defined in DERIVED_COLUMNS.
+
+        Returns:
+            pd.Series: The derived column, aligned with self.data.
+        """
+        if name not in self._derived:
+            if name not in DERIVED_COLUMNS:
+                raise KeyError(f"Derived column '{name}' is not defined")
+            self._derived[name] = DERIVED_COLUMNS[name](self.data)
+        return self._derived[name]
+
     def preprocess_data(self):
         """
-        Preprocess the loaded data by cleaning column names, removing unwanted characters,
-        converting columns to numeric types, and dropping rows with missing essential data.
+        Preprocess the loaded data by cleaning column names, converting any numeric column
+        not already typed by the loader, and dropping rows with missing essential data.
         """
         # Strip whitespace from column headers
         self.data.columns = self.data.columns.str.strip()
 
-        # Remove commas, percentage signs, and other non-numeric characters from numeric columns
-        self.data.replace({',': '', '%': ''}, regex=True, inplace=True)
-
-        # Define numeric columns to convert
-        numeric_columns = [
-            'Price', '20-Day Simple Moving Average', '50-Day Simple Moving Average',
-            '200-Day Simple Moving Average', 'Volume', 'Average Volume', 'Market Cap',
-            'Current Ratio', 'Profit Margin', 'Return on Assets', 'Return on Equity',
-            'LT Debt/Equity', 'P/E', 'P/B', 'EPS (ttm)'
-        ]
-
-        # Convert columns to numeric types, coercing errors to NaN
-        for col in numeric_columns:
-            if col in self.data.columns:
-                self.data[col] = pd.to_numeric(self.data[col], errors='coerce')
+        # Columns parsed by the loader are already float; convert anything left as text
+        for col, dtype in FINVIZ_SCHEMA.items():
+            if col in self.data.columns and not pd.api.types.is_float_dtype(self.data[col]):
+                self.data[col] = pd.to_numeric(
+                    self.data[col].astype(str).str.replace(r'[,%]', '', regex=True), errors='coerce'
+                ).astype(dtype)
 
         # Define essential columns that must not have NaN values
         essential_columns = [
@@ -89,6 +182,21 @@ class Universe:
         top_stocks = data.nsmallest(top_n, 'Score') if ascending else data.nlargest(top_n, 'Score')
         return top_stocks
 
+    @staticmethod
+    def history_window(months: int = 3) -> Tuple[str, str]:
+        """
+        Get the (start, end) date strings of the trailing history window.
+
+        Args:
+            months (int): Length of the window in months.
+
+        Returns:
+            Tuple[str, str]: Start and end dates formatted as 'YYYY-MM-DD'.
+        """
+        end_date = datetime.today()
+        start_date = end_date - relativedelta(months=months)
+        return start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')
+
     def components(self) -> List[str]:
         """
         Get the list of stock tickers in the universe.
@@ -98,181 +206,158 @@ class Universe:
         """
         return self.data['Ticker'].tolist()
 
-    def profile(self, tickers: Optional[List[str]] = None, universe_name: Optional[str] = "Universe Components"):
+    def profile_data(self, tickers: List[str], benchmark_ticker: str = 'SPY') -> Optional[Dict]:
         """
-        Plot a scatter plot of volatility vs. cumulative return and compare portfolio performance against SPY.
-
-        The OHLC plot for the portfolio is generated separately using mplfinance.
+        Compute the profile of a set of tickers as plain arrays, from a single price history read.
 
         Args:
-            tickers (Optional[List[str]]): List of ticker symbols to profile. 
-                                           If None, profiles all components.
-            universe_name (Optional[str]): Name of the sub-universe for the plot titles.
-        """
-        if tickers is None:
-            tickers = self.components()
-
-        if not tickers:
-            print("No tickers provided for profiling.")
-            return
-
-        # Initialize lists to store volatility and returns
-        volatilities = []
-        returns = []
-        valid_tickers = []
+            tickers (List[str]): List of ticker symbols to profile.
+            benchmark_ticker (str): Ticker of the benchmark for the portfolio comparison.
 
+        Returns:
+            Optional[Dict]: 'tickers', 'volatility' and 'cumulative_return' per valid ticker;
+                            'dates', 'portfolio' and 'benchmark' cumulative returns and the daily
+                            'portfolio_returns' of the equally weighted portfolio; 'message' explaining
+                            why the comparison is unavailable (None otherwise).
+                            None if no ticker could be profiled.
+        """
         # Define date range: last 3 months
-        end_date = datetime.today()
-        start_date = end_date - relativedelta(months=3)
-        start_str = start_date.strftime('%Y-%m-%d')
-        end_str = end_date.strftime('%Y-%m-%d')
+        start_str, end_str = self.history_window(months=3)
 
-        # Download historical data for all tickers at once to optimize performance
+        # Read historical data for all tickers and the benchmark at once through the shared price cache
         try:
-            # Set auto_adjust=False to retain 'Adj Close'
-            stock_data = yf.download(tickers, start=start_str, end=end_str, progress=False, group_by='ticker', auto_adjust=False)
+            stock_data = self.price_store.get(list(tickers) + [benchmark_ticker], start_str, end_str)
         except Exception as e:
             print(f"Error downloading data for tickers: {e}")
-            return
+            return None
 
+        # Initialize lists to store volatility and returns
+        volatilities = []
+        returns = []
+        valid_tickers = []
         for ticker in tickers:
             try:
-                if len(tickers) == 1:
-                    data = stock_data
-                else:
-                    if ticker not in stock_data.columns.levels[0]:
-                        print(f"Ticker {ticker} data not found in downloaded data.")
-                        continue
-                    data = stock_data[ticker]
+                if ticker not in stock_data:
+                    print(f"Ticker {ticker} data not found in downloaded data.")
+                    continue
+                data = stock_data[ticker]
                 if not data.empty:
                     # Ensure 'Adj Close' exists
                     if 'Adj Close' not in data.columns:
                         raise KeyError("'Adj Close' column missing.")
 
                     # Calculate daily returns
-                    data['Daily_Return'] = data['Adj Close'].pct_change(fill_method=None)
+                    daily_return = data['Adj Close'].pct_change(fill_method=None)
                     # Calculate volatility (standard deviation of daily returns)
-                    volatility = data['Daily_Return'].std()
+                    volatilities.append(daily_return.std())
                     # Calculate cumulative return over the period
-                    cumulative_return = (data['Daily_Return'] + 1).prod() - 1
-
-                    volatilities.append(volatility)
-                    returns.append(cumulative_return)
+                    returns.append((daily_return + 1).prod() - 1)
                     valid_tickers.append(ticker)
             except Exception as e:
                 print(f"Error processing {ticker}: {e}")
 
         if not valid_tickers:
             print("No valid tickers to profile after processing.")
-            return
+            return None
+
+        profile = {
+            'tickers': valid_tickers,
+            'volatility': np.asarray(volatilities, dtype=float),
+            'cumulative_return': np.asarray(returns, dtype=float),
+            'benchmark_ticker': benchmark_ticker,
+            'dates': np.array([], dtype='datetime64[ns]'),
+            'portfolio': np.array([], dtype=float),
+            'benchmark': np.array([], dtype=float),
+            'portfolio_returns': pd.Series(dtype=float),
+            'message': None,
+        }
 
-        # Prepare subplots: 1 row, 2 columns
-        fig, axs = plt.subplots(1, 2, figsize=(18, 7))
+        # ------------------ Portfolio vs Benchmark ------------------
+        if benchmark_ticker not in stock_data:
+            print(f"Benchmark ticker {benchmark_ticker} not found in downloaded data.")
+            profile['message'] = f'{benchmark_ticker} data not available.'
+            return profile
+
+        # Portfolio stocks only (the benchmark may also be one of the profiled tickers)
+        portfolio_close = pd.DataFrame({ticker: stock_data[ticker]['Close'] for ticker in valid_tickers})
+        portfolio_close = portfolio_close.drop(columns=[benchmark_ticker], errors='ignore')
+        if portfolio_close.empty:
+            print("No portfolio stocks data available.")
+            profile['message'] = 'No portfolio stocks data available.'
+            return profile
+
+        # Calculate daily returns for portfolio stocks
+        portfolio_returns = portfolio_close.pct_change(fill_method=None).dropna()
+        if portfolio_returns.empty:
+            print("No portfolio returns calculated.")
+            profile['message'] = 'No portfolio returns calculated.'
+            return profile
+
+        # Calculate equally weighted portfolio and benchmark cumulative returns
+        equally_weighted_returns = portfolio_returns.mean(axis=1)
+        portfolio_cumulative = (equally_weighted_returns + 1).cumprod()
+        benchmark_returns = stock_data[benchmark_ticker]['Adj Close'].pct_change(fill_method=None).dropna()
+        benchmark_cumulative = (benchmark_returns + 1).cumprod()
+
+        # Align the two series
+        combined_df = pd.concat([portfolio_cumulative, benchmark_cumulative], axis=1, join='inner')
+        if combined_df.empty:
+            print(f"No overlapping dates between portfolio and {benchmark_ticker} data.")
+            profile['message'] = 'No overlapping dates for comparison.'
+            return profile
+
+        profile['dates'] = combined_df.index.to_numpy()
+        profile['portfolio'] = combined_df.iloc[:, 0].to_numpy(dtype=float)
+        profile['benchmark'] = combined_df.iloc[:, 1].to_numpy(dtype=float)
+        profile['portfolio_returns'] = equally_weighted_returns
+        return profile
+
+    def profile(self, tickers: Optional[List[str]] = None, universe_name: Optional[str] = "Universe Components",
+                renderer: Optional[ProfileRenderer] = None) -> Optional[Future]:
+        """
+        Plot a scatter plot of volatility vs. cumulative return and compare portfolio performance against SPY.
 
-        # ------------------ Scatter Plot ------------------
-        axs[0].scatter(volatilities, returns, alpha=0.7)
-        for i, ticker in enumerate(valid_tickers):
-            axs[0].annotate(ticker, (volatilities[i], returns[i]), fontsize=9)
-        axs[0].set_xlabel('Volatility (Std Dev of Daily Returns)')
-        axs[0].set_ylabel('Cumulative Return (Last 3 Months)')
-        axs[0].set_title(f'Volatility vs. Return for {universe_name}')
-        axs[0].grid(True)
-
-        # ------------------ Portfolio vs SPY Plot ------------------
-        # Include SPY in the list for benchmark comparison
-        portfolio_tickers = valid_tickers  # Use only valid tickers
-        benchmark_ticker = 'SPY'
-        all_tickers = portfolio_tickers + [benchmark_ticker]
-
-        # Download historical data for portfolio and SPY
-        try:
-            portfolio_data = yf.download(all_tickers, start=start_str, end=end_str, progress=False, auto_adjust=False)
-        except Exception as e:
-            print(f"Error downloading portfolio and benchmark data: {e}")
-            axs[1].text(0.5, 0.5, 'Error downloading data.', horizontalalignment='center', verticalalignment='center', fontsize=12)
-            axs[1].set_title(f'Portfolio vs SPY for {universe_name}')
-            axs[1].axis('off')
-        else:
-            if len(all_tickers) == 1:
-                portfolio_close = portfolio_data['Close']
-            else:
-                portfolio_close = portfolio_data['Close']
-
-            # Separate portfolio stocks and benchmark
-            if benchmark_ticker not in portfolio_close.columns:
-                print(f"Benchmark ticker {benchmark_ticker} not found in downloaded data.")
-                axs[1].text(0.5, 0.5, f'{benchmark_ticker} data not available.', horizontalalignment='center', verticalalignment='center', fontsize=12)
-                axs[1].set_title(f'Portfolio vs SPY for {universe_name}')
-                axs[1].axis('off')
-            else:
-                # Drop benchmark from portfolio stocks
-                portfolio_close = portfolio_close.drop(columns=[benchmark_ticker], errors='ignore')
-
-                if portfolio_close.empty:
-                    print("No portfolio stocks data available.")
-                    axs[1].text(0.5, 0.5, 'No portfolio stocks data available.', horizontalalignment='center', verticalalignment='center', fontsize=12)
-                    axs[1].set_title(f'Portfolio vs SPY for {universe_name}')
-                    axs[1].axis('off')
-                else:
-                    # Calculate daily returns for portfolio stocks
-                    portfolio_returns = portfolio_close.pct_change(fill_method=None).dropna()
-
-                    if portfolio_returns.empty:
-                        print("No portfolio returns calculated.")
-                        axs[1].text(0.5, 0.5, 'No portfolio returns calculated.', horizontalalignment='center', verticalalignment='center', fontsize=12)
-                        axs[1].set_title(f'Portfolio vs SPY for {universe_name}')
-                        axs[1].axis('off')
-                    else:
-                        # Calculate equally weighted portfolio returns
-                        equally_weighted_returns = portfolio_returns.mean(axis=1)
-
-                        # Calculate cumulative returns
-                        portfolio_cumulative = (equally_weighted_returns + 1).cumprod()
-
-                        # Calculate SPY returns
-                        spy_data = portfolio_data['Adj Close'][benchmark_ticker].pct_change(fill_method=None).dropna()
-                        spy_cumulative = (spy_data + 1).cumprod()
-
-                        # Align the two series
-                        combined_df = pd.concat([portfolio_cumulative, spy_cumulative], axis=1, join='inner')
-                        combined_df.columns = ['Portfolio', 'SPY']
-
-                        if combined_df.empty:
-                            print("No overlapping dates between portfolio and SPY data.")
-                            axs[1].text(0.5, 0.5, 'No overlapping dates for comparison.', horizontalalignment='center', verticalalignment='center', fontsize=12)
-                            axs[1].set_title(f'Portfolio vs SPY for {universe_name}')
-                            axs[1].axis('off')
-                        else:
-                            # Plot the cumulative returns
-                            axs[1].plot(combined_df.index, combined_df['Portfolio'], label='Equally Weighted Portfolio')
-                            axs[1].plot(combined_df.index, combined_df['SPY'], label='SPY Benchmark')
-                            axs[1].set_xlabel('Date')
-                            axs[1].set_ylabel('Cumulative Return')
-                            axs[1].set_title(f'Portfolio vs SPY for {universe_name}')
-                            axs[1].legend()
-                            axs[1].grid(True)
+        The OHLC plot for the portfolio is generated separately using mplfinance.
+        With a renderer, nothing is displayed: the artifacts are written in the background instead.
+
+        Args:
+            tickers (Optional[List[str]]): List of ticker symbols to profile. 
+                                           If None, profiles all components.
+            universe_name (Optional[str]): Name of the sub-universe for the plot titles.
+            renderer (Optional[ProfileRenderer]): Headless renderer writing PNG/SVG/JSON files.
+                                                  If None, shows the plots interactively.
+
+        Returns:
+            Optional[Future]: With a renderer, resolves to the written file paths; otherwise None.
+        """
+        if tickers is None:
+            tickers = self.components()
+
+        if not tickers:
+            print("No tickers provided for profiling.")
+            return None
 
+        profile = self.profile_data(tickers)
+        if profile is None:
+            return None
+
+        if renderer is not None:
+            return renderer.submit(profile, universe_name)
+
+        # Prepare subplots: 1 row, 2 columns
+        fig, axs = plt.subplots(1, 2, figsize=(18, 7))
+        draw_profile(axs, profile, universe_name)
         plt.tight_layout()
         plt.show()
 
         # ------------------ OHLC Plot for Portfolio ------------------
         # Calculate daily OHLC values for the portfolio
         try:
-            # Ensure portfolio_close has data
-            if 'Portfolio' in locals() and not combined_df.empty:
-                # Create a DataFrame for the portfolio's daily returns
-                portfolio_daily_returns = equally_weighted_returns
-
+            if profile['message'] is None:
                 # Calculate the portfolio's daily price assuming starting value of $100
-                portfolio_price = (1 + portfolio_daily_returns).cumprod() * 100
+                portfolio_price = (1 + profile['portfolio_returns']).cumprod() * 100
 
-                # Create OHLC data
-                portfolio_ohlc = portfolio_price.resample('D').ohlc()
-                portfolio_ohlc.dropna(inplace=True)
-
-                # Alternatively, calculate OHLC using resampling if you have intraday data
-                # Here, since we have daily data, OHLC will be the same as Open and Close
-                # To simulate OHLC, we can shift the prices
+                # Since we have daily data, simulate OHLC by shifting the prices
                 portfolio_ohlc = pd.DataFrame({
                     'Open': portfolio_price.shift(1),
                     'High': portfolio_price.rolling(window=2).max(),
@@ -294,6 +379,7 @@ class Universe:
                 print("Portfolio data not available for OHLC plotting.")
         except Exception as e:
             print(f"Error generating OHLC plot for portfolio: {e}")
+        return None
 
 
 # High Momentum Sub-Class
@@ -301,8 +387,8 @@ class HighMomentumUniverse(Universe):
     """
     Subclass of Universe to identify high momentum stocks based on specific criteria.
     """
-    def __init__(self, data_path: str):
-        super().__init__(data_path)
+    def __init__(self, data_path: str, price_store: Optional[PriceStore] = None):
+        super().__init__(data_path, price_store)
 
     def calculate_high_momentum(self) -> pd.DataFrame:
         """
@@ -319,24 +405,27 @@ class HighMomentumUniverse(Universe):
             if column not in self.data.columns:
                 raise KeyError(f"Column '{column}' not found in data")
 
-        # Define high momentum criteria
-        self.data['Above_SMA20'] = self.data['Price'] > self.data['20-Day Simple Moving Average']
-        self.data['MA_Hierarchy'] = (
-            (self.data['20-Day Simple Moving Average'] > self.data['50-Day Simple Moving Average']) & 
-            (self.data['50-Day Simple Moving Average'] > self.data['200-Day Simple Moving Average'])
-        )
-        self.data['Relative_Volume'] = self.data['Volume'] / self.data['Average Volume']
-        self.data['High_Momentum_Score'] = (
-            self.data['Above_SMA20'].astype(int) + 
-            self.data['MA_Hierarchy'].astype(int) + 
-            (self.data['Relative_Volume'] > 1).astype(int)
+        # Define high momentum criteria on a new frame, leaving self.data untouched
+        above_sma20 = self.column('Above_SMA20')
+        ma_hierarchy = self.column('MA_Hierarchy')
+        relative_volume = self.column('Relative_Volume')
+        scored = self.data.assign(
+            Above_SMA20=above_sma20,
+            MA_Hierarchy=ma_hierarchy,
+            Relative_Volume=relative_volume,
+            High_Momentum_Score=(
+                above_sma20.astype(int) +
+                ma_hierarchy.astype(int) +
+                (relative_volume > 1).astype(int)
+            )
         )
 
         # Get top 10 high momentum stocks
         high_momentum_stocks = self.score_and_get_top(
             scoring_criteria='High_Momentum_Score', 
             ascending=False, 
-            top_n=10
+            top_n=10,
+            data=scored
         )
         return high_momentum_stocks
 
@@ -346,16 +435,18 @@ class MeanReversionUniverse(Universe):
     """
     Subclass of Universe to identify mean-reverting stocks based on specific criteria.
     """
-    def __init__(self, data_path: str):
-        super().__init__(data_path)
+    def __init__(self, data_path: str, price_store: Optional[PriceStore] = None):
+        super().__init__(data_path, price_store)
 
-    def calculate_mean_reversion(self, window: int = 20) -> pd.DataFrame:
+    def calculate_mean_reversion(self, window: int = 20, max_candidates: Optional[int] = 10) -> pd.DataFrame:
         """
         Calculate mean reversion scores and return the top 10 mean-reverting stocks.
-        Limits yfinance calls to 10 stocks.
+        Price history of all candidates is read in one bulk call and scored column-wise.
 
         Args:
             window (int): Rolling window size for moving average calculation.
+            max_candidates (Optional[int]): Number of candidates most below their SMA20 to score.
+                                            Pass None to score the whole universe.
 
         Returns:
             pd.DataFrame: Top 10 mean-reverting stocks.
@@ -364,45 +455,32 @@ class MeanReversionUniverse(Universe):
             raise KeyError("Column 'Price' not found in data")
 
         # Initial candidate selection based on existing data
-        candidates = self.data.copy()
-        candidates['Price_Change'] = candidates['Price'] / candidates['20-Day Simple Moving Average'] - 1
-        # Select top 10 candidates with lowest Price_Change (i.e., most below SMA20)
-        candidates = candidates.sort_values('Price_Change').head(10)
-        tickers = candidates['Ticker'].tolist()
+        # Rank candidates by lowest Price_Change (i.e., most below SMA20)
+        ranked = self.column('Price_Change').sort_values()
+        if max_candidates is not None:
+            ranked = ranked.head(max_candidates)
+        tickers = self.data.loc[ranked.index, 'Ticker'].tolist()
+        start_str, end_str = self.history_window(months=3)
+
+        # Download historical data for all candidates at once
+        try:
+            adj_close = self.price_store.panel(tickers, start_str, end_str, field='Adj Close')
+        except Exception as e:
+            print(f"Error downloading data for tickers: {e}")
+            return pd.DataFrame()
+        if adj_close.empty:
+            print("No valid mean reversion scores calculated.")
+            return pd.DataFrame()
 
-        mean_reversion_scores = []
-        for ticker in tickers:
-            try:
-                # Download historical data for a valid period
-                stock_data = yf.download(
-                    ticker, 
-                    start=(datetime.today() - relativedelta(months=3)).strftime('%Y-%m-%d'),
-                    end=datetime.today().strftime('%Y-%m-%d'), 
-                    progress=False, 
-                    auto_adjust=False
-                )
-                if not stock_data.empty and len(stock_data) >= window:
-                    # Calculate moving average and deviation
-                    stock_data['Moving_Avg'] = stock_data['Adj Close'].rolling(window=window).mean()
-                    stock_data['Deviation'] = stock_data['Adj Close'] - stock_data['Moving_Avg']
-                    latest_deviation = stock_data['Deviation'].iloc[-1]
-                    mean_reversion_scores.append({
-                        'Ticker': ticker, 
-                        'Mean_Reversion_Score': -abs(latest_deviation)
-                    })
-                else:
-                    mean_reversion_scores.append({
-                        'Ticker': ticker, 
-                        'Mean_Reversion_Score': np.nan
-                    })
-            except Exception as e:
-                print(f"Error processing {ticker}: {e}")
-                mean_reversion_scores.append({
-                    'Ticker': ticker, 
-                    'Mean_Reversion_Score': np.nan
-                })
+        # Deviation of the latest price from its moving average, for every ticker at once
+        prices = adj_close.to_numpy(dtype=float)
+        moving_avg = _rolling_mean(prices, window)
+        latest_deviation = _last_valid(prices - moving_avg, reference=prices)
 
-        scores_df = pd.DataFrame(mean_reversion_scores).dropna()
+        scores_df = pd.DataFrame({
+            'Ticker': adj_close.columns,
+            'Mean_Reversion_Score': -np.abs(latest_deviation)
+        }).dropna()
         if scores_df.empty:
             print("No valid mean reversion scores calculated.")
             return pd.DataFrame()
@@ -417,8 +495,8 @@ class UndervaluedUniverse(Universe):
     """
     Subclass of Universe to identify undervalued stocks based on specific financial metrics.
     """
-    def __init__(self, data_path: str):
-        super().__init__(data_path)
+    def __init__(self, data_path: str, price_store: Optional[PriceStore] = None):
+        super().__init__(data_path, price_store)
 
     def calculate_undervalued_stocks(self) -> pd.DataFrame:
         """
@@ -477,16 +555,18 @@ class BreakoutPotentialUniverse(Universe):
     """
     Subclass of Universe to identify stocks with breakout potential based on ATR.
     """
-    def __init__(self, data_path: str):
-        super().__init__(data_path)
+    def __init__(self, data_path: str, price_store: Optional[PriceStore] = None):
+        super().__init__(data_path, price_store)
 
-    def calculate_breakout_potential(self, window: int = 20) -> pd.DataFrame:
+    def calculate_breakout_potential(self, window: int = 20, max_candidates: Optional[int] = 10) -> pd.DataFrame:
         """
         Calculate breakout potential scores and return the top 10 breakout potential stocks.
-        Limits yfinance calls to 10 stocks.
+        Price history of all candidates is read in one bulk call and scored column-wise.
 
         Args:
             window (int): Rolling window size for ATR calculation.
+            max_candidates (Optional[int]): Number of candidates with highest relative volume to score.
+                                            Pass None to score the whole universe.
 
         Returns:
             pd.DataFrame: Top 10 breakout potential stocks.
@@ -495,51 +575,42 @@ class BreakoutPotentialUniverse(Universe):
             raise KeyError("Column 'Price' not found in data")
 
         # Initial candidate selection based on existing data
-        candidates = self.data.copy()
-        candidates['Relative_Volume'] = candidates['Volume'] / self.data['Average Volume']
-        # Select top 10 candidates with highest Relative Volume
-        candidates = candidates.sort_values('Relative_Volume', ascending=False).head(10)
-        tickers = candidates['Ticker'].tolist()
-
-        breakout_scores = []
-        for ticker in tickers:
-            try:
-                # Download historical data for a valid period
-                stock_data = yf.download(
-                    ticker, 
-                    start=(datetime.today() - relativedelta(months=3)).strftime('%Y-%m-%d'),
-                    end=datetime.today().strftime('%Y-%m-%d'), 
-                    progress=False, 
-                    auto_adjust=False
-                )
-                if not stock_data.empty and len(stock_data) >= window:
-                    # Calculate True Range
-                    stock_data['High-Low'] = stock_data['High'] - stock_data['Low']
-                    stock_data['High-Close'] = abs(stock_data['High'] - stock_data['Close'].shift(1))
-                    stock_data['Low-Close'] = abs(stock_data['Low'] - stock_data['Close'].shift(1))
-                    stock_data['True_Range'] = stock_data[['High-Low', 'High-Close', 'Low-Close']].max(axis=1)
-                    # Calculate ATR
-                    stock_data['ATR'] = stock_data['True_Range'].rolling(window=window).mean()
-                    latest_atr = stock_data['ATR'].iloc[-1]
-                    latest_price = stock_data['Close'].iloc[-1]
-                    breakout_score = latest_atr / latest_price
-                    breakout_scores.append({
-                        'Ticker': ticker, 
-                        'Breakout_Score': breakout_score
-                    })
-                else:
-                    breakout_scores.append({
-                        'Ticker': ticker, 
-                        'Breakout_Score': np.nan
-                    })
-            except Exception as e:
-                print(f"Error processing {ticker}: {e}")
-                breakout_scores.append({
-                    'Ticker': ticker, 
-                    'Breakout_Score': np.nan
-                })
+        # Rank candidates by highest Relative Volume
+        ranked = self.column('Relative_Volume').sort_values(ascending=False)
+        if max_candidates is not None:
+            ranked = ranked.head(max_candidates)
+        tickers = self.data.loc[ranked.index, 'Ticker'].tolist()
+        start_str, end_str = self.history_window(months=3)
+
+        # Download historical data for all candidates at once
+        try:
+            panels = self.price_store.panels(tickers, start_str, end_str, fields=['High', 'Low', 'Close'])
+        except Exception as e:
+            print(f"Error downloading data for tickers: {e}")
+            return pd.DataFrame()
+        if panels['Close'].empty:
+            print("No breakout potential scores calculated.")
+            return pd.DataFrame()
 
-        scores_df = pd.DataFrame(breakout_scores).dropna()
+        columns = panels['Close'].columns
+        high = panels['High'].reindex(columns=columns).to_numpy(dtype=float)
+        low = panels['Low'].reindex(columns=columns).to_numpy(dtype=float)
+        close = panels['Close'].to_numpy(dtype=float)
+
+        # True Range over the whole (date x ticker) block; fmax skips the missing previous close on the first row
+        prev_close = np.vstack([np.full((1, close.shape[1]), np.nan), close[:-1]])
+        true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+        true_range[np.isnan(high) | np.isnan(low)] = np.nan
+
+        # ATR relative to the latest close
+        atr = _rolling_mean(true_range, window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            breakout_score = _last_valid(atr, reference=close) / _last_valid(close)
+
+        scores_df = pd.DataFrame({
+            'Ticker': columns,
+            'Breakout_Score': breakout_score
+        }).replace([np.inf, -np.inf], np.nan).dropna()
         if scores_df.empty:
             print("No breakout potential scores calculated.")
             return pd.DataFrame()
@@ -549,42 +620,107 @@ class BreakoutPotentialUniverse(Universe):
         return breakout_stocks
 
 
+# Screening Session
+# Name of each screen -> (Universe subclass, scoring method)
+SCREENS: Dict[str, Tuple[type, str]] = {
+    'High Momentum': (HighMomentumUniverse, 'calculate_high_momentum'),
+    'Mean Reversion': (MeanReversionUniverse, 'calculate_mean_reversion'),
+    'Undervalued': (UndervaluedUniverse, 'calculate_undervalued_stocks'),
+    'Breakout Potential': (BreakoutPotentialUniverse, 'calculate_breakout_potential'),
+}
+
+
+class ScreeningSession:
+    """
+    Loads the screener data once and runs several Universe strategies on shared read-only views.
+    Derived strategy columns are memoized across all the strategies of the session.
+    """
+    def __init__(self, data_path: str, price_store: Optional[PriceStore] = None):
+        """
+        Initialize the session by loading and preprocessing the CSV file once.
+
+        Args:
+            data_path (str): Path to the CSV file containing stock data.
+            price_store (Optional[PriceStore]): Cache used for all price history reads.
+                                                If None, uses the shared default store.
+        """
+        base = Universe(data_path, price_store)
+        self.data = base.data
+        self.price_store = base.price_store
+        self._derived: Dict[str, pd.Series] = {}
+        self._universes: Dict[type, Universe] = {}
+
+    def universe(self, universe_class: type) -> Universe:
+        """
+        Get the session's instance of a Universe subclass, sharing the loaded data.
+
+        Args:
+            universe_class (type): Universe subclass, e.g. HighMomentumUniverse.
+
+        Returns:
+            Universe: Instance bound to the session's data and derived-column memo.
+        """
+        if universe_class not in self._universes:
+            self._universes[universe_class] = universe_class.from_frame(self.data, self.price_store, self._derived)
+        return self._universes[universe_class]
+
+    def run(self, screens: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Run the selected screens in a single pass over the loaded data.
+
+        Args:
+            screens (Optional[List[str]]): Names of SCREENS entries to run. If None, runs all of them.
+
+        Returns:
+            Dict[str, pd.DataFrame]: Top stocks of each screen, keyed by screen name.
+        """
+        results = {}
+        for name in (screens if screens is not None else list(SCREENS)):
+            universe_class, method = SCREENS[name]
+            results[name] = getattr(self.universe(universe_class), method)()
+        return results
+
+    def run_parallel(self, screens: Optional[List[str]] = None,
+                     max_threads: Optional[int] = None) -> Tuple[Dict[str, pd.DataFrame], Dict[str, float]]:
+        """
+        Run the selected screens concurrently in a thread pool. The network-bound screens overlap their downloads;
+        the others are a few vectorized pandas operations, cheaper than pickling the universe into a process.
+
+        Args:
+            screens (Optional[List[str]]): Names of SCREENS entries to run. If None, runs all of them.
+            max_threads (Optional[int]): Thread pool size. Defaults to one thread per screen.
+
+        Returns:
+            Tuple[Dict[str, pd.DataFrame], Dict[str, float]]: Top stocks and wall-clock seconds of each screen.
+        """
+        tasks = []
+        for name in (screens if screens is not None else list(SCREENS)):
+            universe_class, method = SCREENS[name]
+            tasks.append(StrategyTask(name, getattr(self.universe(universe_class), method)))
+        return run_strategies(tasks, max_threads=max_threads)
+
+    def profile(self, name: str, stocks: pd.DataFrame, renderer: Optional[ProfileRenderer] = None) -> Optional[Future]:
+        """
+        Profile the stocks selected by a screen, titled with the screen name.
+        With a renderer, the artifacts are written in the background and a Future is returned.
+        """
+        if stocks.empty:
+            return None
+        universe_class, _ = SCREENS[name]
+        return self.universe(universe_class).profile(tickers=stocks['Ticker'].tolist(), universe_name=name,
+                                                     renderer=renderer)
+
+
 # Example Usage
 if __name__ == "__main__":
     data_path = 'finviz(1).csv'  # Path to your CSV file
 
-    # Instantiate and calculate High Momentum Universe
-    high_momentum_universe = HighMomentumUniverse(data_path)
-    high_momentum_stocks = high_momentum_universe.calculate_high_momentum()
-    print("High Momentum Stocks:")
-    print(high_momentum_stocks)
-    # Profile only the top 10 high momentum stocks with appropriate title
-    if not high_momentum_stocks.empty:
-        high_momentum_universe.profile(tickers=high_momentum_stocks['Ticker'].tolist(), universe_name="High Momentum")
-
-    # Instantiate and calculate Mean Reversion Universe
-    mean_reversion_universe = MeanReversionUniverse(data_path)
-    mean_reverting_stocks = mean_reversion_universe.calculate_mean_reversion()
-    print("\nMean Reverting Stocks:")
-    print(mean_reverting_stocks)
-    if not mean_reverting_stocks.empty:
-        # Profile only the top 10 mean reverting stocks with appropriate title
-        mean_reversion_universe.profile(tickers=mean_reverting_stocks['Ticker'].tolist(), universe_name="Mean Reversion")
-
-    # Instantiate and calculate Undervalued Universe
-    undervalued_universe = UndervaluedUniverse(data_path)
-    undervalued_stocks = undervalued_universe.calculate_undervalued_stocks()
-    print("\nUndervalued Stocks:")
-    print(undervalued_stocks)
-    if not undervalued_stocks.empty:
-        # Profile undervalued stocks with appropriate title
-        undervalued_universe.profile(tickers=undervalued_stocks['Ticker'].tolist(), universe_name="Undervalued")
-
-    # Instantiate and calculate Breakout Potential Universe
-    breakout_potential_universe = BreakoutPotentialUniverse(data_path)
-    breakout_stocks = breakout_potential_universe.calculate_breakout_potential()
-    print("\nBreakout Potential Stocks:")
-    print(breakout_stocks)
-    if not breakout_stocks.empty:
-        # Profile only the top 10 breakout potential stocks with appropriate title
-        breakout_potential_universe.profile(tickers=breakout_stocks['Ticker'].tolist(), universe_name="Breakout Potential")
+    # Load the CSV once and run the four screens concurrently on the shared data
+    session = ScreeningSession(data_path)
+    results, timings = session.run_parallel()
+
+    for name, stocks in results.items():
+        print(f"\n{name} Stocks ({timings[name]:.2f}s):")
+        print(stocks)
+        # Profile the selected stocks with appropriate title
+        session.profile(name, stocks)
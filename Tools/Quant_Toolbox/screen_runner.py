@@ -0,0 +1,89 @@
+## Concurrent runner for independent screening strategies
+## Strategies run in a thread pool; heavy CPU-bound ones can be sent to a process pool started with 'spawn'
+
+import os
+import time
+import multiprocessing
+import pandas as pd
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class StrategyTask:
+    """
+    A named screening callable returning a DataFrame, and the kind of pool it should run in.
+    """
+    def __init__(self, name: str, func: Callable[[], pd.DataFrame], io_bound: bool = True):
+        """
+        Args:
+            name (str): Key of the strategy in the returned results.
+            func (Callable[[], pd.DataFrame]): Strategy to run, e.g. a bound Universe method.
+                                               Must be picklable when io_bound is False.
+            io_bound (bool): True for the thread pool: network-bound strategies, and CPU-bound ones too cheap to
+                             repay pickling their inputs. False for the process pool (heavy CPU-bound work).
+        """
+        self.name = name
+        self.func = func
+        self.io_bound = io_bound
+
+
+def _timed_call(func: Callable[[], pd.DataFrame]) -> Tuple[pd.DataFrame, float]:
+    """
+    Run a strategy and measure its wall-clock time where it actually executes.
+    """
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def run_strategies(tasks: List[StrategyTask], max_threads: Optional[int] = None,
+                   max_processes: Optional[int] = None) -> Tuple[Dict[str, pd.DataFrame], Dict[str, float]]:
+    """
+    Run independent strategies concurrently so the batch takes about as long as the slowest one.
+
+    Args:
+        tasks (List[StrategyTask]): Strategies to run.
+        max_threads (Optional[int]): Thread pool size. Defaults to one thread per network-bound task.
+        max_processes (Optional[int]): Process pool size. Defaults to one process per CPU-bound task,
+                                       capped by the number of CPUs.
+
+    Returns:
+        Tuple[Dict[str, pd.DataFrame], Dict[str, float]]: Result and wall-clock seconds of each
+        strategy, keyed by name. A strategy that raises yields an empty DataFrame.
+    """
+    io_tasks = [task for task in tasks if task.io_bound]
+    cpu_tasks = [task for task in tasks if not task.io_bound]
+    futures: Dict[str, Future] = {}
+    submitted: Dict[str, float] = {}
+
+    process_pool, thread_pool = None, None
+    if cpu_tasks:
+        # 'spawn' rather than fork: the executor's own thread and the caller's threads and locks (price_store,
+        # yfinance) may exist already, and a forked child would inherit their locks in whatever state they were
+        process_pool = ProcessPoolExecutor(max_workers=max_processes or min(len(cpu_tasks), os.cpu_count() or 1),
+                                           mp_context=multiprocessing.get_context('spawn'))
+    if io_tasks:
+        thread_pool = ThreadPoolExecutor(max_workers=max_threads or len(io_tasks))
+    try:
+        for task in cpu_tasks:
+            submitted[task.name] = time.perf_counter()
+            futures[task.name] = process_pool.submit(_timed_call, task.func)
+        for task in io_tasks:
+            submitted[task.name] = time.perf_counter()
+            futures[task.name] = thread_pool.submit(_timed_call, task.func)
+
+        results: Dict[str, pd.DataFrame] = {}
+        timings: Dict[str, float] = {}
+        for task in tasks:
+            try:
+                results[task.name], timings[task.name] = futures[task.name].result()
+            except Exception as e:
+                print(f"Error running strategy {task.name}: {e}")
+                results[task.name] = pd.DataFrame()
+                timings[task.name] = time.perf_counter() - submitted[task.name]
+    finally:
+        if thread_pool is not None:
+            thread_pool.shutdown()
+        if process_pool is not None:
+            process_pool.shutdown()
+    return results, timings
@@ -2,6 +2,8 @@
 # Radovan Vojtko, Juliána Javorská
 
 from AlgorithmImports import *
+from price_window import PriceWindow
+from macro_store import MacroSeriesStore
 
 class MacroOptimizedAssetAllocation(QCAlgorithm):
     def Initialize(self):
@@ -25,9 +27,26 @@ class MacroOptimizedAssetAllocation(QCAlgorithm):
         self.momentum_window = 12  # 12-month momentum
         self.momentum_scores = {}
         
+        # Rolling 12-month closes per equity ETF: seeded once from history, then updated from OnData
+        lookback = self.momentum_window * 22
+        history = self.History(list(self.equity_assets.values()), lookback, Resolution.Daily)
+        self.price_windows = {}
+        for symbol in self.equity_assets.values():
+            self.price_windows[symbol] = PriceWindow(lookback)
+            if not history.empty and symbol in history.index.get_level_values(0):
+                self.price_windows[symbol].warm_up(history.loc[symbol]["close"].to_numpy())
+        
         # Yield curve data remains for macro risk-off decisions
         self.yield_curve = self.AddData(Fred, "T10Y3M", Resolution.Daily).Symbol
         
+        # Macro series kept for as-of lookups; more FRED series (e.g. "UNRATE", "HOUST") can be added here
+        self.macro_series = {"T10Y3M": self.yield_curve}
+        self.macro_max_age = timedelta(days=10)  # Ignore observations older than this
+        self.macro_lookback = 30  # Daily observations requested at each rebalance (more than a month)
+        self.macro = MacroSeriesStore()
+        for name, symbol in self.macro_series.items():
+            self.macro.load_frame(name, self.History(symbol, self.macro_lookback, Resolution.Daily))
+        
         # Rebalance quarterly
         self.Schedule.On(
             self.DateRules.MonthEnd(self.equity_assets["SPY"]),
@@ -35,22 +54,31 @@ class MacroOptimizedAssetAllocation(QCAlgorithm):
             self.Rebalance
         )
     
+    def OnData(self, data):
+        for symbol, window in self.price_windows.items():
+            if data.Bars.ContainsKey(symbol):
+                window.update(data.Bars[symbol].Close)
+    
+    def RefreshMacro(self):
+        # Macro observations are only needed at rebalance: fetch the ones published since the last refresh
+        for name, symbol in self.macro_series.items():
+            self.macro.extend_frame(name, self.History(symbol, self.macro_lookback, Resolution.Daily))
+    
     def Rebalance(self):
+        self.RefreshMacro()
         if not self.DataReady():
             self.Debug("Data not ready for rebalancing.")
             return
         
         momentum_results = {}
         for symbol in self.equity_assets.values():
-            history = self.History(symbol, self.momentum_window * 22, Resolution.Daily)
-            if history.empty or len(history) < self.momentum_window * 22:
+            window = self.price_windows[symbol]
+            if not window.is_ready:
                 self.Debug(f"Insufficient history for {symbol}")
                 continue
 
-            start_price = history["close"].iloc[0]
-            end_price = history["close"].iloc[-1]
-            momentum = end_price / start_price - 1
-            sma_12m = history["close"].mean()
+            momentum = window.momentum
+            sma_12m = window.sma
             current_price = self.Securities[symbol].Price
 
             self.Debug(f"{symbol}: Momentum={momentum:.2%}, SMA={sma_12m:.2f}, CurrentPrice={current_price:.2f}")
@@ -79,8 +107,10 @@ class MacroOptimizedAssetAllocation(QCAlgorithm):
         self.Debug(f"Rebalanced to: {[str(sym) for sym in sorted_assets[:2]]}")
     
     def YieldCurveInverted(self):
-        if self.yield_curve in self.CurrentSlice and self.CurrentSlice[self.yield_curve]:
-            inversion = self.CurrentSlice[self.yield_curve].Value < 0
+        # Latest T10Y3M value at or before now, whether or not it is in the current slice
+        spread = self.macro.asof("T10Y3M", self.Time, self.macro_max_age)
+        if spread is not None:
+            inversion = spread < 0
             self.Debug(f"Yield curve inversion: {inversion}")
             return inversion
         self.Debug("Yield curve data not available.")
@@ -2,6 +2,8 @@
 ### Available at SSRN: https://ssrn.com/abstract=1585517 or http://dx.doi.org/10.2139/ssrn.1585517 
 
 from AlgorithmImports import *
+from momentum_ranker import MomentumRanker
+from trailing_stops import TrailingStopManager
 
 class MyTradingAlgorithm(QCAlgorithm):
     def Initialize(self):
@@ -20,52 +22,51 @@ class MyTradingAlgorithm(QCAlgorithm):
         # Set the benchmark
         self.SetBenchmark(self.symbols[0])
         
-        # Initialize risk management parameters
-        self.stopLossPercent = 0.05
-        self.trailingStopPercent = 0.02
+        # Initialize risk management parameters (read with GetParameter so backtest parameters apply)
+        self.stopLossPercent = self.GetParameter("stopLossPercent", 0.05)
+        self.trailingStopPercent = self.GetParameter("trailingStopPercent", 0.02)
         
         # Initialize portfolio construction parameters
-        self.rebalancePeriod = timedelta(30)
+        self.rebalancePeriod = timedelta(self.GetParameter("rebalanceDays", 30))
         self.nextRebalanceTime = self.Time + self.rebalancePeriod
         
         # Initialize alpha model parameters
-        self.momentumPeriod = 20
-        self.momentumThreshold = 0.01
+        self.momentumPeriod = self.GetParameter("momentumPeriod", 20)
+        self.momentumThreshold = self.GetParameter("momentumThreshold", 0.01)
+        self.maxPositions = self.GetParameter("maxPositions", 3)
+        
+        # Rolling price matrix of the universe: seeded once from history, then updated from OnData
+        self.ranker = MomentumRanker(self.symbols, self.momentumPeriod, min_periods=1)
+        history = self.History(self.symbols, self.momentumPeriod, Resolution.Daily)
+        if not history.empty:
+            self.ranker.warm_up(history['close'].unstack(level=0))
         
         # Schedule the rebalance function
         self.Schedule.On(self.DateRules.EveryDay(), self.TimeRules.AfterMarketOpen("SPY", 30), self.Rebalance)
         
-        # Initialize a dictionary to store stop prices
-        self.stopPrices = {}
+        # Stop levels of all symbols, ratcheted together on every bar
+        self.stops = TrailingStopManager(self.symbols, self.trailingStopPercent, self.stopLossPercent)
         
     def OnData(self, data):
+        # Add the new closes to the momentum ranker before any rebalance
+        closes = {symbol: data.Bars[symbol].Close for symbol in self.symbols if data.Bars.ContainsKey(symbol)}
+        self.ranker.update(closes)
+        
         # Check if it's time to rebalance the portfolio
         if self.Time >= self.nextRebalanceTime:
             self.Rebalance()
             self.nextRebalanceTime = self.Time + self.rebalancePeriod
         
-        # Implement trailing stop loss
-        for symbol in self.Portfolio.Keys:
-            if symbol in self.stopPrices and symbol in data and data[symbol]:
-                if data[symbol].Close < self.stopPrices[symbol]:
-                    self.Liquidate(symbol)
-                else:
-                    self.stopPrices[symbol] = max(self.stopPrices[symbol], data[symbol].Close * (1 - self.trailingStopPercent))
+        # Implement trailing stop loss: all stops are checked and ratcheted at once
+        for symbol in self.stops.update(closes):
+            self.Liquidate(symbol)
     
     def Rebalance(self):
-        # Calculate momentum for each symbol
-        momentumScores = {}
-        for symbol in self.symbols:
-            history = self.History(symbol, self.momentumPeriod, Resolution.Daily)
-            if not history.empty:
-                momentum = (history['close'][-1] - history['close'][0]) / history['close'][0]
-                momentumScores[symbol] = momentum
-        
-        # Rank symbols by momentum
-        rankedSymbols = sorted(momentumScores, key=momentumScores.get, reverse=True)
+        # Rank the whole universe by momentum at once and keep the best symbols
+        rankedSymbols = self.ranker.top(self.maxPositions)
         
         # Determine the number of positions to hold
-        numPositions = min(3, len(rankedSymbols))
+        numPositions = len(rankedSymbols)
         
         # Calculate the target weight for each position
         targetWeight = 1.0 / numPositions if numPositions > 0 else 0
@@ -78,7 +79,7 @@ class MyTradingAlgorithm(QCAlgorithm):
         # Set target weights for the top ranked symbols
         for symbol in rankedSymbols[:numPositions]:
             self.SetHoldings(symbol, targetWeight)
-            self.stopPrices[symbol] = self.Securities[symbol].Price * (1 - self.stopLossPercent)
+            self.stops.arm(symbol, self.Securities[symbol].Price)
     
     def OnOrderEvent(self, orderEvent):
         # Log order events for debugging
@@ -2,6 +2,8 @@
 #Available at SSRN: https://ssrn.com/abstract=3068852 or http://dx.doi.org/10.2139/ssrn.3068852 
 
 from AlgorithmImports import *
+from order_intents import OrderIntents
+from trailing_stops import TrailingStopManager
 
 class MyTradingAlgorithm(QCAlgorithm):
     def Initialize(self):
@@ -19,24 +21,36 @@ class MyTradingAlgorithm(QCAlgorithm):
         # Set the benchmark
         self.SetBenchmark("SPY")
         
+        # Tunable parameters are read with GetParameter, so that backtest parameters (e.g. from range_sweep.py)
+        # are in place before the indicators and the stop manager are built
+        self.short_window = self.GetParameter("short_window", 50)
+        self.long_window = self.GetParameter("long_window", 200)
+        
         # Initialize indicators
-        self.sma_short = {symbol: self.SMA(symbol, 50, Resolution.Daily) for symbol in self.symbols}
-        self.sma_long = {symbol: self.SMA(symbol, 200, Resolution.Daily) for symbol in self.symbols}
+        self.sma_short = {symbol: self.SMA(symbol, self.short_window, Resolution.Daily) for symbol in self.symbols}
+        self.sma_long = {symbol: self.SMA(symbol, self.long_window, Resolution.Daily) for symbol in self.symbols}
         
         # Initialize risk management parameters
-        self.stop_loss_pct = 0.05
-        self.trailing_stop_pct = 0.02
+        self.stop_loss_pct = self.GetParameter("stop_loss_pct", 0.05)
+        self.trailing_stop_pct = self.GetParameter("trailing_stop_pct", 0.02)
         
         # Initialize portfolio construction parameters
-        self.max_position_size = 0.5  # Max 50% of portfolio in one position
+        self.max_position_size = self.GetParameter("max_position_size", 0.5)  # Max 50% of portfolio in one position
+        self.rebalance_tolerance = 0.02  # Leave positions within 2% of their target weight untouched
+        
+        # Orders are sent only for target changes; each position keeps one stop order that trails the price
+        self.orders = OrderIntents(self, self.rebalance_tolerance)
+        self.stops = TrailingStopManager(self.symbols, self.trailing_stop_pct, self.stop_loss_pct)
         
         # Schedule the rebalancing function
         self.Schedule.On(self.DateRules.MonthStart(), self.TimeRules.AfterMarketOpen("SPY", 30), self.Rebalance)
         
     def OnData(self, data):
+        closes = {}
         for symbol in self.symbols:
             if not data.ContainsKey(symbol):
                 continue
+            closes[symbol] = data[symbol].Close
             
             # Check if indicators are ready
             if not self.sma_short[symbol].IsReady or not self.sma_long[symbol].IsReady:
@@ -44,24 +58,35 @@ class MyTradingAlgorithm(QCAlgorithm):
             
             # Strategy logic: Golden Cross
             if self.sma_short[symbol].Current.Value > self.sma_long[symbol].Current.Value:
-                self.SetHoldings(symbol, self.max_position_size)
+                self.orders.set_target(symbol, self.max_position_size)
             else:
-                self.Liquidate(symbol)
-            
-            # Risk management: Trailing stop loss
-            if self.Portfolio[symbol].Invested:
-                self.SetTrailingStopLoss(symbol, self.trailing_stop_pct)
+                self.orders.set_target(symbol, 0)
+        
+        # Send only the changes, in one batch
+        self.orders.execute()
+        
+        # Risk management: Trailing stop loss
+        self.stops.update(closes)
+        for symbol in closes:
+            self.SetTrailingStopLoss(symbol)
     
     def Rebalance(self):
         # Rebalance the portfolio
         for symbol in self.symbols:
-            self.SetHoldings(symbol, self.max_position_size)
+            self.orders.set_target(symbol, self.max_position_size)
+        self.orders.execute()
+        for symbol in self.symbols:
+            self.SetTrailingStopLoss(symbol)
     
-    def SetTrailingStopLoss(self, symbol, trailing_stop_pct):
-        # Set a trailing stop loss for the given symbol
-        if self.Portfolio[symbol].Invested:
-            stop_price = self.Portfolio[symbol].Price * (1 - trailing_stop_pct)
-            self.StopMarketOrder(symbol, -self.Portfolio[symbol].Quantity, stop_price)
+    def SetTrailingStopLoss(self, symbol):
+        # Keep one stop order per position: armed at the entry price, then moved up with the price
+        if not self.Portfolio[symbol].Invested:
+            self.stops.disarm(symbol)
+            self.orders.set_stop(symbol, None)
+            return
+        if not self.orders.has_stop(symbol):
+            self.stops.arm(symbol, self.Portfolio[symbol].Price)
+        self.orders.set_stop(symbol, self.stops.stop_price(symbol))
     
     def OnOrderEvent(self, orderEvent):
         # Log order events for debugging
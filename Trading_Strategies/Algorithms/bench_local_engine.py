@@ -0,0 +1,151 @@
+## Benchmark suite for local_engine.py
+## Runs every strategy of this folder (and HeikenAshi.py) on local bars and reports bars/sec.
+## Without --data-dir, synthetic random-walk bars are generated for all the tickers the strategies use.
+## The 'engine_only' row runs an algorithm with an empty OnData to separate the engine's own cost per bar from the
+## strategies' Python code; 'engine_share' estimates the part of each strategy's run spent in the engine.
+
+import os
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+from local_engine import LocalDataFeed, LocalEngine, QCAlgorithm, Resolution, load_algorithm
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+STRATEGIES = {
+    'Range': os.path.join(HERE, 'Range.py'),
+    'RSI_for_investing': os.path.join(HERE, 'RSI_for_investing.py'),
+    'PAA_Model': os.path.join(HERE, 'PAA_Model.py'),
+    'HeikenAshi': os.path.join(HERE, '..', '..', 'Tools', 'Quant_Toolbox', 'HeikenAshi.py'),
+}
+
+EQUITY_TICKERS = ['SPY', 'AAPL', 'SLV', 'GLD', 'IEFA', 'VWO', 'TIP', 'IEF']
+MACRO_TICKERS = ['T10Y3M']
+
+# Throughput target of the engine's own loop (engine_only), in bars per millisecond. It does not apply to the
+# strategies: at 1-8 symbols per step it would leave 1-8 microseconds per step for their OnData, orders and stop
+# updates, which cost 10-175 microseconds per step in CPython
+TARGET_BARS_PER_MS = 1000
+
+
+class EngineOnly(QCAlgorithm):
+    """
+    Subscribes to every equity ticker and does nothing per bar: measures the engine overhead alone.
+    """
+    def Initialize(self):
+        for ticker in EQUITY_TICKERS:
+            self.AddEquity(ticker, Resolution.Daily)
+
+    def OnData(self, data):
+        pass
+
+
+def synthetic_frames(start: str = '2015-01-01', end: str = '2024-12-31', seed: int = 7) -> Dict[str, pd.DataFrame]:
+    """
+    Random-walk daily bars for every equity ticker and a random macro series.
+
+    Args:
+        start (str): First business day.
+        end (str): Last business day.
+        seed (int): Random seed.
+
+    Returns:
+        Dict[str, pd.DataFrame]: Frames keyed by ticker.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start, end)
+    frames = {}
+    for ticker in EQUITY_TICKERS:
+        close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.012, len(dates))))
+        open_ = np.r_[close[0], close[:-1]] * (1 + rng.normal(0, 0.003, len(dates)))
+        high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.004, len(dates))))
+        low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.004, len(dates))))
+        volume = rng.integers(1_000_000, 10_000_000, len(dates)).astype(float)
+        frames[ticker] = pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume},
+                                      index=dates)
+    for ticker in MACRO_TICKERS:
+        frames[ticker] = pd.DataFrame({'value': np.cumsum(rng.normal(0, 0.05, len(dates))) + 1.0}, index=dates)
+    return frames
+
+
+def benchmark(data_dir: Optional[str] = None, repeats: int = 3, strategies: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Backtest each strategy and report its throughput.
+
+    Args:
+        data_dir (Optional[str]): Directory with <TICKER>.csv/.parquet bars. If None, uses synthetic bars.
+        repeats (int): Runs per strategy; the fastest is reported.
+        strategies (Optional[List[str]]): Names of STRATEGIES entries to run. If None, runs all of them.
+
+    Returns:
+        pd.DataFrame: One row per strategy with bars, orders, seconds, bars/sec, microseconds per step and the
+                      estimated engine share of the time (engine_only's time over the same dates).
+    """
+    frames = synthetic_frames() if data_dir is None else None
+    feed = LocalDataFeed(data_dir or tempfile.gettempdir(), frames=frames)
+
+    rows = []
+    for name in (strategies or ['engine_only'] + list(STRATEGIES)):
+        algorithm_class = EngineOnly if name == 'engine_only' else load_algorithm(STRATEGIES[name])
+        best = None
+        for _ in range(repeats):
+            engine = LocalEngine(feed)
+            # Run over the whole data set rather than the strategy's own backtest dates
+            result = engine.run(_whole_range(algorithm_class))
+            if best is None or result.seconds < best.seconds:
+                best = result
+        rows.append({
+            'strategy': name,
+            'bars': best.bars,
+            'orders': best.orders,
+            'seconds': best.seconds,
+            'bars_per_sec': best.bars_per_second,
+            'bars_per_ms': best.bars_per_second / 1000,
+            'us_per_step': best.seconds / max(len(best.dates), 1) * 1e6,
+            **best.stats(),
+        })
+    results = pd.DataFrame(rows).set_index('strategy')
+    if 'engine_only' in results.index:
+        # Every run covers the same dates, so the empty algorithm's time is the engine's cost of each run
+        results['engine_share'] = (results.loc['engine_only', 'us_per_step'] / results['us_per_step']).clip(upper=1.0)
+    return results
+
+
+def _whole_range(algorithm_class: type) -> type:
+    """
+    Subclass an algorithm so that SetStartDate/SetEndDate keep the full range of the local data.
+    """
+    class WholeRange(algorithm_class):
+        def SetStartDate(self, *args):
+            pass
+
+        def SetEndDate(self, *args):
+            pass
+
+    WholeRange.__name__ = algorithm_class.__name__
+    return WholeRange
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the local backtest engine on every strategy.")
+    parser.add_argument('--data-dir', default=None, help="Directory with <TICKER>.csv/.parquet bars (default: synthetic)")
+    parser.add_argument('--repeats', type=int, default=3, help="Runs per strategy; the fastest is reported")
+    args = parser.parse_args()
+
+    pd.set_option('display.width', 160)
+    pd.set_option('display.max_columns', None)
+    results = benchmark(args.data_dir, args.repeats)
+    print(results)
+
+    engine = results.loc['engine_only', 'bars_per_ms']
+    strategies = results.drop(index='engine_only')
+    print(f"\nEngine target: {TARGET_BARS_PER_MS:,} bars/ms. Engine alone: {engine:,.0f} bars/ms "
+          f"({'meets' if engine >= TARGET_BARS_PER_MS else 'BELOW'} the target).")
+    print(f"Strategies: {strategies['bars_per_ms'].min():,.0f}-{strategies['bars_per_ms'].max():,.0f} bars/ms, "
+          f"{strategies['us_per_step'].min():,.0f}-{strategies['us_per_step'].max():,.0f} us per step, of which the "
+          f"engine accounts for {strategies['engine_share'].min():.0%}-{strategies['engine_share'].max():.0%}. "
+          f"They do not reach {TARGET_BARS_PER_MS:,} bars/ms: their own per-bar Python code bounds the throughput.")
@@ -0,0 +1,1064 @@
+## Offline backtest engine for the QCAlgorithm strategies of this folder
+## Implements the subset of the QuantConnect API they use, fed from local daily Parquet/CSV bars,
+## so that unmodified strategy files can be run and swept without the LEAN runtime.
+##
+## Simplified execution model (daily bars only):
+## - OnData receives bar D once it has closed; orders fill immediately at the latest close.
+## - Scheduled events of day D+1 run after bar D, seeing bar D as the latest data, as in LEAN.
+## - Stop market orders are checked against the next bars and fill at min/max(open, stop).
+## - No buying-power checks; optional fees per order and per traded value.
+
+import os
+import sys
+import time
+import types
+import importlib.util
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# ---------------------------
+# QuantConnect API subset
+# ---------------------------
+
+class Resolution:
+    Tick = 'Tick'
+    Second = 'Second'
+    Minute = 'Minute'
+    Hour = 'Hour'
+    Daily = 'Daily'
+
+
+class Symbol(str):
+    """
+    Security identifier: the upper-case ticker string. Being a str, it hashes, compares and sorts like its ticker
+    in C, so dictionaries keyed by symbols accept the ticker as well.
+    """
+    def __new__(cls, ticker: str):
+        symbol = super().__new__(cls, ticker.upper())
+        symbol.Value = str(symbol)
+        return symbol
+
+    def __getnewargs__(self):
+        return (self.Value,)
+
+    def __repr__(self):
+        return f"Symbol({self.Value})"
+
+
+class Fred:
+    """
+    Marker type for FRED series added with AddData(Fred, "T10Y3M").
+    """
+    pass
+
+
+class TradeBar:
+    __slots__ = ('Symbol', 'Time', 'Open', 'High', 'Low', 'Close', 'Volume')
+
+    def __init__(self, symbol, time_, open_, high, low, close, volume):
+        self.Symbol = symbol
+        self.Time = time_
+        self.Open = open_
+        self.High = high
+        self.Low = low
+        self.Close = close
+        self.Volume = volume
+
+    @property
+    def EndTime(self) -> datetime:
+        return self.Time + timedelta(days=1)
+
+    @property
+    def Value(self) -> float:
+        return self.Close
+
+    @property
+    def Price(self) -> float:
+        return self.Close
+
+
+class CustomDataPoint:
+    __slots__ = ('Symbol', 'Time', 'Value')
+
+    def __init__(self, symbol, time_, value):
+        self.Symbol = symbol
+        self.Time = time_
+        self.Value = value
+
+    @property
+    def Price(self) -> float:
+        return self.Value
+
+
+class _SliceView:
+    """
+    Read-only mapping of the bars available at one engine step. Bars are built on access.
+    """
+    def __init__(self, engine: 'LocalEngine', index: int, symbols: List[Symbol], members: frozenset):
+        self._engine = engine
+        self._index = index
+        self._symbols = symbols
+        self._members = members
+
+    def ContainsKey(self, symbol) -> bool:
+        return self._engine._has_bar(symbol, self._index, self._members)
+
+    def __contains__(self, symbol) -> bool:
+        return self.ContainsKey(symbol)
+
+    def __getitem__(self, symbol):
+        if not self.ContainsKey(symbol):
+            raise KeyError(f"{symbol} not found in slice")
+        return self._engine._bar(symbol, self._index)
+
+    def get(self, symbol, default=None):
+        return self[symbol] if self.ContainsKey(symbol) else default
+
+    def Keys(self) -> List[Symbol]:
+        return [s for s in self._symbols if self.ContainsKey(s)]
+
+    def __iter__(self):
+        return iter(self.Keys())
+
+    def __len__(self):
+        return len(self.Keys())
+
+
+class Slice(_SliceView):
+    """
+    Data of one time step: equity TradeBars and custom data points.
+    """
+    def __init__(self, engine: 'LocalEngine', index: int):
+        super().__init__(engine, index, engine._all_symbols, engine._all_members)
+        self.Time = engine._step_time(index)
+        self.Bars = _SliceView(engine, index, engine._equity_symbols, engine._equity_members)
+
+
+class IndicatorDataPoint:
+    __slots__ = ('Value',)
+
+    def __init__(self):
+        self.Value = 0.0
+
+
+class SimpleMovingAverage:
+    """
+    O(1) simple moving average over a fixed-size ring buffer.
+    """
+    def __init__(self, period: int):
+        self.Period = period
+        self.Current = IndicatorDataPoint()
+        self.Samples = 0
+        # A list rather than an array: indexing it returns Python floats, which is faster one value at a time
+        self._window = [0.0] * period
+        self._sum = 0.0
+
+    @property
+    def IsReady(self) -> bool:
+        return self.Samples >= self.Period
+
+    def Update(self, time_, value: float) -> bool:
+        slot = self.Samples % self.Period
+        self._sum += value - self._window[slot]
+        self._window[slot] = value
+        self.Samples += 1
+        self.Current.Value = self._sum / min(self.Samples, self.Period)
+        return self.IsReady
+
+    def Reset(self):
+        self.__init__(self.Period)
+
+
+class Security:
+    def __init__(self, engine: 'LocalEngine', symbol: Symbol):
+        self._engine = engine
+        self.Symbol = symbol
+
+    @property
+    def Price(self) -> float:
+        return self._engine._price(self.Symbol)
+
+    @property
+    def Close(self) -> float:
+        return self.Price
+
+    @property
+    def HasData(self) -> bool:
+        price = self._engine._price(self.Symbol)
+        return price == price
+
+
+class SecurityHolding:
+    def __init__(self, engine: 'LocalEngine', symbol: Symbol):
+        self._engine = engine
+        self.Symbol = symbol
+        self.Quantity = 0
+        self.AveragePrice = 0.0
+
+    @property
+    def Price(self) -> float:
+        price = self._engine._price(self.Symbol)
+        return price if price == price else 0.0
+
+    @property
+    def Invested(self) -> bool:
+        return self.Quantity != 0
+
+    @property
+    def HoldingsValue(self) -> float:
+        return self.Quantity * self.Price
+
+    @property
+    def UnrealizedProfit(self) -> float:
+        return self.Quantity * (self.Price - self.AveragePrice)
+
+
+class SecurityPortfolioManager:
+    def __init__(self, engine: 'LocalEngine'):
+        self._engine = engine
+        self._holdings: Dict[Symbol, SecurityHolding] = {}
+        self.Cash = 0.0
+
+    def _add(self, symbol: Symbol):
+        self._holdings.setdefault(symbol, SecurityHolding(self._engine, symbol))
+
+    def __getitem__(self, symbol) -> SecurityHolding:
+        holding = self._holdings.get(symbol)
+        return holding if holding is not None else self._holdings[self._engine._symbol(symbol)]
+
+    def __contains__(self, symbol) -> bool:
+        return self._engine._symbol(symbol) in self._holdings
+
+    def __iter__(self):
+        return iter(self._holdings)
+
+    @property
+    def Keys(self) -> List[Symbol]:
+        return list(self._holdings)
+
+    @property
+    def Values(self) -> List[SecurityHolding]:
+        return list(self._holdings.values())
+
+    @property
+    def Invested(self) -> bool:
+        return any(holding.Quantity != 0 for holding in self._holdings.values())
+
+    @property
+    def TotalHoldingsValue(self) -> float:
+        return self._engine._holdings_value()
+
+    @property
+    def TotalPortfolioValue(self) -> float:
+        return self.Cash + self._engine._holdings_value()
+
+
+class SecurityManager:
+    def __init__(self, engine: 'LocalEngine'):
+        self._engine = engine
+        self._securities: Dict[Symbol, Security] = {}
+
+    def __getitem__(self, symbol) -> Security:
+        security = self._securities.get(symbol)
+        return security if security is not None else self._securities[self._engine._symbol(symbol)]
+
+    def __contains__(self, symbol) -> bool:
+        return self._engine._symbol(symbol) in self._securities
+
+    def ContainsKey(self, symbol) -> bool:
+        return symbol in self
+
+    @property
+    def Keys(self) -> List[Symbol]:
+        return list(self._securities)
+
+
+class OrderStatus:
+    Submitted = 'Submitted'
+    UpdateSubmitted = 'UpdateSubmitted'
+    Filled = 'Filled'
+    Canceled = 'Canceled'
+    Invalid = 'Invalid'
+
+
+class UpdateOrderFields:
+    """
+    Fields to change on an open order; None leaves a field unchanged.
+    """
+    def __init__(self, Quantity: Optional[float] = None, StopPrice: Optional[float] = None,
+                 LimitPrice: Optional[float] = None, Tag: Optional[str] = None):
+        self.Quantity = Quantity
+        self.StopPrice = StopPrice
+        self.LimitPrice = LimitPrice
+        self.Tag = Tag
+
+
+class OrderResponse:
+    def __init__(self, is_success: bool):
+        self.IsSuccess = is_success
+        self.IsError = not is_success
+
+
+class OrderEvent:
+    def __init__(self, order_id: int, symbol: Symbol, time_, status: str, quantity: float, fill_price: float):
+        self.OrderId = order_id
+        self.Symbol = symbol
+        self.UtcTime = time_
+        self.Status = status
+        self.FillQuantity = quantity
+        self.FillPrice = fill_price
+
+    def __str__(self):
+        return (f"Time: {self.UtcTime} OrderID: {self.OrderId} Symbol: {self.Symbol} Status: {self.Status} "
+                f"Quantity: {self.FillQuantity} FillPrice: {self.FillPrice}")
+
+
+class OrderTicket:
+    def __init__(self, engine: 'LocalEngine', order_id: int, symbol: Symbol, quantity: float,
+                 stop_price: Optional[float] = None):
+        self._engine = engine
+        self.OrderId = order_id
+        self.Symbol = symbol
+        self.Quantity = quantity
+        self.StopPrice = stop_price
+        self.Status = OrderStatus.Submitted
+        self.AverageFillPrice = 0.0
+
+    def Cancel(self, tag: str = '') -> OrderResponse:
+        return OrderResponse(self._engine._cancel(self))
+
+    def Update(self, fields: UpdateOrderFields) -> OrderResponse:
+        return OrderResponse(self._engine._update(self, fields))
+
+    def UpdateQuantity(self, quantity: float, tag: str = '') -> OrderResponse:
+        return self.Update(UpdateOrderFields(Quantity=quantity))
+
+    def UpdateStopPrice(self, stop_price: float, tag: str = '') -> OrderResponse:
+        return self.Update(UpdateOrderFields(StopPrice=stop_price))
+
+
+class DateRule:
+    def __init__(self, kind: str):
+        self.kind = kind
+
+
+class DateRules:
+    def EveryDay(self, symbol=None) -> DateRule:
+        return DateRule('EveryDay')
+
+    def MonthStart(self, symbol=None, daysOffset: int = 0) -> DateRule:
+        return DateRule('MonthStart')
+
+    def MonthEnd(self, symbol=None, daysOffset: int = 0) -> DateRule:
+        return DateRule('MonthEnd')
+
+    def WeekStart(self, symbol=None, daysOffset: int = 0) -> DateRule:
+        return DateRule('WeekStart')
+
+    def WeekEnd(self, symbol=None, daysOffset: int = 0) -> DateRule:
+        return DateRule('WeekEnd')
+
+
+class TimeRule:
+    def __init__(self, minutes: int):
+        self.minutes = minutes
+
+
+class TimeRules:
+    OPEN_MINUTES = 9 * 60 + 30
+    CLOSE_MINUTES = 16 * 60
+
+    def AfterMarketOpen(self, symbol=None, minutesAfterOpen: float = 0, extendedMarketOpen: bool = False) -> TimeRule:
+        return TimeRule(self.OPEN_MINUTES + int(minutesAfterOpen))
+
+    def BeforeMarketClose(self, symbol=None, minutesBeforeClose: float = 0, extendedMarketClose: bool = False) -> TimeRule:
+        return TimeRule(self.CLOSE_MINUTES - int(minutesBeforeClose))
+
+    def At(self, hour: int, minute: int = 0, second: int = 0, *args) -> TimeRule:
+        return TimeRule(hour * 60 + minute)
+
+    @property
+    def Midnight(self) -> TimeRule:
+        return TimeRule(0)
+
+
+class ScheduleManager:
+    def __init__(self, engine: 'LocalEngine'):
+        self._engine = engine
+
+    def On(self, date_rule: DateRule, time_rule: TimeRule, callback: Callable[[], None]):
+        self._engine._events.append((date_rule, time_rule, callback))
+
+
+class QCAlgorithm:
+    """
+    Local stand-in for LEAN's QCAlgorithm. The engine injects itself before Initialize is called.
+    """
+    _engine: 'LocalEngine' = None
+
+    def Initialize(self):
+        pass
+
+    def OnData(self, data):
+        pass
+
+    def OnOrderEvent(self, orderEvent):
+        pass
+
+    def OnEndOfAlgorithm(self):
+        pass
+
+    # -- Setup --
+    def SetStartDate(self, year: int, month: int = 1, day: int = 1):
+        self._engine.start = pd.Timestamp(year, month, day)
+
+    def SetEndDate(self, year: int, month: int = 1, day: int = 1):
+        self._engine.end = pd.Timestamp(year, month, day)
+
+    def SetCash(self, cash: float):
+        self._engine.portfolio.Cash = float(cash)
+        self._engine.initial_cash = float(cash)
+
+    def SetBenchmark(self, symbol):
+        self._engine.benchmark = self._engine._symbol(symbol)
+
+    def SetWarmUp(self, period, resolution=None):
+        pass
+
+    def GetParameter(self, name: str, default=None):
+        """
+        Value of a backtest parameter (LocalEngine.run(parameters=...)), converted to the type of `default`.
+        Without a default the value is returned as a string, or None if the parameter is not set.
+        """
+        value = self._engine.parameters.get(name)
+        if value is None:
+            return default
+        return str(value) if default is None else type(default)(value)
+
+    def AddEquity(self, ticker: str, resolution=Resolution.Daily, *args, **kwargs) -> Security:
+        return self._engine._add_equity(ticker)
+
+    def AddData(self, data_type, ticker: str, resolution=Resolution.Daily, *args, **kwargs) -> Security:
+        return self._engine._add_custom(ticker)
+
+    # -- Data --
+    @property
+    def Time(self) -> datetime:
+        return self._engine.time
+
+    @property
+    def CurrentSlice(self) -> Slice:
+        return self._engine.current_slice
+
+    @property
+    def Portfolio(self) -> SecurityPortfolioManager:
+        return self._engine.portfolio
+
+    @property
+    def Securities(self) -> SecurityManager:
+        return self._engine.securities
+
+    @property
+    def Schedule(self) -> ScheduleManager:
+        return self._engine.schedule
+
+    @property
+    def DateRules(self) -> DateRules:
+        return self._engine.date_rules
+
+    @property
+    def TimeRules(self) -> TimeRules:
+        return self._engine.time_rules
+
+    def History(self, symbols, periods: int, resolution=Resolution.Daily) -> pd.DataFrame:
+        return self._engine._history(symbols, int(periods))
+
+    def SMA(self, symbol, period: int, resolution=Resolution.Daily) -> SimpleMovingAverage:
+        indicator = SimpleMovingAverage(period)
+        self._engine._indicators.append((self._engine._symbol(symbol), indicator))
+        return indicator
+
+    # -- Orders --
+    def SetHoldings(self, symbol, percentage: float, liquidateExistingHoldings: bool = False, tag: str = ''):
+        self._engine._set_holdings(self._engine._symbol(symbol), percentage)
+
+    def Liquidate(self, symbol=None, tag: str = ''):
+        if symbol is None:
+            for held in list(self._engine.portfolio.Keys):
+                self._engine._liquidate(held)
+        else:
+            self._engine._liquidate(self._engine._symbol(symbol))
+
+    def MarketOrder(self, symbol, quantity: float, *args, **kwargs) -> OrderTicket:
+        return self._engine._market_order(self._engine._symbol(symbol), quantity)
+
+    def StopMarketOrder(self, symbol, quantity: float, stopPrice: float, tag: str = '') -> OrderTicket:
+        return self._engine._stop_order(self._engine._symbol(symbol), quantity, stopPrice)
+
+    # -- Logging --
+    def Debug(self, message: str):
+        self._engine._log(message)
+
+    def Log(self, message: str):
+        self._engine._log(message)
+
+    def Error(self, message: str):
+        self._engine._log(message)
+
+
+def _algorithm_imports_module() -> types.ModuleType:
+    """
+    Build the module served as 'AlgorithmImports' to strategies loaded by this engine.
+    """
+    module = types.ModuleType('AlgorithmImports')
+    exported = {
+        'QCAlgorithm': QCAlgorithm, 'Resolution': Resolution, 'Symbol': Symbol, 'Fred': Fred,
+        'TradeBar': TradeBar, 'Slice': Slice, 'OrderStatus': OrderStatus, 'OrderEvent': OrderEvent,
+        'OrderTicket': OrderTicket, 'UpdateOrderFields': UpdateOrderFields, 'OrderResponse': OrderResponse,
+        'SimpleMovingAverage': SimpleMovingAverage,
+        'datetime': datetime, 'timedelta': timedelta, 'np': np, 'pd': pd,
+    }
+    module.__dict__.update(exported)
+    module.__all__ = list(exported)
+    return module
+
+
+def load_algorithm(path: str, class_name: Optional[str] = None) -> type:
+    """
+    Import a strategy file written for LEAN and return its QCAlgorithm subclass.
+
+    Args:
+        path (str): Path to the strategy file, e.g. 'Range.py'.
+        class_name (Optional[str]): Class to return. If None, returns the only QCAlgorithm subclass.
+
+    Returns:
+        type: The algorithm class.
+    """
+    sys.modules['AlgorithmImports'] = _algorithm_imports_module()
+    directory = os.path.dirname(os.path.abspath(path))
+    module_name = f"_local_{os.path.splitext(os.path.basename(path))[0]}"
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+
+    # Companion modules (e.g. heikin_ashi.py) are imported from the strategy's own folder
+    sys.path.insert(0, directory)
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        sys.path.remove(directory)
+
+    candidates = [obj for name, obj in vars(module).items()
+                  if isinstance(obj, type) and issubclass(obj, QCAlgorithm) and obj is not QCAlgorithm
+                  and (class_name is None or name == class_name)]
+    if len(candidates) != 1:
+        raise ValueError(f"Expected one QCAlgorithm subclass in {path}, found {len(candidates)}")
+    return candidates[0]
+
+
+# ---------------------------
+# Local data
+# ---------------------------
+
+class LocalDataFeed:
+    """
+    Daily bars read from '<TICKER>.parquet' or '<TICKER>.csv' files in a directory.
+
+    Equity files need open/high/low/close(/volume) columns (any case) and a date index or column.
+    Custom series such as FRED's need a single value column.
+    """
+    def __init__(self, data_dir: str = 'data', frames: Optional[Dict[str, pd.DataFrame]] = None):
+        """
+        Args:
+            data_dir (str): Directory holding one file per ticker.
+            frames (Optional[Dict[str, pd.DataFrame]]): In-memory frames by ticker, used before the files.
+        """
+        self.data_dir = data_dir
+        self.frames = {ticker.upper(): frame for ticker, frame in (frames or {}).items()}
+
+    def load(self, ticker: str) -> pd.DataFrame:
+        ticker = ticker.upper()
+        if ticker in self.frames:
+            data = self.frames[ticker]
+        else:
+            parquet_path = os.path.join(self.data_dir, f"{ticker}.parquet")
+            csv_path = os.path.join(self.data_dir, f"{ticker}.csv")
+            if os.path.exists(parquet_path):
+                data = pd.read_parquet(parquet_path)
+            elif os.path.exists(csv_path):
+                data = pd.read_csv(csv_path)
+            else:
+                raise FileNotFoundError(f"No local bars for {ticker} in {self.data_dir}")
+
+        data = data.copy()
+        data.columns = [str(c).strip().lower() for c in data.columns]
+        if not isinstance(data.index, pd.DatetimeIndex):
+            date_col = next((c for c in ('date', 'datetime', 'time', 'timestamp') if c in data.columns), data.columns[0])
+            data = data.set_index(date_col)
+        data.index = pd.to_datetime(data.index).tz_localize(None).normalize()
+        data = data[~data.index.duplicated(keep='last')].sort_index()
+        return data
+
+
+# ---------------------------
+# Engine
+# ---------------------------
+
+class BacktestResult:
+    """
+    Outcome of a local backtest.
+    """
+    def __init__(self, dates: pd.DatetimeIndex, equity: np.ndarray, benchmark: Optional[np.ndarray],
+                 orders: int, traded_value: float, bars: int, seconds: float, logs: List[str]):
+        self.dates = dates
+        self.equity = equity
+        self.benchmark = benchmark
+        self.orders = orders
+        self.traded_value = traded_value
+        self.bars = bars
+        self.seconds = seconds
+        self.logs = logs
+
+    @property
+    def bars_per_second(self) -> float:
+        return self.bars / self.seconds if self.seconds > 0 else float('inf')
+
+    def stats(self) -> Dict[str, float]:
+        return performance_stats(self.equity, self.traded_value)
+
+
+def performance_stats(equity: np.ndarray, traded_value: float = 0.0, periods_per_year: int = 252) -> Dict[str, float]:
+    """
+    Summary statistics of a daily equity curve.
+
+    Args:
+        equity (np.ndarray): Portfolio value per bar.
+        traded_value (float): Total absolute value traded over the period.
+        periods_per_year (int): Bars per year used for annualization.
+
+    Returns:
+        Dict[str, float]: 'total_return', 'sharpe', 'max_drawdown' (positive fraction) and
+                          'turnover' (annualized traded value over average equity).
+    """
+    equity = np.asarray(equity, dtype=float)
+    if len(equity) < 2 or equity[0] <= 0:
+        return {'total_return': 0.0, 'sharpe': 0.0, 'max_drawdown': 0.0, 'turnover': 0.0}
+    returns = np.diff(equity) / equity[:-1]
+    std = returns.std(ddof=1) if len(returns) > 1 else 0.0
+    sharpe = returns.mean() / std * np.sqrt(periods_per_year) if std > 0 else 0.0
+    drawdown = 1 - equity / np.maximum.accumulate(equity)
+    years = len(returns) / periods_per_year
+    return {
+        'total_return': float(equity[-1] / equity[0] - 1),
+        'sharpe': float(sharpe),
+        'max_drawdown': float(drawdown.max()),
+        'turnover': float(traded_value / equity.mean() / years) if years > 0 else 0.0,
+    }
+
+
+class LocalEngine:
+    """
+    Runs a QCAlgorithm subclass over local daily bars.
+    """
+    def __init__(self, feed: LocalDataFeed, fee_per_order: float = 0.0, fee_rate: float = 0.0,
+                 keep_logs: bool = False):
+        """
+        Args:
+            feed (LocalDataFeed): Source of the bars of every ticker the strategy adds.
+            fee_per_order (float): Fixed fee charged on every fill.
+            fee_rate (float): Fee charged as a fraction of the traded value.
+            keep_logs (bool): Keep Debug/Log messages in the result (off for speed).
+        """
+        self.feed = feed
+        self.fee_per_order = fee_per_order
+        self.fee_rate = fee_rate
+        self.keep_logs = keep_logs
+
+    # -- Setup helpers called by QCAlgorithm --
+    def _reset(self):
+        self.start: Optional[pd.Timestamp] = None
+        self.end: Optional[pd.Timestamp] = None
+        self.initial_cash = 100000.0
+        self.parameters: Dict = {}
+        self.benchmark: Optional[Symbol] = None
+        self.portfolio = SecurityPortfolioManager(self)
+        self.portfolio.Cash = self.initial_cash
+        self.securities = SecurityManager(self)
+        self.schedule = ScheduleManager(self)
+        self.date_rules = DateRules()
+        self.time_rules = TimeRules()
+        self.time = datetime(1970, 1, 1)
+        self.current_slice: Optional[Slice] = None
+        self._symbols: Dict[str, Symbol] = {}
+        self._equity_symbols: List[Symbol] = []
+        self._all_symbols: List[Symbol] = []
+        self._equity_members: frozenset = frozenset()
+        self._all_members: frozenset = frozenset()
+        self._raw: Dict[Symbol, pd.DataFrame] = {}
+        self._positions: Dict[Symbol, float] = {}
+        self._value_cursor = -1
+        self._value = 0.0
+        self._indicators: List[Tuple[Symbol, SimpleMovingAverage]] = []
+        self._events: List[Tuple[DateRule, TimeRule, Callable[[], None]]] = []
+        self._open_orders: Dict[int, OrderTicket] = {}
+        self._next_order_id = 1
+        self._orders = 0
+        self._traded_value = 0.0
+        self._logs: List[str] = []
+        self._cursor = -1
+        self._initialized = False
+        self._calendar: Optional[pd.DatetimeIndex] = None
+
+    def _symbol(self, symbol) -> Symbol:
+        if isinstance(symbol, Symbol):
+            return symbol
+        key = str(symbol).upper()
+        if key not in self._symbols:
+            self._symbols[key] = Symbol(key)
+        return self._symbols[key]
+
+    def _add_equity(self, ticker: str) -> Security:
+        symbol = self._symbol(ticker)
+        if symbol not in self._raw:
+            self._raw[symbol] = self.feed.load(ticker)
+            self._equity_symbols.append(symbol)
+            self._all_symbols.append(symbol)
+            self._equity_members = frozenset(self._equity_symbols)
+            self._all_members = frozenset(self._all_symbols)
+            self.securities._securities[symbol] = Security(self, symbol)
+            self.portfolio._add(symbol)
+            self._calendar = None
+        return self.securities[symbol]
+
+    def _add_custom(self, ticker: str) -> Security:
+        symbol = self._symbol(ticker)
+        if symbol not in self._raw:
+            self._raw[symbol] = self.feed.load(ticker)
+            self._all_symbols.append(symbol)
+            self._all_members = frozenset(self._all_symbols)
+            self.securities._securities[symbol] = Security(self, symbol)
+            self.portfolio._add(symbol)
+            self._calendar = None
+        return self.securities[symbol]
+
+    def _prepare(self):
+        """
+        Align every series on the trading calendar (union of equity dates) as NumPy arrays.
+        """
+        dates = pd.DatetimeIndex([])
+        for symbol in self._equity_symbols:
+            dates = dates.union(self._raw[symbol].index)
+        self._calendar = dates
+        self._dates = dates.to_pydatetime()
+        # Times of OnData (bar close), built once rather than every step
+        self._step_times = [date + timedelta(days=1) for date in self._dates]
+        self._open, self._high, self._low, self._close, self._volume = {}, {}, {}, {}, {}
+        self._present: Dict[Symbol, np.ndarray] = {}
+        self._rows: Dict[Symbol, np.ndarray] = {}
+        self._history_frames: Dict[Symbol, pd.DataFrame] = {}
+        for symbol, data in self._raw.items():
+            aligned = data.reindex(dates)
+            if symbol in self._equity_symbols:
+                for field, store in (('open', self._open), ('high', self._high), ('low', self._low),
+                                     ('close', self._close), ('volume', self._volume)):
+                    values = aligned[field] if field in aligned.columns else pd.Series(0.0, index=dates)
+                    store[symbol] = values.to_numpy(dtype=float)
+                self._present[symbol] = ~np.isnan(self._close[symbol])
+                history = data[[c for c in ('open', 'high', 'low', 'close', 'volume') if c in data.columns]]
+            else:
+                # Custom data: a single value column, only present on its own observation dates
+                value_col = 'value' if 'value' in data.columns else data.columns[-1]
+                values = aligned[value_col].to_numpy(dtype=float)
+                self._close[symbol] = values
+                self._present[symbol] = ~np.isnan(values)
+                history = data[[value_col]].rename(columns={value_col: 'value'})
+            # Number of the symbol's own rows dated on or before each calendar date
+            self._rows[symbol] = np.searchsorted(data.index.values, dates.values, side='right')
+            history.index = pd.MultiIndex.from_arrays([[symbol] * len(history), history.index], names=['symbol', 'time'])
+            self._history_frames[symbol] = history
+        # Last known close per step (custom data carries its last value forward)
+        self._last_close = {symbol: pd.Series(values).ffill().to_numpy() for symbol, values in self._close.items()}
+        self._value_cursor = -1
+
+        # Lists for the per-bar accessors: indexing a list returns a Python float (or bool), several times cheaper
+        # than indexing a NumPy array one element at a time
+        self._present_rows = {symbol: present.tolist() for symbol, present in self._present.items()}
+        self._last_close_rows = {symbol: values.tolist() for symbol, values in self._last_close.items()}
+        self._close_rows = {symbol: values.tolist() for symbol, values in self._close.items()}
+        self._bar_rows = {symbol: list(zip(self._open[symbol].tolist(), self._high[symbol].tolist(),
+                                           self._low[symbol].tolist(), self._close[symbol].tolist(),
+                                           self._volume[symbol].tolist()))
+                          for symbol in self._equity_symbols}
+
+    # -- Data access --
+    def _step_time(self, index: int) -> datetime:
+        return self._step_times[index]
+
+    def _has_bar(self, symbol, index: int, members: frozenset) -> bool:
+        symbol = self._symbol(symbol)
+        return symbol in members and self._present_rows[symbol][index]
+
+    def _bar(self, symbol, index: int):
+        symbol = self._symbol(symbol)
+        row = self._bar_rows.get(symbol)
+        if row is not None:
+            return TradeBar(symbol, self._dates[index], *row[index])
+        return CustomDataPoint(symbol, self._dates[index], self._close_rows[symbol][index])
+
+    def _price(self, symbol: Symbol) -> float:
+        if self._cursor < 0:
+            return float('nan')
+        rows = self._last_close_rows.get(symbol)
+        return float('nan') if rows is None else rows[self._cursor]
+
+    def _holdings_value(self) -> float:
+        # Sum over the open positions only (a handful of Python floats), cached for the current step; fills reset it
+        cursor = self._cursor
+        if self._value_cursor != cursor:
+            if cursor < 0:
+                return 0.0
+            rows = self._last_close_rows
+            self._value = sum(quantity * rows[symbol][cursor] for symbol, quantity in self._positions.items())
+            self._value_cursor = cursor
+        return self._value
+
+    def _history(self, symbols, periods: int) -> pd.DataFrame:
+        if self._calendar is None:
+            self._prepare()
+        if isinstance(symbols, (list, tuple)):
+            frames = [self._history(symbol, periods) for symbol in symbols]
+            return pd.concat(frames) if frames else pd.DataFrame()
+        symbol = self._symbol(symbols)
+        if self._cursor >= 0:
+            available = int(self._rows[symbol][self._cursor])
+        else:
+            # Before the first step: bars strictly before the start date
+            first = self.start if self.start is not None else self._calendar[0]
+            available = int(np.searchsorted(self._raw[symbol].index.values, np.datetime64(first), side='left'))
+        return self._history_frames[symbol].iloc[max(0, available - periods):available]
+
+    # -- Orders --
+    def _fill(self, symbol: Symbol, quantity: float, price: float, ticket: Optional[OrderTicket] = None):
+        holding = self.portfolio._holdings[symbol]
+        traded = abs(quantity) * price
+        new_quantity = holding.Quantity + quantity
+        if new_quantity == 0:
+            holding.AveragePrice = 0.0
+        elif holding.Quantity == 0 or (holding.Quantity > 0) != (new_quantity > 0):
+            holding.AveragePrice = price
+        elif abs(new_quantity) > abs(holding.Quantity):
+            holding.AveragePrice = (holding.AveragePrice * holding.Quantity + price * quantity) / new_quantity
+        holding.Quantity = new_quantity
+        if new_quantity:
+            self._positions[symbol] = new_quantity
+        else:
+            self._positions.pop(symbol, None)
+        self._value_cursor = -1
+        self.portfolio.Cash -= quantity * price + self.fee_per_order + self.fee_rate * traded
+        self._traded_value += traded
+        self._orders += 1
+
+        if ticket is None:
+            ticket = OrderTicket(self, self._next_order_id, symbol, quantity)
+            self._next_order_id += 1
+        ticket.Status = OrderStatus.Filled
+        ticket.AverageFillPrice = price
+        self.algorithm.OnOrderEvent(OrderEvent(ticket.OrderId, symbol, self.time, OrderStatus.Filled, quantity, price))
+        return ticket
+
+    def _market_order(self, symbol: Symbol, quantity: float) -> Optional[OrderTicket]:
+        price = self._price(symbol)
+        if quantity == 0 or np.isnan(price):
+            return None
+        return self._fill(symbol, quantity, price)
+
+    def _set_holdings(self, symbol: Symbol, percentage: float):
+        price = self._price(symbol)
+        if np.isnan(price) or price <= 0:
+            return
+        target = int(percentage * self.portfolio.TotalPortfolioValue / price)
+        self._market_order(symbol, target - self.portfolio._holdings[symbol].Quantity)
+
+    def _liquidate(self, symbol: Symbol):
+        for ticket in [t for t in self._open_orders.values() if t.Symbol == symbol]:
+            self._cancel(ticket)
+        quantity = self.portfolio._holdings[symbol].Quantity
+        if quantity != 0:
+            self._market_order(symbol, -quantity)
+
+    def _stop_order(self, symbol: Symbol, quantity: float, stop_price: float) -> OrderTicket:
+        ticket = OrderTicket(self, self._next_order_id, symbol, quantity, stop_price)
+        self._next_order_id += 1
+        self._open_orders[ticket.OrderId] = ticket
+        return ticket
+
+    def _cancel(self, ticket: OrderTicket) -> bool:
+        if self._open_orders.pop(ticket.OrderId, None) is None:
+            return False
+        ticket.Status = OrderStatus.Canceled
+        self.algorithm.OnOrderEvent(OrderEvent(ticket.OrderId, ticket.Symbol, self.time, OrderStatus.Canceled, 0, 0.0))
+        return True
+
+    def _update(self, ticket: OrderTicket, fields: UpdateOrderFields) -> bool:
+        # Only open orders can change; the ticket keeps its id, so no new order is counted
+        if ticket.OrderId not in self._open_orders:
+            return False
+        if fields.Quantity is not None:
+            ticket.Quantity = fields.Quantity
+        if fields.StopPrice is not None:
+            ticket.StopPrice = fields.StopPrice
+        ticket.Status = OrderStatus.UpdateSubmitted
+        self.algorithm.OnOrderEvent(OrderEvent(ticket.OrderId, ticket.Symbol, self.time, OrderStatus.UpdateSubmitted,
+                                               0, 0.0))
+        return True
+
+    def _check_stops(self, index: int):
+        for ticket in list(self._open_orders.values()):
+            symbol = ticket.Symbol
+            if not self._present_rows[symbol][index]:
+                continue
+            open_, high, low, _, _ = self._bar_rows[symbol][index]
+            if ticket.Quantity < 0 and low <= ticket.StopPrice:
+                price = min(open_, ticket.StopPrice)
+            elif ticket.Quantity > 0 and high >= ticket.StopPrice:
+                price = max(open_, ticket.StopPrice)
+            else:
+                continue
+            del self._open_orders[ticket.OrderId]
+            self._fill(symbol, ticket.Quantity, price, ticket)
+
+    def _log(self, message: str):
+        if self.keep_logs:
+            self._logs.append(f"{self.time} {message}")
+
+    # -- Main loop --
+    def _event_masks(self) -> List[Tuple[np.ndarray, int, Callable[[], None]]]:
+        """
+        For every scheduled event, a mask over calendar dates on which it fires, sorted by time of day.
+        """
+        dates = self._calendar
+        n = len(dates)
+        month = dates.year * 12 + dates.month
+        week = (dates - pd.to_timedelta(dates.dayofweek, unit='D')).values
+        first_of_month = np.r_[True, month[1:] != month[:-1]] if n else np.array([], dtype=bool)
+        last_of_month = np.r_[month[1:] != month[:-1], True] if n else np.array([], dtype=bool)
+        first_of_week = np.r_[True, week[1:] != week[:-1]] if n else np.array([], dtype=bool)
+        last_of_week = np.r_[week[1:] != week[:-1], True] if n else np.array([], dtype=bool)
+        masks = {
+            'EveryDay': np.ones(n, dtype=bool), 'MonthStart': first_of_month, 'MonthEnd': last_of_month,
+            'WeekStart': first_of_week, 'WeekEnd': last_of_week,
+        }
+        events = [(masks[date_rule.kind], time_rule.minutes, callback) for date_rule, time_rule, callback in self._events]
+        return sorted(events, key=lambda event: event[1])
+
+    def run(self, algorithm_class: type, parameters: Optional[Dict] = None) -> BacktestResult:
+        """
+        Initialize and run an algorithm over the local bars.
+
+        Args:
+            algorithm_class (type): QCAlgorithm subclass, e.g. from load_algorithm.
+            parameters (Optional[Dict]): Parameters for parameter sweeps, e.g. {'trailing_stop_pct': 0.03}. They are
+                                         in place before Initialize: served by GetParameter and set as
+                                         attributes (which Initialize may overwrite with its own defaults).
+
+        Returns:
+            BacktestResult: Equity curve, order statistics and timing.
+        """
+        self._reset()
+        self.parameters = dict(parameters or {})
+        algorithm = algorithm_class.__new__(algorithm_class)
+        algorithm._engine = self
+        for name, value in self.parameters.items():
+            setattr(algorithm, name, value)
+        self.algorithm = algorithm
+
+        algorithm.Initialize()
+        if self._calendar is None:
+            self._prepare()
+
+        dates = self._calendar
+        start = 0 if self.start is None else int(np.searchsorted(dates.values, np.datetime64(self.start), side='left'))
+        stop = len(dates) if self.end is None else int(np.searchsorted(dates.values, np.datetime64(self.end), side='right'))
+        events = self._event_masks()
+        # Per indicator: presence and closes of its symbol, and its bound Update method
+        indicators = [(self._present_rows[symbol], self._close_rows[symbol], indicator.Update)
+                      for symbol, indicator in self._indicators]
+        bar_counts = np.zeros(len(dates), dtype=int)
+        for symbol in self._equity_symbols:
+            bar_counts += self._present[symbol]
+
+        # Indicators are warmed up with the bars before the start date, as LEAN does with its history
+        for index in range(start):
+            for present, close, update in indicators:
+                if present[index]:
+                    update(self._dates[index], close[index])
+
+        equity = np.empty(max(stop - start, 0))
+        portfolio = self.portfolio
+        on_data = algorithm.OnData
+        step_times = self._step_times
+        timer = time.perf_counter()
+        for step, index in enumerate(range(start, stop)):
+            self._cursor = index
+            self.time = step_times[index]
+            for present, close, update in indicators:
+                if present[index]:
+                    update(self._dates[index], close[index])
+            if self._open_orders:
+                self._check_stops(index)
+
+            self.current_slice = Slice(self, index)
+            on_data(self.current_slice)
+
+            # Events of the next trading day see this bar as the latest data
+            if index + 1 < stop:
+                next_day = self._dates[index + 1]
+                for mask, minutes, callback in events:
+                    if mask[index + 1]:
+                        self.time = next_day + timedelta(minutes=minutes)
+                        callback()
+            equity[step] = portfolio.Cash + self._holdings_value()
+        elapsed = time.perf_counter() - timer
+        bars = bar_counts[start:stop].sum()
+
+        algorithm.OnEndOfAlgorithm()
+        benchmark = None
+        if self.benchmark is not None and self.benchmark in self._last_close:
+            prices = self._last_close[self.benchmark][start:stop]
+            benchmark = self.initial_cash * prices / prices[0] if len(prices) and prices[0] > 0 else None
+        return BacktestResult(dates[start:stop], equity, benchmark, self._orders, self._traded_value,
+                              int(bars), elapsed, self._logs)
+
+
+def run_backtest(path: str, data_dir: str = 'data', class_name: Optional[str] = None,
+                 parameters: Optional[Dict] = None, **engine_kwargs) -> BacktestResult:
+    """
+    Load a strategy file and backtest it over the bars in data_dir.
+
+    Args:
+        path (str): Path to the strategy file.
+        data_dir (str): Directory holding one bar file per ticker.
+        class_name (Optional[str]): Algorithm class to run if the file defines several.
+        parameters (Optional[Dict]): Parameters served by GetParameter (and set as attributes before Initialize).
+        **engine_kwargs: Passed to LocalEngine (fees, keep_logs).
+
+    Returns:
+        BacktestResult: Outcome of the backtest.
+    """
+    algorithm_class = load_algorithm(path, class_name)
+    return LocalEngine(LocalDataFeed(data_dir), **engine_kwargs).run(algorithm_class, parameters)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a QCAlgorithm strategy on local daily bars.")
+    parser.add_argument('strategy', help="Path to the strategy file, e.g. Range.py")
+    parser.add_argument('--data-dir', default='data', help="Directory with <TICKER>.csv/.parquet bars")
+    args = parser.parse_args()
+
+    result = run_backtest(args.strategy, args.data_dir, keep_logs=True)
+    print(f"Bars: {result.bars}  Orders: {result.orders}  Bars/sec: {result.bars_per_second:,.0f}")
+    print(result.stats())
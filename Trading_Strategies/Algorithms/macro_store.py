@@ -0,0 +1,191 @@
+## As-of store for FRED-style macro series (T10Y3M, UNRATE, HOUST, ...)
+## Each series is kept as sorted time/value arrays; "latest value at or before t" is a binary search,
+## so signals read at rebalance time never depend on the observation being in the current slice
+
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+
+class MacroSeriesStore:
+    """
+    Several macro series with O(log n) as-of lookups and amortized O(1) appends of new observations.
+    """
+    def __init__(self):
+        self._times: Dict[str, np.ndarray] = {}    # datetime64[ns] as int64, sorted
+        self._values: Dict[str, np.ndarray] = {}
+        self._sizes: Dict[str, int] = {}
+
+    @staticmethod
+    def _to_ns(time_) -> int:
+        return int(pd.Timestamp(time_).value)
+
+    @property
+    def names(self) -> List[str]:
+        """Names of the stored series."""
+        return list(self._times)
+
+    def __len__(self):
+        return len(self._times)
+
+    def size(self, name: str) -> int:
+        """Number of observations of a series."""
+        return self._sizes.get(name, 0)
+
+    def load(self, name: str, times, values):
+        """
+        Replace a series with historical observations. Missing values are dropped and times are sorted.
+
+        Args:
+            name (str): Series name, e.g. 'T10Y3M'.
+            times: Observation times (anything pandas can convert to datetimes).
+            values: Observation values.
+        """
+        # asi8 is in the index's own unit (Parquet reads back microseconds), so convert to nanoseconds first
+        times = pd.DatetimeIndex(pd.to_datetime(times)).tz_localize(None).as_unit('ns')
+        values = np.asarray(values, dtype=float)
+        keep = ~np.isnan(values)
+        ns = times.asi8[keep]
+        values = values[keep]
+        order = np.argsort(ns, kind='stable')
+        ns, values = ns[order], values[order]
+        if len(ns):
+            # Keep the last observation of duplicated times
+            last = np.r_[ns[1:] != ns[:-1], True]
+            ns, values = ns[last], values[last]
+        self._times[name] = ns.copy()
+        self._values[name] = values.copy()
+        self._sizes[name] = len(ns)
+
+    def load_frame(self, name: str, history: pd.DataFrame, column: str = 'value'):
+        """
+        Load a series from a History() frame with a (symbol, time) or time index.
+        """
+        if history is None or history.empty or column not in history.columns:
+            self.load(name, [], [])
+            return
+        index = history.index
+        times = index.get_level_values(-1) if isinstance(index, pd.MultiIndex) else index
+        self.load(name, times, history[column].to_numpy())
+
+    def extend_frame(self, name: str, history: pd.DataFrame, column: str = 'value') -> int:
+        """
+        Append the observations of a History() frame that are newer than the last stored one.
+
+        Returns:
+            int: Number of observations added.
+        """
+        if history is None or history.empty or column not in history.columns:
+            return 0
+        index = history.index
+        times = pd.DatetimeIndex(index.get_level_values(-1) if isinstance(index, pd.MultiIndex) else index)
+        before = self.size(name)
+        for time_, value in zip(times.tz_localize(None), history[column].to_numpy(dtype=float)):
+            self.append(name, time_, value)
+        return self.size(name) - before
+
+    def append(self, name: str, time_, value: float):
+        """
+        Add one observation. Observations older than the last stored one are ignored; the same time replaces it.
+        """
+        if value is None or np.isnan(value):
+            return
+        ns = self._to_ns(time_)
+        if name not in self._times:
+            self._times[name] = np.empty(16, dtype=np.int64)
+            self._values[name] = np.empty(16)
+            self._sizes[name] = 0
+        size = self._sizes[name]
+        times, values = self._times[name], self._values[name]
+        if size and ns < times[size - 1]:
+            return
+        if size and ns == times[size - 1]:
+            values[size - 1] = value
+            return
+        if size == len(times):
+            # Double the capacity so appends stay amortized O(1)
+            capacity = max(16, 2 * size)
+            times = np.resize(times, capacity)
+            values = np.resize(values, capacity)
+            self._times[name], self._values[name] = times, values
+        times[size] = ns
+        values[size] = value
+        self._sizes[name] = size + 1
+
+    def asof(self, name: str, time_, max_age: Optional[timedelta] = None) -> Optional[float]:
+        """
+        Latest value of a series at or before a time.
+
+        Args:
+            name (str): Series name.
+            time_: Lookup time.
+            max_age (Optional[timedelta]): If set, values older than this are treated as missing.
+
+        Returns:
+            Optional[float]: The value, or None if the series has no (recent enough) observation.
+        """
+        size = self._sizes.get(name, 0)
+        if size == 0:
+            return None
+        ns = self._to_ns(time_)
+        i = int(np.searchsorted(self._times[name][:size], ns, side='right')) - 1
+        if i < 0:
+            return None
+        if max_age is not None and ns - self._times[name][i] > pd.Timedelta(max_age).value:
+            return None
+        return float(self._values[name][i])
+
+    def asof_time(self, name: str, time_) -> Optional[datetime]:
+        """
+        Time of the observation that asof() would return, or None.
+        """
+        size = self._sizes.get(name, 0)
+        if size == 0:
+            return None
+        i = int(np.searchsorted(self._times[name][:size], self._to_ns(time_), side='right')) - 1
+        return pd.Timestamp(self._times[name][i]).to_pydatetime() if i >= 0 else None
+
+    def snapshot(self, time_, max_age: Optional[timedelta] = None) -> Dict[str, Optional[float]]:
+        """
+        As-of values of every series at one time.
+        """
+        return {name: self.asof(name, time_, max_age) for name in self._times}
+
+    def series(self, name: str) -> pd.Series:
+        """
+        Stored observations of a series as a pandas Series.
+        """
+        size = self._sizes.get(name, 0)
+        times = self._times.get(name, np.empty(0, dtype=np.int64))[:size]
+        return pd.Series(self._values.get(name, np.empty(0))[:size].copy(), index=pd.to_datetime(times), name=name)
+
+
+def check_parquet_round_trip(path: str) -> None:
+    """
+    Load a series from a Parquet file with a microsecond index, extend it and check the stored times.
+
+    Raises:
+        AssertionError: If times come back in the wrong unit or as-of lookups miss.
+    """
+    times = pd.date_range('2024-01-01', periods=10, freq='D').as_unit('us')
+    pd.DataFrame({'value': np.arange(10.0)}, index=pd.Index(times, name='time')).to_parquet(path)
+    history = pd.read_parquet(path)
+    store = MacroSeriesStore()
+    store.load_frame('T10Y3M', history)
+    assert store.series('T10Y3M').index.equals(pd.DatetimeIndex(times.as_unit('ns'), name=None, freq=None)), \
+        store.series('T10Y3M').index
+    assert store.asof('T10Y3M', datetime(2024, 1, 10, 12), max_age=timedelta(days=10)) == 9.0
+    newer = history.iloc[-3:].copy()
+    newer.index = newer.index + pd.Timedelta(days=3)
+    assert store.extend_frame('T10Y3M', newer) == 3
+    stored = store.series('T10Y3M').index
+    assert stored.is_monotonic_increasing and stored[0].year == 2024 and stored[-1] == pd.Timestamp('2024-01-13')
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        check_parquet_round_trip(os.path.join(tmp, 'series.parquet'))
+    print("Parquet round trip (microsecond index): ok")
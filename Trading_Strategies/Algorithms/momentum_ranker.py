@@ -0,0 +1,119 @@
+## Cross-sectional momentum ranking over a rolling (symbols x window) price matrix
+## Closes are written into a ring of columns from OnData; momentum for the whole universe is one vectorized
+## operation and the top-k is picked with a partial sort, so rebalancing does not call History per symbol
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Sequence
+
+
+class MomentumRanker:
+    """
+    Rolling closes of a fixed universe and their momentum over `window` bars.
+    """
+    def __init__(self, symbols: Sequence, window: int, min_periods: Optional[int] = None):
+        """
+        Args:
+            symbols (Sequence): Symbols of the universe, in a fixed order.
+            window (int): Number of bars per symbol; momentum compares the last close with the first one.
+            min_periods (Optional[int]): Bars needed before a symbol is ranked, using its oldest available close
+                                         until the window is full. Defaults to the full window.
+        """
+        if window < 2:
+            raise ValueError("MomentumRanker window must be at least 2")
+        self.symbols = list(symbols)
+        self.window = window
+        self.min_periods = window if min_periods is None else max(1, min(min_periods, window))
+        self._index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self._prices = np.full((len(self.symbols), window), np.nan)
+        self._last = np.full(len(self.symbols), np.nan)
+        self._counts = np.zeros(len(self.symbols), dtype=np.int64)
+        self._next = 0  # column receiving the next bar
+
+    def update_array(self, closes: np.ndarray):
+        """
+        Add one bar for the whole universe. NaN marks a symbol without a bar; its last close is carried forward.
+
+        Args:
+            closes (np.ndarray): Closes aligned with self.symbols.
+        """
+        closes = np.asarray(closes, dtype=float)
+        has_bar = ~np.isnan(closes)
+        self._last = np.where(has_bar, closes, self._last)
+        self._prices[:, self._next] = self._last
+        self._counts += ~np.isnan(self._last)
+        self._next = (self._next + 1) % self.window
+
+    def update(self, closes: Dict):
+        """
+        Add one bar from a {symbol: close} mapping. Symbols missing from the mapping carry their last close forward.
+        """
+        row = np.full(len(self.symbols), np.nan)
+        for symbol, close in closes.items():
+            i = self._index.get(symbol)
+            if i is not None:
+                row[i] = close
+        self.update_array(row)
+
+    def warm_up(self, closes: pd.DataFrame):
+        """
+        Seed the matrix from a (time x symbols) frame of historical closes, oldest first.
+
+        Args:
+            closes (pd.DataFrame): Closes with one column per symbol, e.g. History(...)['close'].unstack(level=0).
+        """
+        aligned = closes.reindex(columns=self.symbols).to_numpy(dtype=float)
+        for row in aligned[-self.window:]:
+            self.update_array(row)
+
+    @property
+    def ready(self) -> np.ndarray:
+        """Boolean mask of the symbols with at least min_periods bars."""
+        return self._counts >= self.min_periods
+
+    def momentum(self) -> np.ndarray:
+        """
+        Return from the first to the last close of the window for every symbol, NaN until it is ready.
+        """
+        rows = np.arange(len(self.symbols))
+        latest = self._prices[:, self._next - 1]
+        # Column of the oldest close: the next slot once the window is full, else the symbol's first bar
+        filled = np.minimum(self._counts, self.window)
+        oldest = self._prices[rows, (self._next - filled) % self.window]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scores = latest / oldest - 1
+        return np.where(self.ready, scores, np.nan)
+
+    def top(self, k: int, min_momentum: Optional[float] = None) -> List:
+        """
+        Symbols with the highest momentum, best first.
+
+        Args:
+            k (int): Number of symbols to return.
+            min_momentum (Optional[float]): If set, only symbols with momentum above it qualify.
+
+        Returns:
+            List: Up to k symbols sorted by decreasing momentum.
+        """
+        scores = self.momentum()
+        eligible = ~np.isnan(scores)
+        if min_momentum is not None:
+            eligible &= scores > min_momentum
+        candidates = np.flatnonzero(eligible)
+        k = min(k, len(candidates))
+        if k == 0:
+            return []
+        candidate_scores = scores[candidates]
+        if k < len(candidates):
+            # Partial sort: only the k best are ordered
+            best = np.argpartition(-candidate_scores, k - 1)[:k]
+            candidates, candidate_scores = candidates[best], candidate_scores[best]
+        order = np.argsort(-candidate_scores, kind='stable')
+        return [self.symbols[i] for i in candidates[order]]
+
+    def scores(self) -> Dict:
+        """
+        Momentum of every ready symbol as a {symbol: momentum} dictionary.
+        """
+        scores = self.momentum()
+        return {self.symbols[i]: float(scores[i]) for i in np.flatnonzero(~np.isnan(scores))}
@@ -0,0 +1,105 @@
+## Target-diff order layer for QCAlgorithm strategies
+## Strategies declare target weights and stop levels; orders are sent only for changes outside a tolerance band,
+## in one batch per rebalance, and each symbol keeps exactly one live stop order that is updated in place
+
+from AlgorithmImports import *
+from typing import Dict, Optional
+
+
+class OrderIntents:
+    """
+    Collects target weights and turns them into the minimum set of orders.
+    """
+    CLOSED_STATUSES = (OrderStatus.Filled, OrderStatus.Canceled, OrderStatus.Invalid)
+
+    def __init__(self, algorithm, tolerance: float = 0.02):
+        """
+        Args:
+            algorithm (QCAlgorithm): Algorithm placing the orders.
+            tolerance (float): Weight difference (fraction of portfolio value) below which a position is left as is.
+        """
+        self.algorithm = algorithm
+        self.tolerance = tolerance
+        self._targets: Dict = {}
+        self._stop_tickets: Dict = {}
+        self._stop_prices: Dict = {}
+
+    def set_target(self, symbol, weight: float):
+        """
+        Record the desired portfolio weight of a symbol; nothing is sent until execute().
+        """
+        self._targets[symbol] = weight
+
+    def execute(self) -> int:
+        """
+        Send the orders needed to reach the recorded targets, then resize the live stops.
+
+        Returns:
+            int: Number of market orders sent.
+        """
+        portfolio = self.algorithm.Portfolio
+        total_value = portfolio.TotalPortfolioValue
+        orders = []
+        for symbol, weight in self._targets.items():
+            holding = portfolio[symbol]
+            price = self.algorithm.Securities[symbol].Price
+            if not price or price <= 0 or total_value <= 0:
+                continue
+            if weight == 0:
+                if holding.Quantity != 0:
+                    orders.append((symbol, -holding.Quantity))
+                continue
+            current_weight = holding.Quantity * price / total_value
+            if abs(weight - current_weight) <= self.tolerance:
+                continue
+            quantity = int(weight * total_value / price) - holding.Quantity
+            if quantity != 0:
+                orders.append((symbol, quantity))
+        self._targets.clear()
+
+        # Reductions first, so that sales fund the purchases
+        orders.sort(key=lambda order: order[1] > 0)
+        for symbol, quantity in orders:
+            self.algorithm.MarketOrder(symbol, quantity)
+
+        # Only live stops are resized: a filled stop must not come back at its old price on the new position
+        for symbol in list(self._stop_tickets):
+            if self._live_stop(symbol) is not None:
+                self.set_stop(symbol, self._stop_prices[symbol])
+        return len(orders)
+
+    def _live_stop(self, symbol):
+        ticket = self._stop_tickets.get(symbol)
+        if ticket is not None and ticket.Status in self.CLOSED_STATUSES:
+            del self._stop_tickets[symbol]
+            del self._stop_prices[symbol]
+            return None
+        return ticket
+
+    def set_stop(self, symbol, stop_price: Optional[float]):
+        """
+        Keep one stop market order protecting the whole position of a symbol.
+
+        The order is submitted once, then its quantity and stop price are updated in place when they change.
+        It is canceled when the position is closed or stop_price is None.
+        """
+        ticket = self._live_stop(symbol)
+        quantity = -self.algorithm.Portfolio[symbol].Quantity
+        if quantity == 0 or stop_price is None:
+            if ticket is not None:
+                ticket.Cancel()
+                del self._stop_tickets[symbol]
+                del self._stop_prices[symbol]
+            return
+        if ticket is None:
+            self._stop_tickets[symbol] = self.algorithm.StopMarketOrder(symbol, quantity, stop_price)
+        elif ticket.Quantity != quantity or self._stop_prices[symbol] != stop_price:
+            fields = UpdateOrderFields()
+            fields.Quantity = quantity
+            fields.StopPrice = stop_price
+            ticket.Update(fields)
+        self._stop_prices[symbol] = stop_price
+
+    def has_stop(self, symbol) -> bool:
+        """True if a stop order is live for the symbol."""
+        return self._live_stop(symbol) is not None
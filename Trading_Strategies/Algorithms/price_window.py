@@ -0,0 +1,89 @@
+## Fixed-size rolling price window backed by a NumPy ring buffer
+## Fed one bar at a time from OnData; momentum and SMA over the window are O(1) per bar
+
+import numpy as np
+from typing import Iterable
+
+
+class PriceWindow:
+    """
+    Last `size` closes of one symbol with a running sum.
+
+    The oldest close is overwritten in place, so the window never reallocates or re-fetches history.
+    """
+    def __init__(self, size: int):
+        """
+        Args:
+            size (int): Number of bars kept, e.g. 12 * 22 for a 12-month window of daily bars.
+        """
+        if size < 1:
+            raise ValueError("PriceWindow size must be at least 1")
+        self.size = size
+        self._values = np.zeros(size)
+        self._next = 0      # slot receiving the next close
+        self._sum = 0.0
+        self.count = 0      # bars seen, capped at size
+
+    @property
+    def is_ready(self) -> bool:
+        """True once the window holds `size` bars."""
+        return self.count >= self.size
+
+    def update(self, close: float):
+        """
+        Add one close, dropping the oldest once the window is full.
+        """
+        close = float(close)
+        if self.count < self.size:
+            self.count += 1
+        else:
+            self._sum -= self._values[self._next]
+        self._values[self._next] = close
+        self._sum += close
+        self._next = (self._next + 1) % self.size
+        if self._next == 0:
+            # Re-sum once per full cycle so rounding errors of the running sum cannot accumulate
+            self._sum = float(self._values[:self.count].sum())
+
+    def warm_up(self, closes: Iterable[float]):
+        """
+        Seed the window from historical closes, oldest first. Only the last `size` closes are kept.
+        """
+        closes = np.asarray(list(closes) if not isinstance(closes, np.ndarray) else closes, dtype=float)
+        if len(closes) == 0:
+            return
+        if self.count == 0:
+            tail = closes[-self.size:]
+            self._values[:len(tail)] = tail
+            self.count = len(tail)
+            self._next = len(tail) % self.size
+            self._sum = float(tail.sum())
+            return
+        for close in closes:
+            self.update(close)
+
+    @property
+    def oldest(self) -> float:
+        """First close of the window."""
+        return float(self._values[self._next if self.is_ready else 0])
+
+    @property
+    def latest(self) -> float:
+        """Last close of the window."""
+        return float(self._values[self._next - 1])
+
+    @property
+    def sma(self) -> float:
+        """Mean close over the window."""
+        return self._sum / self.count if self.count else float('nan')
+
+    @property
+    def momentum(self) -> float:
+        """Return from the first to the last close of the window."""
+        return self.latest / self.oldest - 1 if self.count else float('nan')
+
+    def values(self) -> np.ndarray:
+        """Closes in the window, oldest first."""
+        if not self.is_ready:
+            return self._values[:self.count].copy()
+        return np.concatenate([self._values[self._next:], self._values[:self._next]])
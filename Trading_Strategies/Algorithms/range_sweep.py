@@ -0,0 +1,357 @@
+## Parameter sweep for the golden-cross strategy of Range.py
+## Evaluates thousands of (short SMA, long SMA, stop loss, trailing stop, position size) combinations.
+## Every SMA window is computed once per symbol from cumulative sums and shared by all the combinations;
+## each chunk of combinations is simulated in one pass over the bars with NumPy arrays of
+## (combinations x symbols), and the chunks are fanned out over a process pool.
+##
+## Model of Range.MyTradingAlgorithm (OrderIntents + TrailingStopManager), per symbol:
+## - A stop armed at a position's entry bar is tested against the following bars and fills at min(open, stop).
+## - At each close: enter when SMA(short) > SMA(long) and flat (also right after a stop fill), exit otherwise.
+## - Every entry arms a stop at entry close * (1 - stop_loss_pct); from the next bar on it is ratcheted to
+##   highest close since entry * (1 - trailing_stop_pct), never lowered.
+## - After the last bar of each month (MonthStart rebalance) every flat symbol is bought at the close,
+##   whatever the cross; the next close exits it again if the cross does not hold.
+## - Positions are max_position_size of equity (the strategy's 2% tolerance-band resizing is not modelled).
+##   Fees are charged on traded value. check_parity compares the model with local_engine on Range.py.
+
+import os
+import argparse
+import itertools
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from local_engine import LocalDataFeed, LocalEngine, load_algorithm, performance_stats
+
+
+DEFAULT_GRID = {
+    'short_window': [10, 20, 30, 50, 75, 100],
+    'long_window': [100, 150, 200, 250],
+    'stop_loss_pct': [0.03, 0.05, 0.08, 0.12],
+    'trailing_stop_pct': [0.01, 0.02, 0.03, 0.05, 0.08],
+    'max_position_size': [0.25, 0.5],
+}
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Arrays shared by the worker processes, set once per worker by _init_worker
+_SHARED: Dict = {}
+
+
+def load_bars(tickers: List[str], data_dir: str = 'data', feed: Optional[LocalDataFeed] = None) -> Dict[str, np.ndarray]:
+    """
+    Load daily bars of several tickers as aligned (dates x tickers) arrays.
+
+    Args:
+        tickers (List[str]): Tickers to load, e.g. ['SPY', 'AAPL'] as in Range.py.
+        data_dir (str): Directory with <TICKER>.csv/.parquet bars.
+        feed (Optional[LocalDataFeed]): Feed to read from instead of data_dir.
+
+    Returns:
+        Dict[str, np.ndarray]: 'open', 'high', 'low', 'close' arrays and the 'dates' index.
+    """
+    feed = feed if feed is not None else LocalDataFeed(data_dir)
+    frames = {ticker: feed.load(ticker) for ticker in tickers}
+    dates = pd.DatetimeIndex([])
+    for frame in frames.values():
+        dates = dates.union(frame.index)
+    bars = {'dates': dates.values}
+    for field in ('open', 'high', 'low', 'close'):
+        bars[field] = np.column_stack([frames[t][field].reindex(dates).to_numpy(dtype=float) for t in tickers])
+    return bars
+
+
+def rolling_means(close: np.ndarray, windows: Iterable[int]) -> Dict[int, np.ndarray]:
+    """
+    Simple moving averages of every column for several windows from one cumulative sum.
+
+    Args:
+        close (np.ndarray): (dates x symbols) closes. Missing bars are carried forward.
+        windows (Iterable[int]): Window lengths.
+
+    Returns:
+        Dict[int, np.ndarray]: SMA array per window, NaN until the window is full.
+    """
+    filled = pd.DataFrame(close).ffill().to_numpy()
+    valid = ~np.isnan(filled)
+    zero = np.zeros((1, close.shape[1]))
+    csum = np.vstack([zero, np.cumsum(np.where(valid, filled, 0.0), axis=0)])
+    ccount = np.vstack([zero, np.cumsum(valid, axis=0)])
+    means = {}
+    for window in sorted(set(windows)):
+        sma = np.full(close.shape, np.nan)
+        if window <= close.shape[0]:
+            total = csum[window:] - csum[:-window]
+            count = ccount[window:] - ccount[:-window]
+            sma[window - 1:] = np.where(count == window, total / window, np.nan)
+        means[window] = sma
+    return means
+
+
+def month_starts(dates: np.ndarray) -> np.ndarray:
+    """
+    Mask of the first trading day of each month (DateRules.MonthStart of local_engine).
+    """
+    dates = pd.DatetimeIndex(dates)
+    month = dates.year * 12 + dates.month
+    return np.r_[True, month[1:] != month[:-1]] if len(dates) else np.zeros(0, dtype=bool)
+
+
+def simulate(combos: List[Dict], bars: Dict[str, np.ndarray], smas: Dict[int, np.ndarray],
+             start: int = 0) -> Dict[str, np.ndarray]:
+    """
+    Run the Range.py model for several parameter combinations at once, bar by bar.
+
+    Args:
+        combos (List[Dict]): Combinations with 'short_window', 'long_window', 'stop_loss_pct', 'trailing_stop_pct'
+                             and 'max_position_size'.
+        bars (Dict[str, np.ndarray]): Output of load_bars.
+        smas (Dict[int, np.ndarray]): Output of rolling_means, covering every window.
+        start (int): First bar of the evaluation period (earlier bars only warm up the SMAs).
+
+    Returns:
+        Dict[str, np.ndarray]: 'returns' (bars x combos) of the portfolio, 'trades' (bars x combos) in units of
+                               position size, and 'held' (bars x combos x symbols) positions after each close.
+    """
+    open_, low, close = bars['open'], bars['low'], bars['close']
+    n, k = close.shape
+    c = len(combos)
+    weight = np.array([p['max_position_size'] for p in combos])
+    stop_loss = np.array([p['stop_loss_pct'] for p in combos])[:, None]
+    trailing = np.array([p['trailing_stop_pct'] for p in combos])[:, None]
+    short = np.stack([smas[p['short_window']] for p in combos])
+    long_ = np.stack([smas[p['long_window']] for p in combos])
+    # Indicators not ready: the strategy leaves the position as it is
+    ready = ~np.isnan(short) & ~np.isnan(long_)
+    signal = short > long_
+    has_bar = ~np.isnan(close)
+    last_close = pd.DataFrame(close).ffill().to_numpy()
+    rebalance = np.r_[month_starts(bars['dates'])[1:], False]
+
+    held = np.zeros((c, k), dtype=bool)
+    stop = np.full((c, k), np.nan)
+    high_water = np.full((c, k), np.nan)
+    returns = np.zeros((n, c))
+    trades = np.zeros((n, c))
+    positions = np.zeros((n, c, k), dtype=bool)
+    for t in range(start, n):
+        bar = has_bar[t]
+        # Stops set at the previous close are tested against this bar
+        hit = held & bar & (low[t] <= stop)
+        if t > 0:
+            fill = np.where(hit, np.minimum(open_[t], stop), close[t])
+            with np.errstate(invalid='ignore'):
+                bar_return = np.where(held & bar, fill / last_close[t - 1] - 1, 0.0)
+            returns[t] = weight * bar_return.sum(axis=1)
+        held &= ~hit
+
+        # OnData: golden cross at the close
+        act = bar & ready[:, t]
+        enter = act & signal[:, t] & ~held
+        exit_ = act & ~signal[:, t] & held
+        held = (held | enter) & ~exit_
+
+        # Trailing stops of the positions kept, then new stops for the entries
+        kept = held & ~enter & bar
+        high_water = np.where(kept, np.fmax(high_water, close[t]), high_water)
+        stop = np.where(kept, np.fmax(stop, high_water * (1 - trailing)), stop)
+
+        # Monthly rebalance after the last bar of the month buys every flat symbol at the latest close
+        bought = ~held & ~np.isnan(last_close[t]) if rebalance[t] else np.zeros((c, k), dtype=bool)
+        held |= bought
+        armed = enter | bought
+        stop = np.where(armed, last_close[t] * (1 - stop_loss), stop)
+        high_water = np.where(armed, np.nan, high_water)
+
+        trades[t] = (hit.astype(int) + enter + exit_ + bought).sum(axis=1)
+        positions[t] = held
+    return {'returns': returns, 'trades': trades, 'held': positions}
+
+
+def evaluate_batch(combos: List[Dict], bars: Dict[str, np.ndarray], smas: Dict[int, np.ndarray],
+                   start: int = 0, fee_rate: float = 0.0) -> List[Dict]:
+    """
+    Backtest several parameter combinations on all symbols in one pass over the bars.
+
+    Args:
+        combos (List[Dict]): 'short_window', 'long_window', 'stop_loss_pct', 'trailing_stop_pct', 'max_position_size'.
+        bars (Dict[str, np.ndarray]): Output of load_bars.
+        smas (Dict[int, np.ndarray]): Output of rolling_means, covering every window.
+        start (int): First bar of the evaluation period (earlier bars only warm up the SMAs).
+        fee_rate (float): Fee as a fraction of traded value.
+
+    Returns:
+        List[Dict]: Per combination, the parameters with 'total_return', 'sharpe', 'max_drawdown', 'turnover' and
+                    'trades'.
+    """
+    if not combos:
+        return []
+    result = simulate(combos, bars, smas, start)
+    results = []
+    for j, params in enumerate(combos):
+        weight = params['max_position_size']
+        trades = result['trades'][start:, j]
+        portfolio_return = result['returns'][start:, j] - fee_rate * weight * trades
+        equity = np.concatenate([[1.0], np.cumprod(1 + portfolio_return)])
+        # Trades of bar t are sized on the equity at the close of bar t-1
+        traded_value = float((weight * trades * equity[:-1]).sum())
+        stats = performance_stats(equity, traded_value=traded_value)
+        results.append({**params, **stats, 'trades': int(trades.sum())})
+    return results
+
+
+def evaluate(params: Dict, bars: Dict[str, np.ndarray], smas: Dict[int, np.ndarray],
+             start: int = 0, fee_rate: float = 0.0) -> Dict[str, float]:
+    """
+    Backtest one parameter combination on all symbols (see evaluate_batch).
+    """
+    return evaluate_batch([params], bars, smas, start, fee_rate)[0]
+
+
+def check_parity(params: Dict, tickers: Optional[List[str]] = None, data_dir: str = 'data',
+                 feed: Optional[LocalDataFeed] = None) -> Dict[str, float]:
+    """
+    Compare the model with a local_engine backtest of Range.py for one parameter combination.
+
+    Args:
+        params (Dict): One combination, passed to Range.py as backtest parameters.
+        tickers (Optional[List[str]]): Tickers of Range.py (default SPY and AAPL).
+        data_dir (str): Directory with <TICKER>.csv/.parquet bars.
+        feed (Optional[LocalDataFeed]): Feed to read from instead of data_dir.
+
+    Returns:
+        Dict[str, float]: Bars compared, total returns of both and their difference (the model keeps exact
+                          weights where the strategy holds whole shares within a 2% tolerance band).
+
+    Raises:
+        AssertionError: If any position held after a close differs between the model and the engine.
+    """
+    tickers = tickers or ['SPY', 'AAPL']
+    feed = feed if feed is not None else LocalDataFeed(data_dir)
+    bars = load_bars(tickers, feed=feed)
+    smas = rolling_means(bars['close'], [params['short_window'], params['long_window']])
+    start = max(params['short_window'], params['long_window']) - 1
+    model = simulate([params], bars, smas, start)
+    model_stats = evaluate(params, bars, smas, start)
+
+    algorithm_class = load_algorithm(os.path.join(HERE, 'Range.py'))
+    first_date = pd.Timestamp(bars['dates'][start])
+    held = np.zeros((len(bars['dates']), len(tickers)), dtype=bool)
+
+    class Recorded(algorithm_class):
+        # Same period as the model, and the positions held after every close (OnData, then the rebalance)
+        def SetStartDate(self, *args):
+            self._engine.start = first_date
+
+        def SetEndDate(self, *args):
+            pass
+
+        def _record(self):
+            held[self._engine._cursor] = [self.Portfolio[symbol].Invested for symbol in self.symbols]
+
+        def OnData(self, data):
+            super().OnData(data)
+            self._record()
+
+        def Rebalance(self):
+            super().Rebalance()
+            self._record()
+
+    result = LocalEngine(feed).run(Recorded, params)
+    mismatches = int((held[start:] != model['held'][start:, 0]).any(axis=1).sum())
+    if mismatches:
+        raise AssertionError(f"Positions differ from the engine on {mismatches} bars")
+    engine_return = result.stats()['total_return']
+    return {'bars': len(bars['dates']) - start, 'model_return': model_stats['total_return'],
+            'engine_return': engine_return, 'return_difference': model_stats['total_return'] - engine_return}
+
+
+def grid(space: Dict[str, List]) -> List[Dict]:
+    """
+    All combinations of a parameter grid, skipping short windows not below the long window.
+    """
+    names = list(space)
+    combos = [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+    return [c for c in combos if c['short_window'] < c['long_window']]
+
+
+def random_search(space: Dict[str, List], n: int, seed: int = 0) -> List[Dict]:
+    """
+    n distinct random combinations drawn from a parameter grid.
+    """
+    combos = grid(space)
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(combos), size=min(n, len(combos)), replace=False)
+    return [combos[i] for i in picks]
+
+
+def _init_worker(bars: Dict[str, np.ndarray], smas: Dict[int, np.ndarray], start: int, fee_rate: float):
+    _SHARED.update(bars=bars, smas=smas, start=start, fee_rate=fee_rate)
+
+
+def _evaluate_chunk(chunk: List[Dict]) -> List[Dict]:
+    return evaluate_batch(chunk, _SHARED['bars'], _SHARED['smas'], _SHARED['start'], _SHARED['fee_rate'])
+
+
+def sweep(combos: List[Dict], bars: Dict[str, np.ndarray], fee_rate: float = 0.0,
+          max_workers: Optional[int] = None, chunk_size: int = 256, rank_by: str = 'sharpe') -> pd.DataFrame:
+    """
+    Evaluate parameter combinations in parallel and rank them.
+
+    Args:
+        combos (List[Dict]): Combinations from grid or random_search.
+        bars (Dict[str, np.ndarray]): Output of load_bars.
+        fee_rate (float): Fee as a fraction of traded value.
+        max_workers (Optional[int]): Worker processes. Defaults to all cores; 1 runs in-process.
+        chunk_size (int): Combinations per task, simulated together in one pass over the bars.
+        rank_by (str): Column to sort on, descending.
+
+    Returns:
+        pd.DataFrame: One row per combination with 'sharpe', 'max_drawdown', 'turnover', 'total_return' and 'trades'.
+    """
+    if not combos:
+        return pd.DataFrame()
+    windows = {c['short_window'] for c in combos} | {c['long_window'] for c in combos}
+    smas = rolling_means(bars['close'], windows)
+    # Every combination is scored on the same period: from the first bar at which the longest SMA is ready
+    start = min(max(windows) - 1, len(bars['dates']) - 1)
+
+    chunks = [combos[i:i + chunk_size] for i in range(0, len(combos), chunk_size)]
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(bars, smas, start, fee_rate)
+        results = [row for chunk in chunks for row in _evaluate_chunk(chunk)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(bars, smas, start, fee_rate)) as executor:
+            results = [row for rows in executor.map(_evaluate_chunk, chunks) for row in rows]
+
+    table = pd.DataFrame(results).sort_values(rank_by, ascending=False).reset_index(drop=True)
+    table.index.name = 'rank'
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parameter sweep of the Range.py golden-cross strategy.")
+    parser.add_argument('--data-dir', default='data', help="Directory with <TICKER>.csv/.parquet bars")
+    parser.add_argument('--tickers', nargs='+', default=['SPY', 'AAPL'], help="Tickers traded by the strategy")
+    parser.add_argument('--random', type=int, default=0, help="Number of random combinations (default: full grid)")
+    parser.add_argument('--fee-rate', type=float, default=0.0005, help="Fee as a fraction of traded value")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--output', default='range_sweep_results.csv', help="Ranked results table")
+    parser.add_argument('--check', action='store_true', help="Compare the model with local_engine on Range.py defaults")
+    args = parser.parse_args()
+
+    if args.check:
+        defaults = {'short_window': 50, 'long_window': 200, 'stop_loss_pct': 0.05, 'trailing_stop_pct': 0.02,
+                    'max_position_size': 0.5}
+        print(check_parity(defaults, args.tickers, args.data_dir))
+        raise SystemExit(0)
+
+    bars = load_bars(args.tickers, args.data_dir)
+    combos = random_search(DEFAULT_GRID, args.random) if args.random else grid(DEFAULT_GRID)
+    results = sweep(combos, bars, fee_rate=args.fee_rate, max_workers=args.workers)
+    results.to_csv(args.output)
+    print(f"Evaluated {len(results)} combinations; results saved to {args.output}")
+    print(results.head(20))
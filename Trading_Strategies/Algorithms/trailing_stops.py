@@ -0,0 +1,89 @@
+## Vectorized trailing-stop manager
+## Stop levels, high-water marks and armed positions live in NumPy arrays aligned with a fixed symbol list,
+## so one array expression per bar ratchets every stop and returns the mask of triggered liquidations
+
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+
+
+class TrailingStopManager:
+    """
+    Initial stop below the entry price, then a trailing stop below the highest price seen since the stop was armed.
+    """
+    def __init__(self, symbols: Sequence, trailing_pct: float, stop_loss_pct: Optional[float] = None):
+        """
+        Args:
+            symbols (Sequence): Symbols that may be managed, in a fixed order.
+            trailing_pct (float): Distance of the trailing stop below the high-water mark, e.g. 0.02.
+            stop_loss_pct (Optional[float]): Distance of the initial stop below the entry price.
+                                             Defaults to trailing_pct.
+        """
+        self.symbols = list(symbols)
+        self.trailing_pct = trailing_pct
+        self.stop_loss_pct = trailing_pct if stop_loss_pct is None else stop_loss_pct
+        self._index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        n = len(self.symbols)
+        self.armed = np.zeros(n, dtype=bool)
+        self.stops = np.full(n, np.nan)
+        self.high_water = np.full(n, np.nan)
+
+    def index(self, symbol) -> int:
+        """Position of a symbol in the arrays."""
+        return self._index[symbol]
+
+    def arm(self, symbol, price: float):
+        """
+        Start (or restart) managing a position entered at `price`.
+        """
+        i = self._index[symbol]
+        self.armed[i] = True
+        self.high_water[i] = np.nan
+        self.stops[i] = price * (1 - self.stop_loss_pct)
+
+    def arm_array(self, mask: np.ndarray, prices: np.ndarray):
+        """
+        Arm every symbol selected by a boolean mask at its price in an aligned array.
+        """
+        self.armed |= mask
+        self.high_water = np.where(mask, np.nan, self.high_water)
+        self.stops = np.where(mask, prices * (1 - self.stop_loss_pct), self.stops)
+
+    def disarm(self, symbol):
+        """
+        Stop managing a position, e.g. after it was closed by the strategy.
+        """
+        self.armed[self._index[symbol]] = False
+
+    def stop_price(self, symbol) -> float:
+        """Current stop level of a symbol (NaN if it was never armed)."""
+        return float(self.stops[self._index[symbol]])
+
+    def update_array(self, prices: np.ndarray) -> np.ndarray:
+        """
+        Check every armed stop against one bar and ratchet the others up.
+
+        Args:
+            prices (np.ndarray): Prices aligned with self.symbols (close, or low for intrabar stops). NaN means no bar.
+
+        Returns:
+            np.ndarray: Boolean mask of the triggered stops. Triggered symbols are disarmed.
+        """
+        has_price = ~np.isnan(prices)
+        live = self.armed & has_price
+        triggered = live & (prices < self.stops)
+        survivors = live & ~triggered
+        self.high_water = np.where(survivors, np.fmax(self.high_water, prices), self.high_water)
+        self.stops = np.where(survivors, np.fmax(self.stops, self.high_water * (1 - self.trailing_pct)), self.stops)
+        self.armed &= ~triggered
+        return triggered
+
+    def update(self, prices: Dict) -> List:
+        """
+        Same as update_array from a {symbol: price} mapping; returns the triggered symbols.
+        """
+        row = np.full(len(self.symbols), np.nan)
+        for symbol, price in prices.items():
+            i = self._index.get(symbol)
+            if i is not None:
+                row[i] = price
+        return [self.symbols[i] for i in np.flatnonzero(self.update_array(row))]
@@ -0,0 +1,183 @@
+## Memory-lean feature matrix for the breakout classifier
+## Builds the prepare_dataset features straight from the bars into one preallocated float32 block (column-major, so
+## each feature is written contiguously and LightGBM reads it without a copy), one feature at a time, with int8
+## labels. feature_frame gives the same features as a DataFrame with int8 calendar columns.
+
+import sys
+import time
+import resource
+import subprocess
+import numpy as np
+import pandas as pd
+import lightgbm as lgb
+from typing import Dict, List, Optional, Tuple
+
+from breakout_pipeline import synthetic_bars
+
+
+BASE_FEATURES = ['return', 'r_mean_12', 'r_std_12', 'r_max_12', 'r_min_12', 'atr_14', 'mom_6']
+CALENDAR_FEATURES = ['hour', 'minute', 'dow']
+EXTENDED_FEATURES = ['rsi_14', 'bb_width']
+VOLUME_FEATURES = ['vol_avg_20', 'vol_ratio', 'vol_std_20']
+
+
+def feature_columns(bars: pd.DataFrame, extended: bool = False) -> List[str]:
+    """
+    Column order of prepare_dataset(add_indicators(bars)), so models trained on either are interchangeable.
+    """
+    columns = list(bars.columns) + BASE_FEATURES + CALENDAR_FEATURES
+    if extended:
+        columns += EXTENDED_FEATURES + (VOLUME_FEATURES if 'volume' in bars.columns else [])
+    return [c for c in columns if c not in ('label', 'tr')]
+
+
+def _filled(values) -> np.ndarray:
+    # Forward then backward fill of one column, as add_indicators does for the whole frame
+    return pd.Series(values, copy=False).ffill().bfill().fillna(0).to_numpy()
+
+
+def _feature_columns(bars: pd.DataFrame, extended: bool):
+    # Yields (name, values) one feature at a time so that at most a few float64 temporaries are alive
+    close, high, low = bars['close'], bars['high'], bars['low']
+    for name in bars.columns:
+        yield name, _filled(bars[name])
+    yield 'return', close.pct_change(fill_method=None).fillna(0).to_numpy()
+    yield 'r_mean_12', _filled(close.rolling(12).mean())
+    yield 'r_std_12', _filled(close.rolling(12).std().fillna(0))
+    yield 'r_max_12', _filled(high.rolling(12).max())
+    yield 'r_min_12', _filled(low.rolling(12).min())
+    prev_close = close.shift()
+    tr = np.maximum(high - low, np.maximum(high - prev_close, prev_close - low))
+    yield 'atr_14', _filled(tr.rolling(14).mean().bfill())
+    del tr
+    yield 'mom_6', _filled(close / close.shift(6) - 1)
+    yield 'hour', bars.index.hour.to_numpy()
+    yield 'minute', bars.index.minute.to_numpy()
+    yield 'dow', bars.index.dayofweek.to_numpy()
+    if extended:
+        delta = close.diff()
+        rs = delta.clip(lower=0).rolling(14).mean() / ((-delta).clip(lower=0).rolling(14).mean() + 1e-9)
+        yield 'rsi_14', _filled((100 - (100 / (1 + rs))).fillna(50))
+        del delta, rs
+        yield 'bb_width', _filled((2 * close.rolling(20).std() * 2) / close.rolling(20).mean())
+        if 'volume' in bars.columns:
+            volume = bars['volume']
+            vol_avg = volume.rolling(20).mean()
+            yield 'vol_avg_20', _filled(vol_avg)
+            yield 'vol_ratio', _filled(volume / (vol_avg + 1e-9))
+            yield 'vol_std_20', _filled(volume.rolling(20).std().fillna(0))
+
+
+def breakout_labels(bars: pd.DataFrame, lookback: int = 12, horizon: int = 6, thresh: float = 0.002) -> np.ndarray:
+    """
+    label_breakouts as an int8 array, without adding a column to the bars.
+    """
+    r_max = bars['high'].rolling(lookback).max().shift(1).to_numpy()
+    r_min = bars['low'].rolling(lookback).min().shift(1).to_numpy()
+    future_max = bars['high'].rolling(horizon).max().shift(-(horizon - 1)).to_numpy()
+    future_min = bars['low'].rolling(horizon).min().shift(-(horizon - 1)).to_numpy()
+    labels = np.zeros(len(bars), dtype=np.int8)
+    labels[future_min < (1 - thresh) * r_min] = -1
+    labels[future_max > (1 + thresh) * r_max] = 1
+    return labels
+
+
+def feature_matrix(bars: pd.DataFrame, extended: bool = False, out: Optional[np.ndarray] = None) -> Tuple[np.ndarray, List[str]]:
+    """
+    Features of prepare_dataset(add_indicators(bars)) as one float32 block, written column by column.
+
+    Args:
+        bars (pd.DataFrame): Bars indexed by datetime (the bars are not modified).
+        extended (bool): Extended feature set of add_indicators.
+        out (Optional[np.ndarray]): Preallocated (rows x features) float32 array to fill, e.g. a memory map.
+
+    Returns:
+        Tuple[np.ndarray, List[str]]: Fortran-ordered float32 matrix (calendar values are exact small floats,
+                                      since LightGBM takes a single dtype) and its column names.
+    """
+    columns = feature_columns(bars, extended)
+    if out is None:
+        out = np.empty((len(bars), len(columns)), dtype=np.float32, order='F')
+    for j, (name, values) in enumerate(_feature_columns(bars, extended)):
+        out[:, j] = values
+    return out, columns
+
+
+def feature_frame(bars: pd.DataFrame, extended: bool = False) -> pd.DataFrame:
+    """
+    Same features as a DataFrame with float32 columns and int8 calendar columns (for storage or inspection).
+    """
+    data = {}
+    for name, values in _feature_columns(bars, extended):
+        data[name] = values.astype(np.int8 if name in CALENDAR_FEATURES else np.float32, copy=False)
+    return pd.DataFrame(data, index=bars.index, copy=False)
+
+
+def feature_dataset(bars: pd.DataFrame, extended: bool = False, labels: Optional[np.ndarray] = None,
+                    params: Optional[Dict] = None) -> lgb.Dataset:
+    """
+    Binned LightGBM Dataset built from the float32 block, which is released once the bins are constructed.
+    """
+    X, columns = feature_matrix(bars, extended)
+    labels = breakout_labels(bars) if labels is None else labels
+    dataset = lgb.Dataset(X, label=labels, feature_name=columns, params=params or {'verbose': -1}, free_raw_data=True)
+    dataset.construct()
+    return dataset
+
+
+def check_parity(bars: pd.DataFrame, extended: bool = False) -> float:
+    """
+    Compare feature_matrix and breakout_labels with prepare_dataset(label_breakouts(add_indicators(bars))).
+
+    Returns:
+        float: Largest relative difference (float32 rounding, ~6e-8).
+    """
+    from breakout_pipeline import add_indicators, label_breakouts, prepare_dataset
+
+    X_ref, y_ref = prepare_dataset(label_breakouts(add_indicators(bars.copy(), extended=extended)))
+    X, columns = feature_matrix(bars, extended)
+    if columns != list(X_ref.columns):
+        raise AssertionError(f"Column order differs: {columns} vs {list(X_ref.columns)}")
+    if not np.array_equal(breakout_labels(bars), y_ref.to_numpy()):
+        raise AssertionError("Labels differ")
+    expected = X_ref.to_numpy(dtype=np.float64)
+    relative = np.abs(X - expected) / np.maximum(np.abs(expected), 1e-6)
+    return float(relative.max())
+
+
+def _measure(method: str, n_bars: int, extended: bool) -> Dict[str, float]:
+    # Run in a fresh process: peak RSS only ever grows
+    bars = synthetic_bars(n_bars)
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if method == 'prepare_dataset':
+        from breakout_pipeline import add_indicators, label_breakouts, prepare_dataset
+        X, y = prepare_dataset(label_breakouts(add_indicators(bars, extended=extended)))
+        del bars
+        # The float64 frame is converted for LightGBM, as train_lgbm's fit does
+        values = X.to_numpy(dtype=np.float32)
+        size = float(X.memory_usage().sum())
+    elif method == 'feature_matrix':
+        values, _ = feature_matrix(bars, extended)
+        y = breakout_labels(bars)
+        size = values.nbytes + y.nbytes
+    else:
+        dataset = feature_dataset(bars, extended)
+        size = 0
+    seconds = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {'method': method, 'seconds': round(seconds, 2), 'result_mb': round(size / 1e6, 1),
+            'peak_rss_mb': round(peak / 1024, 1), 'peak_increase_mb': round((peak - before) / 1024, 1)}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--measure':
+        print(_measure(sys.argv[2], int(sys.argv[3]), sys.argv[4] == 'extended'))
+        sys.exit(0)
+
+    print(f"Parity: max relative difference {check_parity(synthetic_bars(20_000), extended=True):.2e}")
+    n_bars = 5 * 365 * 288  # five years of 5-minute bars
+    for method in ('prepare_dataset', 'feature_matrix', 'feature_dataset'):
+        output = subprocess.run([sys.executable, __file__, '--measure', method, str(n_bars), 'extended'],
+                                capture_output=True, text=True, check=True)
+        print(output.stdout.strip())
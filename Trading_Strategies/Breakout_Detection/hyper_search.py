@@ -0,0 +1,249 @@
+## Hyperparameter search for the breakout classifier
+## Samples num_leaves, learning_rate, class weights and the label_breakouts thresholds, trains each candidate
+## with the walk-forward trainer and prunes candidates whose first folds score below the median of earlier
+## candidates (scores are normalised by the base rate, so labellings compare). Candidates run in parallel processes; every trial is recorded in a SQLite file so searches resume.
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+from sklearn.metrics import average_precision_score
+
+from breakout_pipeline import CLASSES, load_data, synthetic_bars, add_indicators, label_breakouts, precision_weights
+from walk_forward import WalkForwardTrainer
+
+
+# Lists are sampled uniformly; (low, high) tuples log-uniformly. The labelling parameters take few values so that
+# trials share their binned Datasets.
+SEARCH_SPACE = {
+    'num_leaves': [15, 31, 63, 127],
+    'learning_rate': (0.01, 0.2),
+    'min_child_samples': [20, 50, 100],
+    'class_weight': ['balanced', 'precision', None],
+    'lookback': [6, 12, 24],
+    'horizon': [3, 6, 12],
+    'thresh': [0.001, 0.002, 0.003, 0.005],
+}
+
+LABEL_KEYS = ('lookback', 'horizon', 'thresh')
+
+_SHARED: Dict = {}
+
+
+class ResultsStore:
+    """
+    SQLite record of the trials of a search: parameters, status, partial (pruning) score and final score.
+    """
+    def __init__(self, path: str = 'hyper_search.sqlite'):
+        self.path = path
+        with self._connect() as db:
+            db.execute("""CREATE TABLE IF NOT EXISTS trials (
+                              trial_id TEXT PRIMARY KEY, params TEXT, status TEXT, partial REAL, score REAL,
+                              folds TEXT, seconds REAL, updated REAL)""")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=60)
+
+    def status(self, trial_id: str) -> Optional[str]:
+        with self._connect() as db:
+            row = db.execute("SELECT status FROM trials WHERE trial_id = ?", (trial_id,)).fetchone()
+        return row[0] if row else None
+
+    def record(self, trial_id: str, params: Dict, status: str, partial: Optional[float] = None,
+               score: Optional[float] = None, folds: Optional[List[Dict]] = None, seconds: Optional[float] = None):
+        with self._connect() as db:
+            db.execute("INSERT OR REPLACE INTO trials VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                       (trial_id, json.dumps(params), status, partial, score, json.dumps(folds or []),
+                        seconds, time.time()))
+
+    def partial_scores(self) -> List[float]:
+        """
+        Partial scores of the trials that reached the pruning step (pruned or complete).
+        """
+        with self._connect() as db:
+            rows = db.execute("SELECT partial FROM trials WHERE partial IS NOT NULL AND status != 'running'").fetchall()
+        return [row[0] for row in rows]
+
+    def results(self) -> pd.DataFrame:
+        """
+        All trials with their parameters as columns, best score first.
+        """
+        with self._connect() as db:
+            table = pd.read_sql_query("SELECT * FROM trials", db)
+        if table.empty:
+            return table
+        params = pd.DataFrame([json.loads(p) for p in table.pop('params')])
+        table = pd.concat([table.drop(columns=['folds']), params], axis=1)
+        return table.sort_values('score', ascending=False, na_position='last').reset_index(drop=True)
+
+
+def sample_configs(n: int, space: Optional[Dict] = None, seed: int = 0) -> List[Dict]:
+    """
+    Draw n configurations from the search space. The same seed gives the same sequence, so a resumed search
+    skips the trials it already ran.
+    """
+    space = space or SEARCH_SPACE
+    rng = np.random.default_rng(seed)
+    configs = []
+    for _ in range(n):
+        config = {}
+        for key, values in space.items():
+            if isinstance(values, tuple):
+                low, high = np.log(values[0]), np.log(values[1])
+                config[key] = round(float(np.exp(rng.uniform(low, high))), 4)
+            else:
+                value = values[rng.integers(len(values))]
+                config[key] = value.item() if hasattr(value, 'item') else value
+        configs.append(config)
+    return configs
+
+
+def trial_id(config: Dict) -> str:
+    return hashlib.sha1(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+
+
+def breakout_score(y_true: np.ndarray, proba: np.ndarray, classes: List = CLASSES) -> float:
+    """
+    Mean average precision skill of the breakout classes (-1 and 1) against the rest; higher is better.
+
+    Raw average precision grows with the share of breakouts, which the labelling parameters change, so each class
+    scores (AP - base rate) / (1 - base rate): 0 for an uninformative model, 1 for a perfect one.
+    """
+    scores = []
+    for label in (-1, 1):
+        positives = y_true == label
+        if positives.any() and not positives.all():
+            base_rate = positives.mean()
+            ap = average_precision_score(positives, proba[:, classes.index(label)])
+            scores.append((ap - base_rate) / (1 - base_rate))
+    return float(np.mean(scores)) if scores else float('nan')
+
+
+def _init_worker(features: pd.DataFrame, store_path: str, cache_dir: str, prune_after: int, min_trials: int,
+                 n_splits: int, early_stopping_rounds: int, n_estimators: int):
+    _SHARED.update(features=features, store=ResultsStore(store_path), cache_dir=cache_dir, prune_after=prune_after,
+                   min_trials=min_trials, n_splits=n_splits, early_stopping_rounds=early_stopping_rounds,
+                   n_estimators=n_estimators, trainers={})
+
+
+def _trainer(label_config: tuple) -> Tuple[WalkForwardTrainer, np.ndarray]:
+    # One trainer per labelling per process; its binned Dataset is shared on disk with the other processes
+    trainers = _SHARED['trainers']
+    if label_config not in trainers:
+        lookback, horizon, thresh = label_config
+        features = _SHARED['features']
+        y = label_breakouts(features[['high', 'low']].copy(), lookback, horizon, thresh)['label']
+        X = features.drop(columns=['tr'])
+        trainer = WalkForwardTrainer(X, y, n_splits=_SHARED['n_splits'], classes=CLASSES,
+                                     cache_dir=_SHARED['cache_dir'], max_workers=1, threads_per_fold=1)
+        trainers[label_config] = (trainer, y.to_numpy())
+    return trainers[label_config]
+
+
+def run_trial(config: Dict) -> Dict:
+    """
+    Train one configuration fold by fold, pruning it after `prune_after` folds if its score so far is below the
+    median partial score of the earlier trials. breakout_score is normalised by the share of breakouts, so trials
+    with different labellings are compared on the same scale.
+    """
+    store, tid, start = _SHARED['store'], trial_id(config), time.perf_counter()
+    store.record(tid, config, 'running')
+    trainer, y = _trainer(tuple(config[key] for key in LABEL_KEYS))
+    params = {'n_estimators': _SHARED['n_estimators'], 'learning_rate': config['learning_rate'],
+              'num_leaves': config['num_leaves'], 'min_child_samples': config['min_child_samples']}
+    class_weight = precision_weights(y) if config['class_weight'] == 'precision' else config['class_weight']
+
+    n_splits, prune_after = len(trainer.splits), _SHARED['prune_after']
+    oof = np.full((len(y), len(CLASSES)), np.nan)
+    folds, partial = [], None
+    for stage in ([list(range(prune_after)), list(range(prune_after, n_splits))] if prune_after < n_splits
+                  else [list(range(n_splits))]):
+        result = trainer.run(params, class_weight=class_weight, folds=stage,
+                             early_stopping_rounds=_SHARED['early_stopping_rounds'])
+        oof[result.validated] = result.oof[result.validated]
+        folds += result.folds
+        validated = ~np.isnan(oof[:, 0])
+        score = breakout_score(y[validated], oof[validated])
+        if partial is None and len(folds) < n_splits:
+            partial = score
+            previous = store.partial_scores()
+            if len(previous) >= _SHARED['min_trials'] and partial < np.median(previous):
+                store.record(tid, config, 'pruned', partial=partial, folds=folds,
+                             seconds=time.perf_counter() - start)
+                return {'trial_id': tid, 'status': 'pruned', 'partial': partial, 'score': None, **config}
+
+    store.record(tid, config, 'complete', partial=partial if partial is not None else score, score=score,
+                 folds=folds, seconds=time.perf_counter() - start)
+    return {'trial_id': tid, 'status': 'complete', 'partial': partial, 'score': score, **config}
+
+
+def search(bars: pd.DataFrame, n_trials: int = 50, space: Optional[Dict] = None, seed: int = 0,
+           store_path: str = 'hyper_search.sqlite', cache_dir: str = 'dataset_cache', max_workers: Optional[int] = None,
+           n_splits: int = 5, prune_after: int = 2, min_trials: int = 5, early_stopping_rounds: int = 50,
+           n_estimators: int = 1000) -> pd.DataFrame:
+    """
+    Run (or resume) a search and return every recorded trial, best first.
+
+    Args:
+        bars (pd.DataFrame): 5-minute OHLCV bars, oldest first.
+        n_trials (int): Number of configurations drawn from the search space.
+        space (Optional[Dict]): Search space. Defaults to SEARCH_SPACE.
+        seed (int): Sampling seed; keep it to resume a search.
+        store_path (str): SQLite results file. Trials already pruned or complete in it are skipped.
+        cache_dir (str): Binned Dataset cache of the walk-forward trainer.
+        max_workers (Optional[int]): Trials run at once, one LightGBM thread each. Defaults to all cores.
+        n_splits (int): Walk-forward folds.
+        prune_after (int): Folds trained before a trial may be pruned.
+        min_trials (int): Trials that must have reached the pruning step before pruning starts.
+        early_stopping_rounds (int): Early-stopping patience of every fold.
+        n_estimators (int): Maximum boosting rounds.
+
+    Returns:
+        pd.DataFrame: Trials from the results store, sorted by score.
+    """
+    store = ResultsStore(store_path)
+    pending = [config for config in sample_configs(n_trials, space, seed)
+               if store.status(trial_id(config)) not in ('complete', 'pruned')]
+    print(f"{n_trials - len(pending)} trials already in {store_path}, {len(pending)} to run")
+    features = add_indicators(bars.copy())
+    initargs = (features, store_path, cache_dir, prune_after, min_trials, n_splits, early_stopping_rounds, n_estimators)
+
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(*initargs)
+        for config in pending:
+            outcome = run_trial(config)
+            print(f"{outcome['trial_id']} {outcome['status']:9s} partial={outcome['partial']} score={outcome['score']}")
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as executor:
+            futures = [executor.submit(run_trial, config) for config in pending]
+            for future in as_completed(futures):
+                outcome = future.result()
+                print(f"{outcome['trial_id']} {outcome['status']:9s} partial={outcome['partial']} score={outcome['score']}")
+    results = store.results()
+    if not results.empty:
+        counts = results['status'].value_counts()
+        print(f"{counts.get('complete', 0)} trials complete, {counts.get('pruned', 0)} pruned of {len(results)}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hyperparameter and labelling search for the breakout classifier.")
+    parser.add_argument('data', nargs='?', help="CSV of 5-minute bars (default: synthetic bars)")
+    parser.add_argument('--trials', type=int, default=50, help="Number of sampled configurations")
+    parser.add_argument('--seed', type=int, default=0, help="Sampling seed (keep it to resume)")
+    parser.add_argument('--store', default='hyper_search.sqlite', help="SQLite results store")
+    parser.add_argument('--workers', type=int, default=None, help="Parallel trials (default: all cores)")
+    parser.add_argument('--prune-after', type=int, default=2, help="Folds before a trial may be pruned")
+    args = parser.parse_args()
+
+    bars = load_data(args.data) if args.data else synthetic_bars()
+    results = search(bars, args.trials, seed=args.seed, store_path=args.store, max_workers=args.workers,
+                     prune_after=args.prune_after)
+    print(results.head(10).to_string())
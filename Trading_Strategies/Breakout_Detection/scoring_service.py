@@ -0,0 +1,321 @@
+## Local scoring service for the breakout classifier (breakout_detector.pkl / lgbm_breakout.pkl)
+## The model is loaded once; concurrent requests are micro-batched into single predict calls by a background
+## thread, and request latency percentiles are reported. Optionally predicts with the native LightGBM booster.
+
+import json
+import time
+import queue
+import argparse
+import threading
+import http.client
+import numpy as np
+import joblib
+import lightgbm as lgb
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Sequence
+
+
+class BreakoutScorer:
+    """
+    Micro-batching wrapper around a trained LightGBM classifier.
+    """
+    def __init__(self, model_path: str = 'breakout_detector.pkl', max_batch: int = 256, max_wait_ms: float = 2.0,
+                 native: bool = False, num_threads: int = 1, latency_window: int = 10_000):
+        """
+        Args:
+            model_path (str): joblib file of an LGBMClassifier.
+            max_batch (int): Largest number of rows scored in one call.
+            max_wait_ms (float): How long the first queued request waits for others to join its batch.
+            native (bool): Predict with the native LightGBM Booster (no scikit-learn wrapper, fixed thread count).
+            num_threads (int): LightGBM threads per predict call.
+            latency_window (int): Number of recent latencies kept for the percentiles.
+        """
+        self.model = joblib.load(model_path)
+        self.feature_names: List[str] = list(self.model.feature_name_)
+        self.classes: List = [c.item() if hasattr(c, 'item') else c for c in self.model.classes_]
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.native = native
+        self.num_threads = num_threads
+        if native:
+            # A standalone Booster rebuilt from the model text skips the scikit-learn checks on every call
+            self.booster = lgb.Booster(model_str=self.model.booster_.model_to_string())
+        else:
+            self.model.set_params(n_jobs=num_threads)
+
+        self._queue: 'queue.Queue' = queue.Queue()
+        self._latencies = deque(maxlen=latency_window)
+        self._request_latencies = deque(maxlen=latency_window)
+        self._batches = 0
+        self._rows = 0
+        self._lock = threading.Lock()
+        self._running = True
+        self._closed = False
+        self._worker = threading.Thread(target=self._serve, name='breakout-scorer', daemon=True)
+        self._worker.start()
+
+    # -- Prediction --
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """
+        Class probabilities of a (rows x features) array, in the order of self.classes.
+        """
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if not self.native:
+            return self.model.predict_proba(X)
+        raw = self.booster.predict(X, num_threads=self.num_threads)
+        if raw.ndim == 1:
+            # Binary objective: probability of the positive class only
+            return np.column_stack([1 - raw, raw])
+        return raw
+
+    def to_row(self, features) -> np.ndarray:
+        """
+        Convert one request row (list in feature order, or {feature: value} dict) to an array.
+        """
+        if isinstance(features, dict):
+            missing = [name for name in self.feature_names if name not in features]
+            if missing:
+                raise ValueError(f"Missing features: {missing}")
+            return np.array([features[name] for name in self.feature_names], dtype=np.float64)
+        row = np.asarray(features, dtype=np.float64)
+        if row.shape != (len(self.feature_names),):
+            raise ValueError(f"Expected {len(self.feature_names)} features, got shape {row.shape}")
+        return row
+
+    def submit(self, features) -> Future:
+        """
+        Queue one row for scoring.
+
+        Returns:
+            Future: Resolves to the row's class probabilities.
+
+        Raises:
+            RuntimeError: If the scorer was closed (nothing would ever score the row).
+        """
+        row = self.to_row(features)
+        future = Future()
+        with self._lock:
+            # Checked under the lock so no row can be queued behind the stop marker put by close()
+            if self._closed:
+                raise RuntimeError("BreakoutScorer is closed")
+            self._queue.put((row, future, time.perf_counter()))
+        return future
+
+    def score(self, rows: Sequence) -> List[List[float]]:
+        """
+        Score rows through the batching queue and wait for the results.
+        """
+        futures = [self.submit(row) for row in rows]
+        return [future.result().tolist() for future in futures]
+
+    def _serve(self):
+        while self._running:
+            try:
+                first = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if first is None:
+                break
+            batch = [first]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._running = False
+                    break
+                batch.append(item)
+            self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        X = np.vstack([row for row, _, _ in batch])
+        try:
+            proba = self.predict_proba(X)
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+        done = time.perf_counter()
+        with self._lock:
+            self._batches += 1
+            self._rows += len(batch)
+            self._latencies.extend(done - started for _, _, started in batch)
+        for i, (_, future, _) in enumerate(batch):
+            future.set_result(proba[i])
+
+    # -- Monitoring --
+    def record_request(self, seconds: float):
+        """
+        Record the end-to-end latency of one served /predict request (parsing, scoring and writing the response).
+        """
+        with self._lock:
+            self._request_latencies.append(seconds)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Latency percentiles (ms) and batching counters.
+
+        p50_ms/p99_ms are end-to-end per /predict request (from the parsed request line to the written response);
+        score_p50_ms/score_p99_ms cover queueing and prediction of single rows only.
+        """
+        with self._lock:
+            latencies = np.array(self._latencies) * 1000
+            request_latencies = np.array(self._request_latencies) * 1000
+            batches, rows = self._batches, self._rows
+
+        def percentile(values: np.ndarray, q: float) -> float:
+            return float(np.percentile(values, q)) if len(values) else 0.0
+
+        return {
+            'requests': len(request_latencies),
+            'rows': rows,
+            'batches': batches,
+            'mean_batch_size': rows / batches if batches else 0.0,
+            'p50_ms': percentile(request_latencies, 50),
+            'p99_ms': percentile(request_latencies, 99),
+            'score_p50_ms': percentile(latencies, 50),
+            'score_p99_ms': percentile(latencies, 99),
+        }
+
+    def close(self):
+        """
+        Stop the batching thread once the queued rows are scored. Later submit() calls raise.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._worker.join()
+
+
+def make_handler(scorer: BreakoutScorer) -> type:
+    """
+    HTTP handler class bound to a scorer.
+
+    POST /predict  {"rows": [[...], ...]} or {"rows": [{feature: value}, ...]} -> {"classes": [...], "proba": [[...], ...]}
+    GET  /stats    latency percentiles and batching counters
+    GET  /health   model features and classes
+    """
+    class ScoringHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out in separate writes; with Nagle on, the body waits for the client's delayed ACK
+        disable_nagle_algorithm = True
+
+        def parse_request(self) -> bool:
+            self._started = time.perf_counter()
+            return super().parse_request()
+
+        def _reply(self, status: int, payload: Dict, scoring: bool = False):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            # Only scoring requests count towards the latency percentiles, not /stats, /health or unknown paths
+            if scoring:
+                scorer.record_request(time.perf_counter() - self._started)
+
+        def do_GET(self):
+            if self.path == '/stats':
+                self._reply(200, scorer.stats())
+            elif self.path == '/health':
+                self._reply(200, {'features': scorer.feature_names, 'classes': scorer.classes})
+            else:
+                self._reply(404, {'error': f"Unknown path {self.path}"})
+
+        def do_POST(self):
+            if self.path != '/predict':
+                self._reply(404, {'error': f"Unknown path {self.path}"})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+                rows = request['rows'] if 'rows' in request else [request['features']]
+                self._reply(200, {'classes': scorer.classes, 'proba': scorer.score(rows)}, scoring=True)
+            except (KeyError, ValueError, TypeError) as e:
+                self._reply(400, {'error': str(e)}, scoring=True)
+            except Exception as e:
+                # Anything else (a failed predict, a closed scorer) is a server error, still answered in JSON
+                self._reply(500, {'error': f"{type(e).__name__}: {e}"}, scoring=True)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ScoringHandler
+
+
+def serve(scorer: BreakoutScorer, host: str = '127.0.0.1', port: int = 8765) -> ThreadingHTTPServer:
+    """
+    Start the HTTP server in a background thread and return it (call shutdown() to stop).
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(scorer))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='breakout-http', daemon=True).start()
+    return server
+
+
+def load_test(host: str, port: int, n_features: int, clients: int = 16, requests_per_client: int = 200) -> Dict[str, float]:
+    """
+    Send single-row requests from concurrent clients, each on a keep-alive connection, and time them.
+    """
+    def client(seed: int) -> List[float]:
+        rng = np.random.default_rng(seed)
+        connection = http.client.HTTPConnection(host, port)
+        timings = []
+        for _ in range(requests_per_client):
+            body = json.dumps({'rows': [rng.normal(size=n_features).tolist()]})
+            start = time.perf_counter()
+            connection.request('POST', '/predict', body, {'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            response.read()
+            timings.append(time.perf_counter() - start)
+        connection.close()
+        return timings
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        timings = np.concatenate([np.array(t) for t in executor.map(client, range(clients))]) * 1000
+    elapsed = time.perf_counter() - start
+    return {
+        'requests': len(timings),
+        'requests_per_sec': len(timings) / elapsed,
+        'client_p50_ms': float(np.percentile(timings, 50)),
+        'client_p99_ms': float(np.percentile(timings, 99)),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the breakout classifier over local HTTP.")
+    parser.add_argument('--model', default='breakout_detector.pkl', help="joblib file of the LGBMClassifier")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--max-batch', type=int, default=256, help="Largest micro-batch")
+    parser.add_argument('--max-wait-ms', type=float, default=2.0, help="Batching window of the first request")
+    parser.add_argument('--native', action='store_true', help="Predict with the native LightGBM booster")
+    parser.add_argument('--threads', type=int, default=1, help="LightGBM threads per predict call")
+    parser.add_argument('--bench', action='store_true', help="Run a local load test and exit")
+    args = parser.parse_args()
+
+    scorer = BreakoutScorer(args.model, args.max_batch, args.max_wait_ms, args.native, args.threads)
+    server = serve(scorer, args.host, args.port)
+    print(f"Scoring {len(scorer.feature_names)} features on http://{args.host}:{server.server_address[1]}/predict")
+    if args.bench:
+        print(load_test(args.host, server.server_address[1], len(scorer.feature_names)))
+        print(scorer.stats())
+        server.shutdown()
+        scorer.close()
+    else:
+        try:
+            while True:
+                time.sleep(60)
+                print(scorer.stats())
+        except KeyboardInterrupt:
+            server.shutdown()
+            scorer.close()
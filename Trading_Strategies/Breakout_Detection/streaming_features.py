@@ -0,0 +1,372 @@
+## Streaming feature engine for live 5-minute scoring
+## Keeps O(1) state per feature (running sums, Welford variance, monotonic deques) and emits the
+## add_indicators feature row of each newly closed candle without recomputing the whole frame.
+
+import math
+import time
+import numpy as np
+import pandas as pd
+from collections import deque
+from typing import Dict, List, Optional
+
+
+class _RollingMoments:
+    """
+    Mean and sample standard deviation over the last `window` values (sliding Welford update).
+    Like pandas rolling statistics, both are NaN while a NaN is in the window.
+    """
+    # Re-derive the moments from the window this often, so that rounding errors cannot accumulate
+    RESYNC = 1024
+
+    def __init__(self, window: int):
+        self.window = window
+        self._values = deque()
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._updates = 0
+        self._nans = 0
+        self._stale = False
+
+    @property
+    def ready(self) -> bool:
+        return len(self._values) == self.window
+
+    def update(self, x: float):
+        values = self._values
+        values.append(x)
+        old = values.popleft() if len(values) > self.window else None
+        self._nans += (x != x) - (old is not None and old != old)
+        self._updates += 1
+        if self._nans:
+            # The running moments cannot absorb a NaN: rebuild them from the window once it has left
+            self._stale = True
+            return
+        if self._stale or self._updates % self.RESYNC == 0:
+            self._stale = False
+            self._resync()
+        elif old is None:
+            delta = x - self._mean
+            self._mean += delta / len(values)
+            self._m2 += delta * (x - self._mean)
+        else:
+            old_mean = self._mean
+            self._mean += (x - old) / self.window
+            self._m2 += (x - old) * (x - self._mean + old - old_mean)
+
+    def _resync(self):
+        n = len(self._values)
+        self._mean = math.fsum(self._values) / n
+        self._m2 = math.fsum((v - self._mean) ** 2 for v in self._values)
+
+    @property
+    def mean(self) -> float:
+        return float('nan') if self._nans or not self._values else self._mean
+
+    @property
+    def std(self) -> float:
+        n = len(self._values)
+        if n < 2 or self._nans:
+            return float('nan')
+        return math.sqrt(max(self._m2, 0.0) / (n - 1))
+
+
+class _RollingSum:
+    """
+    Sum over the last `window` values; the mean is NaN while a NaN is in the window.
+    """
+    RESYNC = 1024
+
+    def __init__(self, window: int):
+        self.window = window
+        self._values = deque()
+        self.total = 0.0
+        self._updates = 0
+        self._nans = 0
+        self._stale = False
+
+    @property
+    def ready(self) -> bool:
+        return len(self._values) == self.window
+
+    def update(self, x: float):
+        values = self._values
+        values.append(x)
+        old = values.popleft() if len(values) > self.window else None
+        self._nans += (x != x) - (old is not None and old != old)
+        self._updates += 1
+        if self._nans:
+            self._stale = True
+            return
+        if self._stale or self._updates % self.RESYNC == 0:
+            self._stale = False
+            self.total = math.fsum(values)
+        else:
+            self.total += x - (old if old is not None else 0.0)
+
+    @property
+    def mean(self) -> float:
+        return self.total / len(self._values) if self._values and not self._nans else float('nan')
+
+
+class _RollingExtreme:
+    """
+    Maximum (or minimum) over the last `window` values with a monotonic deque, amortized O(1).
+    NaN while a NaN is in the window.
+    """
+    def __init__(self, window: int, maximum: bool = True):
+        self.window = window
+        self.maximum = maximum
+        self._deque = deque()  # (position, value), values monotonic from the front
+        self._position = 0
+        self._last_nan = -window - 1
+
+    @property
+    def ready(self) -> bool:
+        return self._position >= self.window
+
+    def update(self, x: float):
+        dq = self._deque
+        if x != x:
+            self._last_nan = self._position
+        elif self.maximum:
+            while dq and dq[-1][1] <= x:
+                dq.pop()
+            dq.append((self._position, x))
+        else:
+            while dq and dq[-1][1] >= x:
+                dq.pop()
+            dq.append((self._position, x))
+        while dq and dq[0][0] <= self._position - self.window:
+            dq.popleft()
+        self._position += 1
+
+    @property
+    def value(self) -> float:
+        if self._last_nan >= self._position - self.window or not self._deque:
+            return float('nan')
+        return self._deque[0][1]
+
+
+class StreamingFeatures:
+    """
+    Incremental version of breakout_pipeline.add_indicators for one symbol.
+
+    Each update() takes one closed candle and returns its feature row. Rows emitted before the longest
+    window is full (is_ready False) use only past data, so they differ from the batch version, which back-fills
+    the first rows with later values.
+    """
+    BASE_FEATURES = ['return', 'r_mean_12', 'r_std_12', 'r_max_12', 'r_min_12', 'tr', 'atr_14', 'mom_6',
+                     'hour', 'minute', 'dow']
+    EXTENDED_FEATURES = ['rsi_14', 'bb_width']
+    VOLUME_FEATURES = ['vol_avg_20', 'vol_ratio', 'vol_std_20']
+
+    def __init__(self, extended: bool = False, volume: bool = True):
+        """
+        Args:
+            extended (bool): Also compute RSI(14), Bollinger-band width and volume ratios, as add_indicators(extended=True).
+            volume (bool): Whether candles carry a volume (volume ratios are only computed then).
+        """
+        self.extended = extended
+        self.volume = volume
+        self.columns: List[str] = list(self.BASE_FEATURES)
+        if extended:
+            self.columns += self.EXTENDED_FEATURES + (self.VOLUME_FEATURES if volume else [])
+        self.warm_up_bars = 20 if extended else 15
+        self.count = 0
+
+        self._close_12 = _RollingMoments(12)
+        self._high_12 = _RollingExtreme(12, maximum=True)
+        self._low_12 = _RollingExtreme(12, maximum=False)
+        self._tr_14 = _RollingSum(14)
+        self._closes = deque(maxlen=7)
+        self._last: Dict[str, float] = {}
+        if extended:
+            self._gain_14 = _RollingSum(14)
+            self._loss_14 = _RollingSum(14)
+            self._close_20 = _RollingMoments(20)
+            self._volume_20 = _RollingMoments(20)
+
+    @property
+    def is_ready(self) -> bool:
+        """True once every window is full, i.e. once rows match the batch features."""
+        return self.count >= self.warm_up_bars
+
+    def _fill(self, name: str, value: float, default: Optional[float] = None) -> float:
+        # Forward-fill like the batch version; `default` replaces values the batch version fills explicitly
+        if value is None or math.isnan(value) or math.isinf(value):
+            if default is not None:
+                value = default
+            else:
+                return self._last.get(name, float('nan'))
+        self._last[name] = value
+        return value
+
+    def update(self, timestamp, open_: float, high: float, low: float, close: float,
+               volume: Optional[float] = None) -> Dict[str, float]:
+        """
+        Add one closed candle and return its features.
+
+        Args:
+            timestamp: Candle time (datetime or pandas Timestamp).
+            open_, high, low, close (float): Candle prices.
+            volume (Optional[float]): Candle volume.
+
+        Returns:
+            Dict[str, float]: Feature values keyed like the add_indicators columns.
+        """
+        first = not self._closes
+        prev_close = self._closes[-1] if self._closes else float('nan')
+        self._closes.append(close)
+        self._close_12.update(close)
+        self._high_12.update(high)
+        self._low_12.update(low)
+
+        row = {}
+        # pct_change without padding: a return next to a missing close is 0
+        row['return'] = self._fill('return', close / prev_close - 1 if close == close and prev_close == prev_close
+                                   else 0.0, 0.0)
+        row['r_mean_12'] = self._fill('r_mean_12', self._close_12.mean if self._close_12.ready else float('nan'))
+        row['r_std_12'] = self._fill('r_std_12', self._close_12.std if self._close_12.ready else float('nan'), 0.0)
+        row['r_max_12'] = self._fill('r_max_12', self._high_12.value if self._high_12.ready else float('nan'))
+        row['r_min_12'] = self._fill('r_min_12', self._low_12.value if self._low_12.ready else float('nan'))
+
+        # NaN propagates as in the batch np.maximum; the first candle has no true range at all
+        valid = high == high and low == low and prev_close == prev_close
+        tr = max(high - low, high - prev_close, prev_close - low) if valid else float('nan')
+        if not first:
+            self._tr_14.update(tr)
+        row['tr'] = self._fill('tr', tr)
+        row['atr_14'] = self._fill('atr_14', self._tr_14.mean if self._tr_14.ready else float('nan'))
+        row['mom_6'] = self._fill('mom_6', close / self._closes[0] - 1 if len(self._closes) == 7 else float('nan'))
+
+        stamp = pd.Timestamp(timestamp)
+        row['hour'] = stamp.hour
+        row['minute'] = stamp.minute
+        row['dow'] = stamp.dayofweek
+
+        if self.extended:
+            if not first:
+                delta = close - prev_close
+                self._gain_14.update(max(delta, 0.0) if delta == delta else float('nan'))
+                self._loss_14.update(max(-delta, 0.0) if delta == delta else float('nan'))
+            if self._gain_14.ready:
+                rs = self._gain_14.mean / (self._loss_14.mean + 1e-9)
+                rsi = 100 - (100 / (1 + rs))
+            else:
+                rsi = float('nan')
+            row['rsi_14'] = self._fill('rsi_14', rsi, 50.0)
+
+            self._close_20.update(close)
+            bb_width = (2 * self._close_20.std * 2) / self._close_20.mean if self._close_20.ready else float('nan')
+            row['bb_width'] = self._fill('bb_width', bb_width)
+
+            if self.volume:
+                volume = float('nan') if volume is None else volume
+                self._volume_20.update(volume)
+                ready = self._volume_20.ready
+                vol_avg = self._volume_20.mean if ready else float('nan')
+                row['vol_avg_20'] = self._fill('vol_avg_20', vol_avg)
+                row['vol_ratio'] = self._fill('vol_ratio', volume / (vol_avg + 1e-9))
+                row['vol_std_20'] = self._fill('vol_std_20', self._volume_20.std if ready else float('nan'), 0.0)
+
+        self.count += 1
+        return row
+
+    def warm_up(self, bars: pd.DataFrame) -> Optional[Dict[str, float]]:
+        """
+        Feed historical candles (oldest first) and return the features of the last one.
+        """
+        row = None
+        has_volume = 'volume' in bars.columns
+        for stamp, o, h, l, c, v in zip(bars.index, bars['open'], bars['high'], bars['low'], bars['close'],
+                                         bars['volume'] if has_volume else [None] * len(bars)):
+            row = self.update(stamp, o, h, l, c, v)
+        return row
+
+
+def stream_frame(bars: pd.DataFrame, extended: bool = False) -> pd.DataFrame:
+    """
+    Run a frame of candles through StreamingFeatures and collect the rows.
+    """
+    engine = StreamingFeatures(extended=extended, volume='volume' in bars.columns)
+    rows = []
+    has_volume = 'volume' in bars.columns
+    for stamp, o, h, l, c, v in zip(bars.index, bars['open'], bars['high'], bars['low'], bars['close'],
+                                     bars['volume'] if has_volume else [None] * len(bars)):
+        rows.append(engine.update(stamp, o, h, l, c, v))
+    return pd.DataFrame(rows, index=bars.index, columns=engine.columns)
+
+
+def check_parity(bars: pd.DataFrame, extended: bool = False, rtol: float = 1e-8, atol: float = 1e-9) -> Dict[str, float]:
+    """
+    Check that the streamed features agree with breakout_pipeline.add_indicators after the warm-up bars, within
+    rtol / atol: the two compute the rolling statistics differently, so they match to rounding, not bit for bit.
+
+    Missing values (NaN candles) are handled like the batch version: a rolling statistic is missing while a NaN is
+    in its window and the last value is carried forward. The only exception is atr_14, which the batch version
+    back-fills with the next valid value (a look-ahead a live engine cannot reproduce); those rows are skipped.
+
+    Args:
+        bars (pd.DataFrame): OHLC(V) candles indexed by time, possibly with NaN values.
+        extended (bool): Compare the extended feature set.
+        rtol (float): Relative tolerance. pandas rolling std itself carries ~1e-9 relative rounding error
+                      on price levels, so bitwise equality is not attainable.
+        atol (float): Absolute tolerance.
+
+    Returns:
+        Dict[str, float]: Largest absolute difference per feature.
+
+    Raises:
+        AssertionError: If a feature differs beyond the tolerances.
+    """
+    from breakout_pipeline import add_indicators
+
+    batch = add_indicators(bars.copy(), extended=extended)
+    streamed = stream_frame(bars, extended=extended)
+    warm_up = StreamingFeatures(extended=extended).warm_up_bars
+    prev_close = bars['close'].shift()
+    tr = np.maximum(bars['high'] - bars['low'], np.maximum(bars['high'] - prev_close, prev_close - bars['low']))
+    back_filled = tr.rolling(14).mean().isna().to_numpy()[warm_up:]
+    differences = {}
+    for column in streamed.columns:
+        expected = batch[column].to_numpy(dtype=float)[warm_up:]
+        actual = streamed[column].to_numpy(dtype=float)[warm_up:]
+        if column == 'atr_14':
+            expected, actual = expected[~back_filled], actual[~back_filled]
+        differences[column] = float(np.max(np.abs(expected - actual))) if len(actual) else 0.0
+        if not np.allclose(actual, expected, rtol=rtol, atol=atol, equal_nan=True):
+            raise AssertionError(f"Streamed feature {column} differs from add_indicators by up to {differences[column]}")
+    return differences
+
+
+def with_missing(bars: pd.DataFrame, seed: int = 0) -> pd.DataFrame:
+    """
+    Copy of the candles with a few missing values: one NaN close, one fully missing candle and missing volumes.
+    """
+    bars = bars.copy()
+    rng = np.random.default_rng(seed)
+    rows = np.sort(rng.choice(np.arange(100, len(bars) - 100), size=3, replace=False))
+    bars.iloc[rows[0], bars.columns.get_loc('close')] = np.nan
+    bars.iloc[rows[1]] = np.nan
+    if 'volume' in bars.columns:
+        bars.iloc[rows[2]:rows[2] + 3, bars.columns.get_loc('volume')] = np.nan
+    return bars
+
+
+if __name__ == "__main__":
+    from breakout_pipeline import synthetic_bars
+
+    bars = synthetic_bars(20_000)
+    for label, frame in (('clean', bars), ('with NaN', with_missing(bars))):
+        for extended in (False, True):
+            differences = check_parity(frame, extended=extended)
+            print(f"Streamed vs batch ({label}, extended={extended}): within rtol=1e-8, "
+                  f"max abs difference {max(differences.values()):.3g}")
+
+    engine = StreamingFeatures(extended=True)
+    rows = list(zip(bars.index, bars['open'], bars['high'], bars['low'], bars['close'], bars['volume']))
+    start = time.perf_counter()
+    for row in rows:
+        engine.update(*row)
+    elapsed = time.perf_counter() - start
+    print(f"{elapsed / len(rows) * 1e6:.1f} us per candle (extended features)")
@@ -0,0 +1,251 @@
+## Parallel, cached walk-forward training of the breakout classifier
+## The LightGBM Dataset is binned once and saved as a binary file keyed by the data; every fold (and every
+## hyperparameter trial) loads it and takes row subsets, so features are never re-binned. Folds run in parallel
+## processes with a per-fold thread budget and early stopping; per-fold models and out-of-fold predictions are saved.
+
+import os
+import json
+import time
+import hashlib
+import numpy as np
+import pandas as pd
+import lightgbm as lgb
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from sklearn.model_selection import TimeSeriesSplit
+
+
+# Parameters fixing the feature bins; they are part of the cache key of the binned Dataset
+DATASET_PARAMS = {'max_bin': 255, 'min_data_in_bin': 3, 'verbose': -1}
+
+
+def dataset_cache(X: pd.DataFrame, y: pd.Series, classes: List, cache_dir: str = 'dataset_cache',
+                  dataset_params: Optional[Dict] = None) -> str:
+    """
+    Bin the features once and save them as a LightGBM binary Dataset, reused while X, y and the bin parameters match.
+
+    Args:
+        X (pd.DataFrame): Features.
+        y (pd.Series): Labels (e.g. -1, 0, 1).
+        classes (List): Label values; the Dataset stores their positions 0..n-1.
+        cache_dir (str): Directory of the binary files.
+        dataset_params (Optional[Dict]): Binning parameters. Defaults to DATASET_PARAMS.
+
+    Returns:
+        str: Path of the binary Dataset file.
+    """
+    dataset_params = dataset_params or DATASET_PARAMS
+    values = np.ascontiguousarray(X.to_numpy(dtype=np.float32))
+    labels = np.searchsorted(np.asarray(classes), y.to_numpy())
+    digest = hashlib.sha1()
+    digest.update(values.tobytes())
+    digest.update(labels.astype(np.int64).tobytes())
+    digest.update(json.dumps([list(X.columns), dataset_params], sort_keys=True).encode('utf-8'))
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f"{digest.hexdigest()[:16]}.bin")
+    if not os.path.exists(path):
+        dataset = lgb.Dataset(values, label=labels, feature_name=list(X.columns), params=dataset_params,
+                              free_raw_data=True)
+        dataset.construct()
+        # Written under a temporary name, so that concurrent processes never load a half-written file
+        partial = f"{path}.{os.getpid()}.tmp"
+        dataset.save_binary(partial)
+        os.replace(partial, path)
+    return path
+
+
+def class_weights(labels: np.ndarray, n_classes: int, class_weight) -> np.ndarray:
+    """
+    Per-row weights for 'balanced', a {class position: weight} dict or None.
+    """
+    if class_weight is None:
+        return np.ones(len(labels))
+    if class_weight == 'balanced':
+        counts = np.bincount(labels, minlength=n_classes).astype(float)
+        per_class = len(labels) / (n_classes * np.maximum(counts, 1))
+    else:
+        per_class = np.array([class_weight.get(k, 1.0) for k in range(n_classes)], dtype=float)
+    return per_class[labels]
+
+
+def _train_fold(dataset_path: str, fold: int, train_idx: np.ndarray, val_idx: np.ndarray, params: Dict,
+                num_boost_round: int, early_stopping_rounds: int, class_weight, n_classes: int,
+                dataset_params: Dict) -> Dict:
+    start = time.perf_counter()
+    full = lgb.Dataset(dataset_path, params=dataset_params).construct()
+    train_set = full.subset(train_idx)
+    valid_set = full.subset(val_idx)
+    labels = full.get_label().astype(int)
+    train_set.set_weight(class_weights(labels[train_idx], n_classes, class_weight))
+
+    booster = lgb.train(params, train_set, num_boost_round=num_boost_round, valid_sets=[valid_set],
+                        valid_names=['valid'],
+                        callbacks=[lgb.early_stopping(early_stopping_rounds, verbose=False), lgb.log_evaluation(0)])
+    metric = next(iter(booster.best_score['valid']))
+    return {
+        'fold': fold,
+        'best_iteration': booster.best_iteration,
+        metric: booster.best_score['valid'][metric],
+        'seconds': time.perf_counter() - start,
+        'model': booster.model_to_string(num_iteration=booster.best_iteration),
+    }
+
+
+class WalkForwardResult:
+    """
+    Per-fold boosters, out-of-fold probabilities and fold metrics of one walk-forward run.
+    """
+    def __init__(self, boosters: List[lgb.Booster], oof: np.ndarray, folds: List[Dict], classes: List,
+                 params: Dict, seconds: float):
+        self.boosters = boosters
+        self.oof = oof
+        self.folds = folds
+        self.classes = classes
+        self.params = params
+        self.seconds = seconds
+
+    @property
+    def validated(self) -> np.ndarray:
+        """Mask of the rows that belong to a validation fold."""
+        return ~np.isnan(self.oof[:, 0])
+
+    @property
+    def final_model(self) -> lgb.Booster:
+        """Model of the last fold, trained on the most recent data."""
+        return self.boosters[-1]
+
+    def mean_score(self) -> float:
+        """Mean early-stopping validation metric over the folds (lower is better)."""
+        metric = [k for k in self.folds[0] if k not in ('fold', 'best_iteration', 'seconds')][0]
+        return float(np.mean([fold[metric] for fold in self.folds]))
+
+    def save(self, artifact_dir: str) -> str:
+        """
+        Write fold_<k>.txt models, oof.npy and folds.json to a directory.
+        """
+        os.makedirs(artifact_dir, exist_ok=True)
+        for fold, booster in zip(self.folds, self.boosters):
+            booster.save_model(os.path.join(artifact_dir, f"fold_{fold['fold']}.txt"))
+        np.save(os.path.join(artifact_dir, 'oof.npy'), self.oof)
+        with open(os.path.join(artifact_dir, 'folds.json'), 'w', encoding='utf-8') as f:
+            json.dump({'classes': self.classes, 'params': self.params, 'seconds': self.seconds,
+                       'folds': self.folds}, f, indent=2, default=str)
+        return artifact_dir
+
+
+class WalkForwardTrainer:
+    """
+    Walk-forward (TimeSeriesSplit) LightGBM training with folds in parallel processes.
+    """
+    def __init__(self, X: pd.DataFrame, y: pd.Series, n_splits: int = 5, classes: Optional[List] = None,
+                 cache_dir: str = 'dataset_cache', max_workers: Optional[int] = None,
+                 threads_per_fold: Optional[int] = None, dataset_params: Optional[Dict] = None):
+        """
+        Args:
+            X (pd.DataFrame): Features, oldest row first.
+            y (pd.Series): Labels.
+            n_splits (int): Number of walk-forward folds.
+            classes (Optional[List]): Label values in probability-column order. Defaults to the sorted labels.
+            cache_dir (str): Directory of the binned Dataset cache.
+            max_workers (Optional[int]): Folds trained at once. Defaults to min(n_splits, cores).
+            threads_per_fold (Optional[int]): LightGBM threads per fold. Defaults to cores // max_workers.
+            dataset_params (Optional[Dict]): Binning parameters. Defaults to DATASET_PARAMS.
+        """
+        cores = os.cpu_count() or 1
+        self.classes = list(classes) if classes is not None else sorted(pd.unique(y).tolist())
+        self.n_rows = len(y)
+        self.max_workers = max_workers or min(n_splits, cores)
+        self.threads_per_fold = threads_per_fold or max(1, cores // self.max_workers)
+        self.dataset_params = dataset_params or DATASET_PARAMS
+        self.dataset_path = dataset_cache(X, y, self.classes, cache_dir, self.dataset_params)
+        # Raw features are kept for out-of-fold prediction: a binned Dataset cannot be predicted on
+        self._features = np.ascontiguousarray(X.to_numpy(dtype=np.float32))
+        self.splits = [(train_idx, val_idx) for train_idx, val_idx in TimeSeriesSplit(n_splits=n_splits).split(X)]
+
+    def lgb_params(self, params: Optional[Dict] = None) -> Tuple[Dict, int]:
+        """
+        Translate LGBMClassifier-style parameters into native ones and the number of boosting rounds.
+        """
+        params = dict(params or {'n_estimators': 1000, 'learning_rate': 0.05, 'num_leaves': 31, 'max_depth': -1})
+        num_boost_round = params.pop('n_estimators', 1000)
+        params.pop('n_jobs', None)
+        native = {'objective': 'multiclass', 'num_class': len(self.classes), 'verbose': -1,
+                  'num_threads': self.threads_per_fold, **self.dataset_params, **params}
+        if len(self.classes) == 2:
+            native.update(objective='binary')
+            native.pop('num_class')
+        return native, num_boost_round
+
+    def run(self, params: Optional[Dict] = None, class_weight='balanced', early_stopping_rounds: int = 50,
+            folds: Optional[List[int]] = None, artifact_dir: Optional[str] = None) -> WalkForwardResult:
+        """
+        Train the folds in parallel.
+
+        Args:
+            params (Optional[Dict]): LGBMClassifier-style parameters ('n_estimators', 'learning_rate', ...).
+            class_weight: 'balanced', a {label: weight} dict (labels as in y) or None.
+            early_stopping_rounds (int): Rounds without improvement of the validation loss before stopping.
+            folds (Optional[List[int]]): Subset of fold numbers to train (all by default).
+            artifact_dir (Optional[str]): If set, the models and out-of-fold predictions are written there.
+
+        Returns:
+            WalkForwardResult: Boosters, out-of-fold probabilities (NaN outside validation folds) and fold metrics.
+        """
+        start = time.perf_counter()
+        native, num_boost_round = self.lgb_params(params)
+        if isinstance(class_weight, dict):
+            class_weight = {self.classes.index(label): weight for label, weight in class_weight.items()}
+        selected = list(range(len(self.splits))) if folds is None else list(folds)
+
+        jobs = [(self.dataset_path, k, self.splits[k][0], self.splits[k][1], native, num_boost_round,
+                 early_stopping_rounds, class_weight, len(self.classes), self.dataset_params) for k in selected]
+        if self.max_workers == 1 or len(jobs) == 1:
+            outputs = [_train_fold(*job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(jobs))) as executor:
+                outputs = list(executor.map(_train_fold, *zip(*jobs)))
+
+        oof = np.full((self.n_rows, len(self.classes)), np.nan)
+        boosters, fold_metrics = [], []
+        for output in sorted(outputs, key=lambda o: o['fold']):
+            booster = lgb.Booster(model_str=output.pop('model'))
+            val_idx = self.splits[output['fold']][1]
+            proba = self.predict_rows(booster, val_idx)
+            oof[val_idx] = proba
+            boosters.append(booster)
+            fold_metrics.append(output)
+
+        result = WalkForwardResult(boosters, oof, fold_metrics, self.classes,
+                                   {**native, 'num_boost_round': num_boost_round}, time.perf_counter() - start)
+        if artifact_dir:
+            result.save(artifact_dir)
+        return result
+
+    def predict_rows(self, booster: lgb.Booster, rows: np.ndarray) -> np.ndarray:
+        """
+        Class probabilities of rows of the training frame.
+        """
+        proba = booster.predict(self._features[rows])
+        return np.column_stack([1 - proba, proba]) if proba.ndim == 1 else proba
+
+
+def train_walk_forward(X: pd.DataFrame, y: pd.Series, params: Optional[Dict] = None, n_splits: int = 5,
+                       class_weight='balanced', artifact_dir: Optional[str] = 'walk_forward',
+                       **trainer_kwargs) -> WalkForwardResult:
+    """
+    One-call replacement of breakout_pipeline.train_lgbm: parallel folds, early stopping and saved artifacts.
+    """
+    trainer = WalkForwardTrainer(X, y, n_splits=n_splits, **trainer_kwargs)
+    return trainer.run(params, class_weight=class_weight, artifact_dir=artifact_dir)
+
+
+if __name__ == "__main__":
+    import sys
+    from breakout_pipeline import load_data, synthetic_bars, add_indicators, label_breakouts, prepare_dataset
+
+    df = load_data(sys.argv[1]) if len(sys.argv) > 1 else synthetic_bars(100_000)
+    X, y = prepare_dataset(label_breakouts(add_indicators(df)))
+    result = train_walk_forward(X, y)
+    print(f"Trained {len(result.boosters)} folds in {result.seconds:.1f}s, mean validation loss {result.mean_score():.4f}")
+    for fold in result.folds:
+        print(fold)